@@ -5,18 +5,23 @@ HVDC Warehouse Ontology 기반 End-to-End Analysis Pipeline
 결과: HVDC_Comprehensive_Report.xlsx (15개 시트)
 
 필요 패키지: pip install pandas openpyxl pydantic
+선택 패키지: pip install python-calamine pyarrow rapidfuzz numba polars  (고속 Excel 읽기 + Parquet 캐시 + 퍼지 매칭 + JIT + Polars 분석)
 """
 
-import glob, os, re, pandas as pd
+import os, re, functools, zipfile, html, hashlib, pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import json
 import warnings
 warnings.filterwarnings('ignore')
 
+# Excel 읽기 엔진(calamine/openpyxl) + Parquet 캐시는 공통 모듈 사용
+from hvdc_io import EXCEL_ENGINE, load_files_parallel, read_excel_cached, to_datetime_mixed, write_frame_rows
+
 # 타임라인 모듈 import
 try:
     import timeline_tracking_module as ttm
@@ -26,6 +31,26 @@ except ImportError:
     TIMELINE_AVAILABLE = False
     print("⚠️ Timeline 모듈을 찾을 수 없습니다. 기본 분석만 실행됩니다.")
 
+# SQM/CBM 계산 커널: numba 있으면 JIT 병렬 루프, 없으면 NumPy 벡터 연산
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 분석 엔진(HVDC_ENGINE=polars → Polars) + 월별 피벗 + 재고 누적 스윕은 공통 모듈 사용
+from hvdc_compute import ANALYTICS_ENGINE, POLARS_AVAILABLE, pl, pivot_by_month, stock_sweep
+
+# 대용량 원본 시트(원본 데이터/일별 재고/타임라인)는 리포트 옆 Parquet로 분리 (HVDC_RAW_PARQUET=0 이면 xlsx에 포함)
+RAW_PARQUET = os.environ.get('HVDC_RAW_PARQUET', '1') != '0'
+
+# 퍼지 컬럼 매칭: rapidfuzz(C++) 우선, 없으면 difflib
+try:
+    from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 # =============================================================================
 # 1. ONTOLOGY UTILS - HVDC Warehouse Ontology 기반 매핑
 # =============================================================================
@@ -75,6 +100,67 @@ FILE_TYPE_PATTERNS = {
     'ONHAND': [r'.*Stock.*OnHand.*\.xlsx$', r'.*OnHand.*\.xlsx$']
 }
 
+# 시트명 키워드 → 파일 타입 (로더의 시트 선택 기준과 동일)
+SHEET_TYPE_KEYWORDS = {
+    'INVOICE': ['invoice', 'cost', 'billing'],
+    'ONHAND': ['onhand', 'stock', 'inventory']
+}
+XLSX_SHEET_NAME_RE = re.compile(r'<sheet\b[^>]*?\bname="([^"]*)"')
+
+# 1-5. 사전 컴파일된 규칙 (호출마다 re 모듈 캐시 조회 방지)
+LOC_MAP_COMPILED = [(re.compile(pattern, re.IGNORECASE), canonical) for pattern, canonical in LOC_MAP.items()]
+SITE_PATTERNS_COMPILED = [(re.compile(pattern, re.IGNORECASE), site) for pattern, site in SITE_PATTERNS.items()]
+FILE_TYPE_PATTERNS_COMPILED = {
+    file_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for file_type, patterns in FILE_TYPE_PATTERNS.items()
+}
+
+# 1-6. 창고/사이트 컬럼 판별 키워드 (대소문자 구분, 단일 정규식으로 한 번에 스캔)
+WAREHOUSE_COL_KEYWORDS = ['DSV', 'MOSB', 'Indoor', 'Outdoor', 'Markaz', 'MZP', 'Hauler', 'DHL', 'AAA', 'Shifting']
+SITE_COL_KEYWORDS = ['DAS', 'MIR', 'SHU', 'AGI']
+WAREHOUSE_COL_RE = re.compile('|'.join(map(re.escape, WAREHOUSE_COL_KEYWORDS)))
+SITE_COL_RE = re.compile('|'.join(map(re.escape, SITE_COL_KEYWORDS)))
+
+# 1-7. 저카디널리티 컬럼의 category 고정값 (사전순 → 정렬 결과가 문자열 정렬과 동일)
+TX_TYPE_CATEGORIES = sorted(['IN', 'OUT', 'TRANSFER', 'COST', 'SNAP'])
+FILE_TYPE_CATEGORIES = sorted(list(FILE_TYPE_PATTERNS) + ['UNKNOWN'])
+SITE_CATEGORIES = sorted(set(SITE_PATTERNS.values()) | {'UNK'})
+LOC_CATEGORIES = sorted(set(LOC_MAP.values()) | {'UNKNOWN'})
+
+# 1-8. 로더별 컬럼 탐지 패턴 (fuzzy_find_column 입력 = usecols 선별 기준)
+MOVEMENT_COLUMN_PATTERNS = {
+    'case': ['case', 'carton', 'box', 'mr#', 'sct ship no.', 'case no'],
+    'qty': ["q'ty", 'qty', 'quantity', 'qty shipped', 'received'],
+    'length': ['l(cm)', 'l(m)', 'length'],
+    'width': ['w(cm)', 'w(m)', 'width'],
+    'height': ['h(cm)', 'h(m)', 'height'],
+}
+INVOICE_COLUMN_PATTERNS = {
+    'date': ['date', 'month', 'operation month', 'period'],
+    'category': ['category', 'location', 'warehouse', 'type'],
+    'cost': ['total', 'cost', 'amount', 'value', 'price'],
+    'case': ['case', 'case no', 'case number'],
+}
+ONHAND_COLUMN_PATTERNS = {
+    'loc': ['location', 'warehouse', 'loc', 'place'],
+    'qty': ['quantity', 'qty', 'stock', 'count'],
+    'case': ['case', 'case no', 'item'],
+}
+
+# 로더 컬럼 규칙 지문 → read_excel_cached 캐시 키 (패턴이 바뀌면 이전 컬럼 구성의 캐시를 재사용하지 않음)
+COLUMN_RULES_KEY = hashlib.sha256(repr((
+    MOVEMENT_COLUMN_PATTERNS, INVOICE_COLUMN_PATTERNS, ONHAND_COLUMN_PATTERNS,
+    WAREHOUSE_COL_RE.pattern, SITE_COL_RE.pattern,
+)).encode()).hexdigest()[:12]
+
+# timeline_tracking_module 필수 컬럼 → 추정 후보 컬럼 (앞쪽 우선)
+TIMELINE_COLUMN_CANDIDATES = {
+    'Event_Type': ['TxType', 'TxType_Refined', 'EVENT_TYPE'],
+    'Location': ['Loc_To', 'LOC_TO', 'Warehouse', 'LOC_FROM'],
+    'Source_File': ['SOURCE_FILE', 'Source', 'source'],
+}
+
+@functools.lru_cache(maxsize=4096)
 def map_loc(raw_code: Union[str, None]) -> str:
     """
     Regex-based Location 표준화 (30ms 내 처리)
@@ -84,11 +170,53 @@ def map_loc(raw_code: Union[str, None]) -> str:
         return "UNKNOWN"
     
     raw_str = str(raw_code).strip()
-    for pattern, canonical in LOC_MAP.items():
-        if re.fullmatch(pattern, raw_str, re.IGNORECASE):
+    for pattern, canonical in LOC_MAP_COMPILED:
+        if pattern.fullmatch(raw_str):
             return canonical
     return raw_str
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _sqm_cbm_kernel(length, width, height, qty):
+        """L×W×Q → SQM, SQM×H → CBM 단일 패스 (중간 배열 없음)"""
+        n = length.shape[0]
+        sqm = np.empty(n)
+        cbm = np.empty(n)
+        for i in prange(n):
+            area = length[i] * width[i] * qty[i]
+            sqm[i] = area
+            cbm[i] = area * height[i] if area > 0 else 0.0
+        return sqm, cbm
+
+def compute_sqm_cbm(length: np.ndarray, width: np.ndarray, height: np.ndarray,
+                    qty: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    케이스별 SQM/CBM 계산 (단위: m, 치수 컬럼이 없으면 0 배열 입력)
+    SQM = L × W × Qty, CBM = SQM × H (SQM > 0인 경우만)
+    """
+    if NUMBA_AVAILABLE:
+        return _sqm_cbm_kernel(length, width, height, qty)
+    
+    sqm = length * width * qty
+    cbm = np.where(sqm > 0, sqm * height, 0.0)
+    return sqm, cbm
+
+def map_loc_series(raw_codes: pd.Series) -> pd.Series:
+    """
+    map_loc의 Series 버전 - 규칙별 벡터 정규식 매칭 (먼저 일치한 규칙 우선)
+    """
+    raw_str = raw_codes.astype(str).str.strip()
+    result = raw_str.copy()
+    matched = pd.Series(False, index=raw_codes.index)
+    
+    for pattern, canonical in LOC_MAP_COMPILED:
+        hit = raw_str.str.fullmatch(pattern.pattern, case=False, na=False) & ~matched
+        result = result.mask(hit, canonical)
+        matched |= hit
+    
+    return result.mask(raw_codes.isna(), "UNKNOWN")
+
+@functools.lru_cache(maxsize=4096)
 def map_site(loc_from: Union[str, None] = None, 
              loc_to: Union[str, None] = None, 
              site_col: Union[str, None] = None) -> str:
@@ -101,8 +229,8 @@ def map_site(loc_from: Union[str, None] = None,
     for candidate in candidates:
         if pd.notna(candidate):
             candidate_str = str(candidate).strip()
-            for pattern, site in SITE_PATTERNS.items():
-                if re.match(pattern, candidate_str, re.IGNORECASE):
+            for pattern, site in SITE_PATTERNS_COMPILED:
+                if pattern.match(candidate_str):
                     return site
     return "UNK"
 
@@ -118,15 +246,112 @@ def map_category(cat: Union[str, None]) -> str:
 
 def detect_file_type(filepath: str) -> str:
     """파일 경로로 파일 타입 자동 감지"""
-    filename = os.path.basename(filepath)
-    
-    for file_type, patterns in FILE_TYPE_PATTERNS.items():
+    return _detect_file_type_by_name(os.path.basename(filepath))
+
+@functools.lru_cache(maxsize=256)
+def _detect_file_type_by_name(filename: str) -> str:
+    """파일명 기준 타입 판별 (파일명 단위 메모이제이션)"""
+    for file_type, patterns in FILE_TYPE_PATTERNS_COMPILED.items():
         for pattern in patterns:
-            if re.search(pattern, filename, re.IGNORECASE):
+            if pattern.search(filename):
                 return file_type
     
     return 'UNKNOWN'
 
+def xlsx_sheet_names(filepath: str) -> List[str]:
+    """xlsx(ZIP)의 xl/workbook.xml에서 시트명만 읽기 (워크북 파싱 없음, 실패 시 빈 목록)"""
+    try:
+        with zipfile.ZipFile(filepath) as archive:
+            workbook_xml = archive.read('xl/workbook.xml').decode('utf-8', errors='ignore')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return []
+    return [html.unescape(name) for name in XLSX_SHEET_NAME_RE.findall(workbook_xml)]
+
+@functools.lru_cache(maxsize=256)
+def _detect_file_type_by_sheets(filepath: str, mtime: float) -> str:
+    """시트명 기준 타입 판별 ((경로, 수정시각) 단위 메모이제이션)"""
+    sheet_names = [name.lower() for name in xlsx_sheet_names(filepath)]
+    for file_type, keywords in SHEET_TYPE_KEYWORDS.items():
+        if any(keyword in name for name in sheet_names for keyword in keywords):
+            return file_type
+    return 'UNKNOWN'
+
+def detect_file_type_from_sheets(filepath: str) -> str:
+    """파일명으로 판별되지 않는 파일의 보조 판별: ZIP 목록의 시트명 키워드"""
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        return 'UNKNOWN'
+    return _detect_file_type_by_sheets(filepath, mtime)
+
+def select_sheet(sheet_names: List[str], keywords: List[str]) -> str:
+    """시트명에 키워드가 포함된 첫 시트 선택 (없으면 첫 번째 시트)"""
+    for sheet in sheet_names:
+        sheet_lower = sheet.lower()
+        if any(keyword in sheet_lower for keyword in keywords):
+            return sheet
+    return sheet_names[0]
+
+def categorize_movements(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    수집 직후 1회 dtype 정리 (메모리 절감, groupby 가속)
+    - Loc_To / Loc_From / Site / TxType / FILE_TYPE → category
+      (Loc_To·Loc_From은 표준 위치 + 매핑되지 않은 원본 코드까지 포함)
+    - Qty → 정수값만 있으면 int64, 아니면 float64 (고정 폭: 합계/누적에서 오버플로 없음)
+    """
+    fixed_categories = {
+        'TxType': TX_TYPE_CATEGORIES,
+        'FILE_TYPE': FILE_TYPE_CATEGORIES,
+        'Site': SITE_CATEGORIES,
+    }
+    for loc_col in ['Loc_To', 'Loc_From']:
+        if loc_col in df.columns:
+            observed_locs = set(df[loc_col].dropna().astype(str).unique())
+            fixed_categories[loc_col] = sorted(set(LOC_CATEGORIES) | observed_locs)
+    
+    for col, categories in fixed_categories.items():
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col], categories=categories)
+    
+    if 'Qty' in df.columns:
+        qty = pd.to_numeric(df['Qty'])
+        integral = pd.api.types.is_integer_dtype(qty) or (qty.notna().all() and (qty % 1 == 0).all())
+        df['Qty'] = qty.astype(np.int64 if integral else np.float64)
+    return df
+
+def format_year_month(dates: pd.Series) -> pd.Series:
+    """
+    날짜 → 'YYYY-MM' 문자열
+    월 Period(정수 기반)로 factorize 후 고유 월만 문자열 변환 → 행 단위 포맷팅 없음
+    """
+    codes, months = pd.factorize(dates.dt.to_period('M'))
+    labels = np.asarray(months.astype(str), dtype=object)
+    values = np.where(codes >= 0, labels[np.maximum(codes, 0)] if len(labels) else 'NaT', 'NaT')
+    return pd.Series(values, index=dates.index, dtype=object)
+
+def year_month(frame: pd.DataFrame) -> pd.Series:
+    """YearMonth('YYYY-MM') - 파이프라인 입구에서 계산된 컬럼이 있으면 재사용 (날짜 재파싱 방지)"""
+    if 'YearMonth' in frame.columns:
+        return frame['YearMonth']
+    return format_year_month(pd.to_datetime(frame['Date']))
+
+def sum_with_case_count(frame: pd.DataFrame, keys: List[str], sum_cols: List[str]) -> pd.DataFrame:
+    """
+    groupby(keys) 합계 + 고유 Case 수 (Case_No 컬럼)
+    nunique 대신 (keys, Case_No) 중복 제거 후 size → 그룹별 해시셋 생성 없음
+    """
+    totals = frame.groupby(keys, observed=True)[sum_cols].sum()
+    cases = frame.drop_duplicates(keys + ['Case_No']).groupby(keys, observed=True).size()
+    return totals.assign(Case_No=cases).reset_index()
+
+def cumulative_by_month(pivot: pd.DataFrame, key: str) -> pd.DataFrame:
+    """월 피벗(key + 월 컬럼)의 행별 누적합 - 연속 float64 배열에 제자리 np.cumsum"""
+    base = pivot.set_index(key)
+    # 복사본에 누적 (Copy-on-Write에서 to_numpy가 읽기 전용 뷰를 돌려줄 수 있음)
+    arr = np.array(base.to_numpy(dtype=np.float64), dtype=np.float64, order='C')
+    np.cumsum(arr, axis=1, out=arr)
+    return pd.DataFrame(arr, index=base.index, columns=base.columns).reset_index()
+
 def fuzzy_find_column(df: pd.DataFrame, patterns: List[str], threshold: float = 0.7) -> Optional[str]:
     """퍼지 매칭으로 컬럼 찾기"""
     df_cols_lower = [str(col).lower() for col in df.columns]
@@ -138,10 +363,19 @@ def fuzzy_find_column(df: pd.DataFrame, patterns: List[str], threshold: float =
                 return df.columns[i]
     
     # 유사도 매칭
-    from difflib import SequenceMatcher
     best_match = None
     best_ratio = 0
     
+    if RAPIDFUZZ_AVAILABLE:
+        for pattern in patterns:
+            hit = rf_process.extractOne(pattern.lower(), df_cols_lower,
+                                        scorer=rf_fuzz.ratio, score_cutoff=threshold * 100)
+            if hit is not None and hit[1] > best_ratio:
+                best_ratio = hit[1]
+                best_match = df.columns[hit[2]]
+        return best_match
+    
+    from difflib import SequenceMatcher
     for pattern in patterns:
         for i, col in enumerate(df.columns):
             ratio = SequenceMatcher(None, pattern.lower(), str(col).lower()).ratio()
@@ -151,6 +385,21 @@ def fuzzy_find_column(df: pd.DataFrame, patterns: List[str], threshold: float =
     
     return best_match
 
+def relevant_columns(header: pd.DataFrame, pattern_map: Dict[str, List[str]],
+                     column_predicate: Optional[Callable[[str], bool]] = None,
+                     extra: Optional[List[str]] = None, strip_names: bool = False) -> List:
+    """
+    헤더(0행 DataFrame)에서 로더가 실제 사용하는 컬럼만 선별 (read_excel usecols용)
+    strip_names: 로더가 컬럼명을 strip한 뒤 매칭하는 경우 동일 조건으로 매칭
+    """
+    names = [str(col).strip() if strip_names else col for col in header.columns]
+    probe = pd.DataFrame(columns=names)
+    keep = {fuzzy_find_column(probe, patterns) for patterns in pattern_map.values()}
+    keep.update(extra or [])
+    
+    return [col for col, name in zip(header.columns, names)
+            if name in keep or (column_predicate is not None and column_predicate(str(name)))]
+
 # =============================================================================
 # 2. INGESTOR V2 - 파일별 데이터 로딩 엔진
 # =============================================================================
@@ -159,22 +408,39 @@ class DataExtractor:
     """통합 데이터 추출기"""
     
     @staticmethod
-    def extract_case_movements(df: pd.DataFrame, file_type: str, source_file: str) -> List[Dict]:
-        """케이스별 이동 데이터 추출"""
-        movements = []
-        
+    def movement_columns(header: pd.DataFrame) -> List:
+        """창고 파일 사용 컬럼: Case/수량/치수 + 창고·사이트 날짜 컬럼"""
+        return relevant_columns(
+            header, MOVEMENT_COLUMN_PATTERNS,
+            column_predicate=lambda name: bool(WAREHOUSE_COL_RE.search(name) or SITE_COL_RE.search(name)),
+            strip_names=True
+        )
+    
+    @staticmethod
+    def invoice_columns(header: pd.DataFrame) -> List:
+        """인보이스 사용 컬럼: 날짜/Category/비용/Case + Site"""
+        return relevant_columns(header, INVOICE_COLUMN_PATTERNS, extra=['Site'])
+    
+    @staticmethod
+    def onhand_columns(header: pd.DataFrame) -> List:
+        """OnHand 사용 컬럼: 위치/수량/Case"""
+        return relevant_columns(header, ONHAND_COLUMN_PATTERNS)
+    
+    @staticmethod
+    def extract_case_movements(df: pd.DataFrame, file_type: str, source_file: str) -> pd.DataFrame:
+        """케이스별 이동 데이터 추출 (행 = 이동 기록 1건인 long-form DataFrame)"""
         # 기본 컬럼 매핑
-        case_col = fuzzy_find_column(df, ['case', 'carton', 'box', 'mr#', 'sct ship no.', 'case no'])
-        qty_col = fuzzy_find_column(df, ["q'ty", 'qty', 'quantity', 'qty shipped', 'received'])
+        case_col = fuzzy_find_column(df, MOVEMENT_COLUMN_PATTERNS['case'])
+        qty_col = fuzzy_find_column(df, MOVEMENT_COLUMN_PATTERNS['qty'])
         
         if not case_col:
             print(f"   ⚠️ Case 컬럼을 찾을 수 없습니다: {source_file}")
-            return []
+            return pd.DataFrame()
         
         # 치수 컬럼 찾기 및 SQM 계산
-        length_col = fuzzy_find_column(df, ['l(cm)', 'l(m)', 'length'])
-        width_col = fuzzy_find_column(df, ['w(cm)', 'w(m)', 'width']) 
-        height_col = fuzzy_find_column(df, ['h(cm)', 'h(m)', 'height'])
+        length_col = fuzzy_find_column(df, MOVEMENT_COLUMN_PATTERNS['length'])
+        width_col = fuzzy_find_column(df, MOVEMENT_COLUMN_PATTERNS['width'])
+        height_col = fuzzy_find_column(df, MOVEMENT_COLUMN_PATTERNS['height'])
         
         # 창고 및 사이트 컬럼들
         warehouse_cols = []
@@ -182,87 +448,90 @@ class DataExtractor:
         
         for col in df.columns:
             col_str = str(col)
-            if any(wh in col_str for wh in ['DSV', 'MOSB', 'Indoor', 'Outdoor', 'Markaz', 'MZP', 'Hauler', 'DHL', 'AAA', 'Shifting']):
+            if WAREHOUSE_COL_RE.search(col_str):
                 warehouse_cols.append(col)
-            elif any(site in col_str for site in ['DAS', 'MIR', 'SHU', 'AGI']):
+            elif SITE_COL_RE.search(col_str):
                 site_cols.append(col)
         
         print(f"   📦 발견된 창고 컬럼: {warehouse_cols}")
         print(f"   🏗️ 발견된 사이트 컬럼: {site_cols}")
         
-        # 각 행 처리
-        for idx, row in df.iterrows():
-            case_no = str(row[case_col]) if pd.notna(row[case_col]) else f"CASE_{idx}_{source_file}"
-            qty = row[qty_col] if qty_col and pd.notna(row[qty_col]) else 1
-            
-            # SQM 계산
-            sqm = 0
-            if length_col and width_col:
-                length_val = pd.to_numeric(row.get(length_col, 0), errors='coerce') or 0
-                width_val = pd.to_numeric(row.get(width_col, 0), errors='coerce') or 0
-                
-                # cm를 m로 변환
-                if length_col and '(cm)' in str(length_col).lower():
-                    length_val = length_val / 100
-                if width_col and '(cm)' in str(width_col).lower():
-                    width_val = width_val / 100
-                
-                sqm = length_val * width_val * qty
-            
-            # CBM 계산
-            cbm = 0
-            if height_col and sqm > 0:
-                height_val = pd.to_numeric(row.get(height_col, 0), errors='coerce') or 0
-                if '(cm)' in str(height_col).lower():
-                    height_val = height_val / 100
-                cbm = sqm * height_val
-            
-            # 창고 이동 기록
-            for wh_col in warehouse_cols:
-                if pd.notna(row[wh_col]):
-                    date_val = pd.to_datetime(row[wh_col], errors='coerce')
-                    if pd.notna(date_val):
-                        movements.append({
-                            'TxID': f"{case_no}_{wh_col}_{date_val.strftime('%Y%m%d')}",
-                            'Case_No': case_no,
-                            'Date': date_val,
-                            'Loc_From': None,
-                            'Loc_To': map_loc(wh_col),
-                            'Site': map_site(site_col=wh_col),
-                            'Qty': qty,
-                            'SQM': sqm,
-                            'CBM': cbm,
-                            'Cost': 0,
-                            'TxType': 'IN',
-                            'SOURCE_FILE': source_file,
-                            'FILE_TYPE': file_type
-                        })
-            
-            # 사이트 배송 기록
-            for site_col in site_cols:
-                if pd.notna(row[site_col]):
-                    date_val = pd.to_datetime(row[site_col], errors='coerce')
-                    if pd.notna(date_val):
-                        movements.append({
-                            'TxID': f"{case_no}_{site_col}_{date_val.strftime('%Y%m%d')}",
-                            'Case_No': case_no,
-                            'Date': date_val,
-                            'Loc_From': 'WAREHOUSE',
-                            'Loc_To': None,
-                            'Site': map_site(site_col=site_col),
-                            'Qty': qty,
-                            'SQM': sqm,
-                            'CBM': cbm,
-                            'Cost': 0,
-                            'TxType': 'OUT',
-                            'SOURCE_FILE': source_file,
-                            'FILE_TYPE': file_type
-                        })
-        
-        return movements
+        # 컬럼(헤더) → 위치/사이트 매핑은 파일 내 상수이므로 한 번만 계산
+        wh_to_loc = {col: map_loc(col) for col in warehouse_cols}
+        wh_to_site = {col: map_site(site_col=col) for col in warehouse_cols + site_cols}
+        
+        # 수량 및 SQM/CBM 벡터 계산 (cm → m 환산은 헤더 기준)
+        n_rows = len(df)
+
+        def dimension(col) -> np.ndarray:
+            if not col:
+                return np.zeros(n_rows)  # 치수 컬럼 없음 → SQM/CBM 0
+            values = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+            return values / 100 if '(cm)' in str(col).lower() else values
+
+        if qty_col:
+            qty_arr = pd.to_numeric(df[qty_col], errors='coerce').fillna(1).to_numpy()
+        else:
+            qty_arr = np.ones(n_rows, dtype=int)
+
+        sqm_arr, cbm_arr = compute_sqm_cbm(
+            dimension(length_col), dimension(width_col), dimension(height_col),
+            qty_arr.astype(float)
+        )
+
+        # 케이스 번호 (없으면 행 인덱스 기반 대체값)
+        case_values = df[case_col]
+        case_fallback = pd.Series('CASE_' + df.index.astype(str) + f"_{source_file}", index=df.index)
+        case_arr = case_values.astype(str).where(case_values.notna(), case_fallback).to_numpy()
+
+        # 창고/사이트 날짜 컬럼 일괄 파싱 (값별 형식 추론, 이미 datetime64인 컬럼은 그대로 사용)
+        date_df = pd.DataFrame({
+            col: (df[col] if pd.api.types.is_datetime64_any_dtype(df[col])
+                  else to_datetime_mixed(df[col])).reset_index(drop=True)
+            for col in warehouse_cols + site_cols
+        }, index=pd.RangeIndex(n_rows))
+
+        if date_df.columns.empty:
+            return pd.DataFrame()
+
+        # 값이 있는 (행, 컬럼) 위치만 추출: notna 마스크 1회 계산 → np.nonzero (행 우선 순서)
+        # 출력 순서: 창고(IN) 블록 전체 → 사이트(OUT) 블록 전체
+        mask = date_df.notna().to_numpy()
+        n_wh = len(warehouse_cols)
+        in_rows, in_cols = np.nonzero(mask[:, :n_wh])
+        out_rows, out_cols = np.nonzero(mask[:, n_wh:])
+        if in_rows.size + out_rows.size == 0:
+            return pd.DataFrame()
+
+        rows = np.concatenate([in_rows, out_rows])
+        col_pos = np.concatenate([in_cols, out_cols + n_wh])
+        is_in = np.arange(rows.size) < in_rows.size
+
+        long = pd.DataFrame({
+            'col': pd.Series(np.asarray(date_df.columns, dtype=object)[col_pos]),
+            'Date': pd.to_datetime(pd.Series(date_df.to_numpy()[rows, col_pos]))
+        })
+
+        case_no = pd.Series(case_arr[rows])
+        date_str = long['Date'].dt.strftime('%Y%m%d')
+        return pd.DataFrame({
+            'TxID': case_no.str.cat([long['col'].astype(str), date_str], sep='_'),
+            'Case_No': case_no,
+            'Date': long['Date'],
+            'Loc_From': np.where(is_in, None, 'WAREHOUSE'),
+            'Loc_To': long['col'].map(wh_to_loc),
+            'Site': long['col'].map(wh_to_site),
+            'Qty': qty_arr[rows],
+            'SQM': sqm_arr[rows],
+            'CBM': cbm_arr[rows],
+            'Cost': 0.0,  # 숫자 컬럼은 로더 간 동일 dtype(float64) → concat 시 형 변환 없음
+            'TxType': np.where(is_in, 'IN', 'OUT'),
+            'SOURCE_FILE': source_file,
+            'FILE_TYPE': file_type
+        })
     
     @staticmethod
-    def load_warehouse_file(filepath: str) -> List[Dict]:
+    def load_warehouse_file(filepath: str) -> pd.DataFrame:
         """창고 파일 로딩 (개선된 버전)"""
         try:
             print(f"   ✅ {os.path.basename(filepath)} 로딩 시작...")
@@ -271,46 +540,44 @@ class DataExtractor:
             file_type = detect_file_type(filepath)
             print(f"   📋 파일 타입: {file_type}")
             
-            # 시트명 자동 감지
+            # 시트 선택 및 로딩: 첫 번째 시트 우선, 실패 시 데이터가 있는 시트 탐색
+            # (미리보기 재읽기 없이 시트당 한 번만 파싱, 워크북 핸들은 하나만 사용)
+            df = None
             try:
-                # 먼저 첫 번째 시트로 시도
-                df = pd.read_excel(filepath, sheet_name=0, nrows=5)
-                sheet_name = 0
+                df = read_excel_cached(filepath, 0, columns_filter=DataExtractor.movement_columns,
+                                       cache_key=COLUMN_RULES_KEY)
             except Exception as e:
                 print(f"   ⚠️ 첫 번째 시트 읽기 실패: {e}")
-                # 시트명 목록 확인
                 try:
-                    xl_file = pd.ExcelFile(filepath)
-                    sheet_names = xl_file.sheet_names
-                    print(f"   📄 사용 가능한 시트: {sheet_names}")
-                    
-                    # 데이터가 있는 시트 찾기
-                    for sheet in sheet_names:
-                        try:
-                            test_df = pd.read_excel(filepath, sheet_name=sheet, nrows=5)
-                            if not test_df.empty and len(test_df.columns) > 3:
-                                sheet_name = sheet
+                    with pd.ExcelFile(filepath, engine=EXCEL_ENGINE) as xl_file:
+                        print(f"   📄 사용 가능한 시트: {xl_file.sheet_names}")
+                        
+                        # 데이터가 있는 시트 찾기
+                        for sheet in xl_file.sheet_names:
+                            try:
+                                candidate = read_excel_cached(filepath, sheet, excel_file=xl_file,
+                                                              columns_filter=DataExtractor.movement_columns,
+                                                              cache_key=COLUMN_RULES_KEY)
+                            except Exception:
+                                continue
+                            if not candidate.empty and len(candidate.columns) > 3:
+                                df = candidate
                                 print(f"   ✅ 시트 선택: {sheet}")
                                 break
-                        except:
-                            continue
-                    else:
-                        sheet_name = 0  # 기본값
-                except:
-                    sheet_name = 0
+                except Exception as e:
+                    print(f"   ❌ 파일 읽기 실패: {e}")
+                    return pd.DataFrame()
             
-            # 전체 데이터 로딩
-            try:
-                df = pd.read_excel(filepath, sheet_name=sheet_name)
-                print(f"   ✅ {os.path.basename(filepath)} 로딩 완료 ({len(df)}행, 타입: {file_type})")
-            except Exception as e:
-                print(f"   ❌ 파일 읽기 실패: {e}")
-                return []
+            if df is None:
+                print("   ❌ 파일 읽기 실패: 읽을 수 있는 시트가 없습니다")
+                return pd.DataFrame()
+            
+            print(f"   ✅ {os.path.basename(filepath)} 로딩 완료 ({len(df)}행, 타입: {file_type})")
             
             # 빈 데이터프레임 체크
             if df.empty:
                 print(f"   ⚠️ 빈 데이터프레임")
-                return []
+                return pd.DataFrame()
             
             # 컬럼명 정리
             df.columns = [str(col).strip() for col in df.columns]
@@ -321,138 +588,140 @@ class DataExtractor:
             
         except Exception as e:
             print(f"   ❌ 파일 처리 중 오류: {e}")
-            return []
+            return pd.DataFrame()
     
     @staticmethod
-    def load_invoice(filepath: str) -> List[Dict]:
+    def load_invoice(filepath: str) -> pd.DataFrame:
         """인보이스 파일 로딩 (TxType='COST')"""
         try:
-            xl_file = pd.ExcelFile(filepath)
+            xl_file = pd.ExcelFile(filepath, engine=EXCEL_ENGINE)
             
             # 인보이스 시트 찾기
-            sheet_name = xl_file.sheet_names[0]
-            for sheet in xl_file.sheet_names:
-                if any(keyword in sheet.lower() for keyword in ['invoice', 'cost', 'billing']):
-                    sheet_name = sheet
-                    break
+            sheet_name = select_sheet(xl_file.sheet_names, SHEET_TYPE_KEYWORDS['INVOICE'])
             
-            df = pd.read_excel(filepath, sheet_name=sheet_name)
+            df = read_excel_cached(filepath, sheet_name, excel_file=xl_file,
+                                   columns_filter=DataExtractor.invoice_columns,
+                                   cache_key=COLUMN_RULES_KEY)
             
             # 컬럼 매핑
-            date_col = fuzzy_find_column(df, ['date', 'month', 'operation month', 'period'])
-            category_col = fuzzy_find_column(df, ['category', 'location', 'warehouse', 'type'])
-            cost_col = fuzzy_find_column(df, ['total', 'cost', 'amount', 'value', 'price'])
-            case_col = fuzzy_find_column(df, ['case', 'case no', 'case number'])
+            date_col = fuzzy_find_column(df, INVOICE_COLUMN_PATTERNS['date'])
+            category_col = fuzzy_find_column(df, INVOICE_COLUMN_PATTERNS['category'])
+            cost_col = fuzzy_find_column(df, INVOICE_COLUMN_PATTERNS['cost'])
+            case_col = fuzzy_find_column(df, INVOICE_COLUMN_PATTERNS['case'])
             
             if not cost_col:
                 print(f"   ⚠️ Cost 컬럼을 찾을 수 없습니다: {filepath}")
-                return []
+                return pd.DataFrame()
             
-            movements = []
+            # 컬럼 단위 일괄 변환 (행별 row[...] / row.get 조회 제거)
+            source_name = os.path.basename(filepath)
+            idx_str = df.index.astype(str).to_series(index=df.index)
             
-            for idx, row in df.iterrows():
-                # 날짜 처리
-                if date_col and pd.notna(row[date_col]):
-                    date_val = pd.to_datetime(row[date_col], errors='coerce')
-                else:
-                    date_val = datetime.now()
-                
-                # 위치 매핑
-                location = "UNKNOWN"
-                if category_col and pd.notna(row[category_col]):
-                    location = map_category(row[category_col])
-                
-                # 비용
-                cost_val = pd.to_numeric(row[cost_col], errors='coerce') or 0
-                
-                # 케이스 번호
-                case_no = f"COST_{idx}_{os.path.basename(filepath)}"
-                if case_col and pd.notna(row[case_col]):
-                    case_no = str(row[case_col])
-                
-                movements.append({
-                    'TxID': f"COST_{idx}_{date_val.strftime('%Y%m')}",
-                    'Case_No': case_no,
-                    'Date': date_val,
-                    'Loc_From': None,
-                    'Loc_To': location,
-                    'Site': map_site(site_col=row.get('Site')),
-                    'Qty': 0,  # 비용은 수량 없음
-                    'SQM': 0,
-                    'CBM': 0,
-                    'Cost': cost_val,
-                    'TxType': 'COST',
-                    'SOURCE_FILE': os.path.basename(filepath),
-                    'FILE_TYPE': 'INVOICE'
-                })
+            # 날짜 (없거나 변환 불가 → 현재 시각)
+            if date_col:
+                dates = to_datetime_mixed(df[date_col]).fillna(pd.Timestamp(datetime.now()))
+            else:
+                dates = pd.Series(pd.Timestamp(datetime.now()), index=df.index)
+            
+            # 위치 매핑
+            if category_col:
+                locations = df[category_col].map(map_category)
+            else:
+                locations = pd.Series("UNKNOWN", index=df.index)
+            
+            # 케이스 번호 (없으면 행 인덱스 기반 대체값)
+            case_fallback = 'COST_' + idx_str + f"_{source_name}"
+            if case_col:
+                case_nos = df[case_col].astype(str).where(df[case_col].notna(), case_fallback)
+            else:
+                case_nos = case_fallback
+            
+            sites = df['Site'].map(lambda site: map_site(site_col=site)) if 'Site' in df.columns else "UNK"
+            
+            movements = pd.DataFrame({
+                'TxID': 'COST_' + idx_str + '_' + dates.dt.strftime('%Y%m'),
+                'Case_No': case_nos,
+                'Date': dates,
+                'Loc_From': None,
+                'Loc_To': locations,
+                'Site': sites,
+                'Qty': 0,  # 비용은 수량 없음
+                'SQM': 0.0,
+                'CBM': 0.0,
+                'Cost': pd.to_numeric(df[cost_col], errors='coerce'),
+                'TxType': 'COST',
+                'SOURCE_FILE': source_name,
+                'FILE_TYPE': 'INVOICE'
+            }, index=df.index).reset_index(drop=True)
             
             print(f"   ✅ Invoice 파일 로딩 완료: {len(movements)}건")
             return movements
             
         except Exception as e:
             print(f"   ❌ Invoice 파일 로딩 실패: {e}")
-            return []
+            return pd.DataFrame()
     
     @staticmethod
-    def load_onhand_snapshot(filepath: str) -> List[Dict]:
+    def load_onhand_snapshot(filepath: str) -> pd.DataFrame:
         """OnHand 재고 스냅샷 로딩"""
         try:
-            xl_file = pd.ExcelFile(filepath)
+            xl_file = pd.ExcelFile(filepath, engine=EXCEL_ENGINE)
             
             # OnHand 시트 찾기
-            sheet_name = xl_file.sheet_names[0]
-            for sheet in xl_file.sheet_names:
-                if any(keyword in sheet.lower() for keyword in ['onhand', 'stock', 'inventory']):
-                    sheet_name = sheet
-                    break
+            sheet_name = select_sheet(xl_file.sheet_names, SHEET_TYPE_KEYWORDS['ONHAND'])
             
-            df = pd.read_excel(filepath, sheet_name=sheet_name)
+            df = read_excel_cached(filepath, sheet_name, excel_file=xl_file,
+                                   columns_filter=DataExtractor.onhand_columns,
+                                   cache_key=COLUMN_RULES_KEY)
             
             # 컬럼 매핑
-            loc_col = fuzzy_find_column(df, ['location', 'warehouse', 'loc', 'place'])
-            qty_col = fuzzy_find_column(df, ['quantity', 'qty', 'stock', 'count'])
-            case_col = fuzzy_find_column(df, ['case', 'case no', 'item'])
+            loc_col = fuzzy_find_column(df, ONHAND_COLUMN_PATTERNS['loc'])
+            qty_col = fuzzy_find_column(df, ONHAND_COLUMN_PATTERNS['qty'])
+            case_col = fuzzy_find_column(df, ONHAND_COLUMN_PATTERNS['case'])
             
             if not qty_col:
                 print(f"   ⚠️ Quantity 컬럼을 찾을 수 없습니다: {filepath}")
-                return []
+                return pd.DataFrame()
             
-            movements = []
             snapshot_date = datetime.now()
+            source_name = os.path.basename(filepath)
+            idx_str = df.index.astype(str).to_series(index=df.index)
+            
+            # 위치 정규화 (컬럼 단위 일괄 처리)
+            if loc_col:
+                locations = map_loc_series(df[loc_col])
+            else:
+                locations = pd.Series("UNKNOWN", index=df.index)
+            
+            # 케이스 번호 (없으면 행 인덱스 기반 대체값)
+            case_fallback = 'SNAP_' + idx_str + f"_{source_name}"
+            if case_col:
+                case_nos = df[case_col].astype(str).where(df[case_col].notna(), case_fallback)
+            else:
+                case_nos = case_fallback
             
-            for idx, row in df.iterrows():
-                location = "UNKNOWN"
-                if loc_col and pd.notna(row[loc_col]):
-                    location = map_loc(row[loc_col])
-                
-                qty_val = pd.to_numeric(row[qty_col], errors='coerce') or 0
-                
-                case_no = f"SNAP_{idx}_{os.path.basename(filepath)}"
-                if case_col and pd.notna(row[case_col]):
-                    case_no = str(row[case_col])
-                
-                movements.append({
-                    'TxID': f"SNAP_{idx}_{snapshot_date.strftime('%Y%m%d')}",
-                    'Case_No': case_no,
-                    'Date': snapshot_date,
-                    'Loc_From': None,
-                    'Loc_To': location,
-                    'Site': "UNK",
-                    'Qty': qty_val,
-                    'SQM': 0,
-                    'CBM': 0,
-                    'Cost': 0,
-                    'TxType': 'SNAP',
-                    'SOURCE_FILE': os.path.basename(filepath),
-                    'FILE_TYPE': 'ONHAND'
-                })
+            movements = pd.DataFrame({
+                'TxID': 'SNAP_' + idx_str + f"_{snapshot_date.strftime('%Y%m%d')}",
+                'Case_No': case_nos,
+                'Date': snapshot_date,
+                'Loc_From': None,
+                'Loc_To': locations,
+                'Site': "UNK",
+                'Qty': pd.to_numeric(df[qty_col], errors='coerce'),
+                'SQM': 0.0,
+                'CBM': 0.0,
+                'Cost': 0.0,
+                'TxType': 'SNAP',
+                'SOURCE_FILE': source_name,
+                'FILE_TYPE': 'ONHAND'
+            }, index=df.index).reset_index(drop=True)
             
             print(f"   ✅ OnHand 파일 로딩 완료: {len(movements)}건")
             return movements
             
         except Exception as e:
             print(f"   ❌ OnHand 파일 로딩 실패: {e}")
-            return []
+            return pd.DataFrame()
 
 # =============================================================================
 # 3. CORRECTED STOCK ENGINE - 수정된 재고 계산 엔진
@@ -461,32 +730,31 @@ class DataExtractor:
 class StockEngine:
     """수정된 HVDC 재고 계산 엔진"""
     
+    @staticmethod
+    def _tx_type_upper(tx_type: pd.Series) -> pd.Series:
+        """TxType 대문자 정규화 → category (이후 비교는 정수 코드 비교)"""
+        return tx_type.astype('category').str.upper().astype('category')
+    
     @staticmethod
     def _expand_transfer(tx: pd.DataFrame) -> pd.DataFrame:
         """TxType='TRANSFER' 1행 → OUT+IN 2행 분리"""
         if tx.empty:
             return tx
             
-        transfer_mask = tx['TxType'].str.upper() == 'TRANSFER'
-        transfers = tx[transfer_mask].copy()
+        transfer_mask = (StockEngine._tx_type_upper(tx['TxType']) == 'TRANSFER').to_numpy()
         
-        if transfers.empty:
+        if not transfer_mask.any():
             return tx
         
-        # OUT 기록 (Loc_From에서 나감)
-        out_records = transfers.copy()
-        out_records['TxType'] = 'OUT'
-        out_records['Loc_To'] = pd.NA
-        
-        # IN 기록 (Loc_To로 들어감)
-        in_records = transfers.copy()
-        in_records['TxType'] = 'IN'  
-        in_records['Loc_From'] = pd.NA
+        # TRANSFER 행을 2번씩 복제: 짝수 = OUT (Loc_From에서 나감), 홀수 = IN (Loc_To로 들어감)
+        expanded = tx.iloc[np.repeat(np.flatnonzero(transfer_mask), 2)].reset_index(drop=True)
+        is_in = np.arange(len(expanded)) % 2 == 1
+        expanded.loc[~is_in, 'Loc_To'] = pd.NA
+        expanded.loc[is_in, 'Loc_From'] = pd.NA
+        expanded['TxType'] = np.where(is_in, 'IN', 'OUT')
         
         # 원본에서 TRANSFER 제거하고 분해된 기록 추가
-        non_transfers = tx[~transfer_mask].copy()
-        
-        return pd.concat([non_transfers, out_records, in_records], ignore_index=True)
+        return pd.concat([tx.iloc[~transfer_mask], expanded], ignore_index=True)
     
     @staticmethod
     def stock_daily(tx: pd.DataFrame) -> pd.DataFrame:
@@ -499,22 +767,17 @@ class StockEngine:
         # TRANSFER 분해
         tx_expanded = StockEngine._expand_transfer(tx).copy()
         
+        # TxType 정규화 1회 (대문자 category)
+        tx_type = StockEngine._tx_type_upper(tx_expanded['TxType'])
+        is_in = tx_type == 'IN'
+        is_out = tx_type == 'OUT'
+        
         # 위치 정보 정리 (IN은 Loc_To, OUT은 Loc_From)
-        tx_expanded['Loc'] = np.where(
-            tx_expanded['TxType'].str.upper() == 'IN',
-            tx_expanded['Loc_To'],
-            tx_expanded['Loc_From']
-        )
+        tx_expanded['Loc'] = np.where(is_in, tx_expanded['Loc_To'], tx_expanded['Loc_From'])
         
-        # 입출고 구분
-        tx_expanded['Inbound'] = np.where(
-            tx_expanded['TxType'].str.upper() == 'IN',
-            tx_expanded['Qty'], 0
-        )
-        tx_expanded['Outbound'] = np.where(
-            tx_expanded['TxType'].str.upper() == 'OUT', 
-            tx_expanded['Qty'], 0
-        )
+        # 입출고 구분 (Qty dtype 유지)
+        tx_expanded['Inbound'] = tx_expanded['Qty'].where(is_in, 0)
+        tx_expanded['Outbound'] = tx_expanded['Qty'].where(is_out, 0)
         
         # 날짜별 집계
         tx_expanded['Date'] = pd.to_datetime(tx_expanded['Date']).dt.date
@@ -524,187 +787,193 @@ class StockEngine:
             'SQM': 'sum'
         })
         
-        # 각 위치별로 누적 계산
-        snapshots = []
-        for loc in daily['Loc'].unique():
-            if pd.isna(loc) or loc == 'UNKNOWN':
-                continue
-                
-            loc_data = daily[daily['Loc'] == loc].copy()
-            loc_data = loc_data.set_index('Date').sort_index()
-            
-            # 수정된 재고 계산: Opening = 전일 Closing
-            loc_data['Opening'] = 0  # 초기값
-            loc_data['Closing'] = 0  # 초기값
-            
-            for i in range(len(loc_data)):
-                if i == 0:
-                    # 첫 번째 날: Opening = 0, Closing = Inbound - Outbound
-                    loc_data.iloc[i, loc_data.columns.get_loc('Opening')] = 0
-                    loc_data.iloc[i, loc_data.columns.get_loc('Closing')] = (
-                        loc_data.iloc[i]['Inbound'] - loc_data.iloc[i]['Outbound']
-                    )
-                else:
-                    # 이후 날들: Opening = 전일 Closing, Closing = Opening + Inbound - Outbound
-                    prev_closing = loc_data.iloc[i-1]['Closing']
-                    loc_data.iloc[i, loc_data.columns.get_loc('Opening')] = prev_closing
-                    loc_data.iloc[i, loc_data.columns.get_loc('Closing')] = (
-                        prev_closing + loc_data.iloc[i]['Inbound'] - loc_data.iloc[i]['Outbound']
-                    )
-            
-            loc_data['Loc'] = loc
-            
-            snapshots.append(loc_data.reset_index().rename(columns={'index': 'Date'}))
+        # 각 위치별로 누적 계산 (위치·날짜 정렬 후 그룹별 cumsum)
+        # Opening = 전일 Closing (첫날 0), Closing = Opening + Inbound - Outbound
+        daily = daily[daily['Loc'].notna() & (daily['Loc'] != 'UNKNOWN')]
+        if daily.empty:
+            return pd.DataFrame()
+        
+        daily = daily.sort_values(['Loc', 'Date']).reset_index(drop=True)
+        
+        # 정렬된 배열을 한 번 훑으며 누적 (groupby 해시 대신 위치 경계 플래그 사용)
+        loc_values = daily['Loc'].to_numpy()
+        group_start = np.ones(len(daily), dtype=np.bool_)
+        group_start[1:] = loc_values[1:] != loc_values[:-1]
+        inbound = daily['Inbound'].to_numpy(dtype=np.float64)
+        outbound = daily['Outbound'].to_numpy(dtype=np.float64)
+        opening, closing = stock_sweep(inbound - outbound, group_start)
+        daily['Opening'] = opening
+        daily['Closing'] = closing
         
-        if snapshots:
-            result = pd.concat(snapshots, ignore_index=True)
-            return result[['Loc', 'Date', 'Opening', 'Inbound', 'Outbound', 'Closing', 'SQM']].sort_values(['Loc', 'Date'])
+        return daily[['Loc', 'Date', 'Opening', 'Inbound', 'Outbound', 'Closing', 'SQM']]
+    
+    MONTHLY_KEYS = ['Location', 'YearMonth', 'TxType']
+    
+    @staticmethod
+    def _monthly_events(df: pd.DataFrame) -> pd.DataFrame:
+        """월별 분석 1단계: 트랜잭션 정규화 (각 이벤트를 별도 행으로, 마스크 슬라이스 + concat)"""
+        dates = pd.to_datetime(df['Date'])
+        events = pd.DataFrame({
+            'Case_No': df['Case_No'],
+            'Date': dates,
+            'YearMonth': year_month(df),
+            'Qty': df['Qty'],
+            'SQM': df['SQM']
+        })
+        no_event = pd.Series(False, index=df.index)
+        
+        # 창고 입고 이벤트들
+        # 위치 값도 같은 마스크로 잘라 전달 (빈 슬라이스에 전체 Series를 assign하면 그 인덱스로 행이 생김)
+        if 'Loc_To' in df.columns:
+            in_mask = df['Loc_To'].notna()
+            in_df = events[in_mask].assign(Location=df.loc[in_mask, 'Loc_To'].astype(object), TxType='IN')
         else:
-            return pd.DataFrame()
+            in_df = events[no_event].assign(Location=None, TxType='IN')
+        
+        # 창고 출고 이벤트들 (사이트로 배송, 출고는 마지막 창고에서 발생)
+        out_mask = (df['Site'].notna() & (df['TxType'] == 'OUT')) if 'Site' in df.columns else no_event
+        last_warehouse = df.loc[out_mask, 'Loc_From'] if 'Loc_From' in df.columns else 'UNKNOWN'
+        out_df = events[out_mask].assign(Location=last_warehouse, TxType='OUT')
+        
+        return pd.concat([in_df, out_df], ignore_index=True)[
+            ['Case_No', 'Date', 'YearMonth', 'Location', 'TxType', 'Qty', 'SQM']
+        ]
+    
+    @staticmethod
+    def _monthly_summary_pandas(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """월별 분석 1~2단계 (pandas): 이벤트 정규화 + (창고, 월, TxType) 집계"""
+        tx_df = StockEngine._monthly_events(df)
+        monthly_summary = sum_with_case_count(tx_df, StockEngine.MONTHLY_KEYS, ['Qty', 'SQM'])
+        return tx_df, monthly_summary
     
     @staticmethod
-    def create_proper_monthly_warehouse_analysis(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-        """올바른 창고별 월별 입출고 재고 분석"""
+    def _monthly_summary_chunked(df: pd.DataFrame, chunksize: int) -> Tuple[pd.DataFrame, List[str], List[str]]:
+        """
+        월별 분석 1~2단계 (청크 단위): 이벤트 프레임 전체를 만들지 않고 부분 집계 후 병합
+        고유 Case 수는 청크별 (키, Case_No) 중복 제거 결과를 합쳐 다시 중복 제거
+        """
+        keys = StockEngine.MONTHLY_KEYS
+        partial_sums, partial_cases = [], []
+        months, locations = set(), set()
         
-        if df.empty:
-            return {}
+        for start in range(0, len(df), chunksize):
+            events = StockEngine._monthly_events(df.iloc[start:start + chunksize])
+            partial_sums.append(events.groupby(keys, observed=True)[['Qty', 'SQM']].sum())
+            partial_cases.append(events[keys + ['Case_No']].drop_duplicates())
+            months.update(events['YearMonth'].unique())
+            locations.update(events['Location'].dropna().unique())
         
-        # 1. 트랜잭션 정규화 (각 이벤트를 별도 행으로)
-        transactions = []
+        totals = pd.concat(partial_sums).groupby(level=keys).sum()
+        cases = pd.concat(partial_cases).drop_duplicates().groupby(keys, observed=True).size()
+        monthly_summary = totals.assign(Case_No=cases).reset_index()
         
-        for _, row in df.iterrows():
-            case_no = row['Case_No']
-            qty = row['Qty']
-            sqm = row['SQM']
-            
-            # 창고 입고 이벤트들
-            if pd.notna(row.get('Loc_To')):
-                transactions.append({
-                    'Case_No': case_no,
-                    'Date': pd.to_datetime(row['Date']),
-                    'YearMonth': pd.to_datetime(row['Date']).strftime('%Y-%m'),
-                    'Location': row['Loc_To'],
-                    'TxType': 'IN',
-                    'Qty': qty,
-                    'SQM': sqm
-                })
-            
-            # 창고 출고 이벤트들 (사이트로 배송)
-            if pd.notna(row.get('Site')) and row['TxType'] == 'OUT':
-                # 출고는 마지막 창고에서 발생
-                last_warehouse = row.get('Loc_From', 'UNKNOWN')
-                transactions.append({
-                    'Case_No': case_no,
-                    'Date': pd.to_datetime(row['Date']),
-                    'YearMonth': pd.to_datetime(row['Date']).strftime('%Y-%m'),
-                    'Location': last_warehouse,
-                    'TxType': 'OUT',
-                    'Qty': qty,
-                    'SQM': sqm
-                })
-        
-        tx_df = pd.DataFrame(transactions)
-        
-        if tx_df.empty:
+        all_locations = [loc for loc in sorted(locations) if loc != 'UNKNOWN']
+        return monthly_summary, sorted(months), all_locations
+    
+    @staticmethod
+    def _monthly_summary_polars(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """월별 분석 1~2단계 (Polars LazyFrame): 필터/집계를 한 쿼리 플랜으로 실행"""
+        frame = df[['Case_No', 'Date', 'Qty', 'SQM', 'Loc_To', 'Loc_From', 'Site', 'TxType']].copy()
+        frame['Date'] = pd.to_datetime(frame['Date'])
+        for col in ['Case_No', 'Loc_To', 'Loc_From', 'Site', 'TxType']:
+            frame[col] = frame[col].astype(object).where(frame[col].notna(), None)
+        
+        lf = pl.from_pandas(frame).lazy().with_columns(
+            pl.col(['Case_No', 'Loc_To', 'Loc_From', 'Site', 'TxType']).cast(pl.Utf8),
+            pl.col('Date').dt.strftime('%Y-%m').alias('YearMonth')
+        )
+        event_cols = [pl.col('Case_No'), pl.col('Date'), pl.col('YearMonth')]
+        
+        # 1. 트랜잭션 정규화: 입고(Loc_To 존재) + 출고(사이트 배송, 마지막 창고 = Loc_From)
+        in_lf = lf.filter(pl.col('Loc_To').is_not_null()).select(
+            event_cols + [pl.col('Loc_To').alias('Location'), pl.lit('IN').alias('TxType'),
+                          pl.col('Qty'), pl.col('SQM')]
+        )
+        out_lf = lf.filter(pl.col('Site').is_not_null() & (pl.col('TxType') == 'OUT')).select(
+            event_cols + [pl.col('Loc_From').alias('Location'), pl.lit('OUT').alias('TxType'),
+                          pl.col('Qty'), pl.col('SQM')]
+        )
+        tx_lf = pl.concat([in_lf, out_lf])
+        
+        # 2. 월별 창고별 입출고 집계 (pandas groupby와 동일: 위치 없는 행 제외, 키 정렬)
+        summary_lf = (
+            tx_lf.filter(pl.col('Location').is_not_null() & pl.col('YearMonth').is_not_null())
+            .group_by(['Location', 'YearMonth', 'TxType'])
+            .agg([pl.col('Qty').sum(), pl.col('SQM').sum(), pl.col('Case_No').n_unique()])
+            .sort(['Location', 'YearMonth', 'TxType'])
+        )
+        
+        tx_pl, summary_pl = pl.collect_all([tx_lf, summary_lf])
+        return tx_pl.to_pandas(), summary_pl.to_pandas()
+    
+    @staticmethod
+    def create_proper_monthly_warehouse_analysis(df: pd.DataFrame, engine: str = ANALYTICS_ENGINE,
+                                                 chunksize: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        올바른 창고별 월별 입출고 재고 분석
+        engine='polars': 정규화·집계 단계를 Polars로 실행 (미설치 시 pandas)
+        chunksize: pandas 엔진에서 입력을 청크 단위로 집계 (대용량 입력 메모리 절감)
+        """
+        
+        if df.empty:
             return {}
         
-        # 2. 월별 창고별 입출고 집계
-        monthly_summary = tx_df.groupby(['Location', 'YearMonth', 'TxType']).agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
+        # 1~2. 트랜잭션 정규화 + 월별 창고별 입출고 집계
+        # 4. 전체 월 범위 생성 (빈 월 0으로 채우기)
+        if engine == 'polars' and POLARS_AVAILABLE and {'Loc_To', 'Loc_From', 'Site'} <= set(df.columns):
+            tx_df, monthly_summary = StockEngine._monthly_summary_polars(df)
+        elif chunksize and len(df) > chunksize:
+            tx_df = None
+            monthly_summary, all_months, all_locations = StockEngine._monthly_summary_chunked(df, chunksize)
+            if not all_months:
+                return {}
+        else:
+            tx_df, monthly_summary = StockEngine._monthly_summary_pandas(df)
+        
+        if tx_df is not None:
+            if tx_df.empty:
+                return {}
+            all_months = sorted(tx_df['YearMonth'].unique())
+            all_locations = [loc for loc in sorted(tx_df['Location'].dropna().unique()) if loc != 'UNKNOWN']
         
         # 3. 입고/출고 분리
         inbound = monthly_summary[monthly_summary['TxType'] == 'IN'].copy()
         outbound = monthly_summary[monthly_summary['TxType'] == 'OUT'].copy()
         
-        # 4. 전체 월 범위 생성 (빈 월 0으로 채우기)
-        all_months = sorted(tx_df['YearMonth'].unique())
-        all_locations = sorted(tx_df['Location'].unique())
-        
-        # 5. 각 창고별로 월별 재고 계산
-        stock_results = []
+        def monthly_matrix(frame: pd.DataFrame, value: str) -> pd.DataFrame:
+            """(창고 × 월) 밀집 행렬, 빈 칸은 0"""
+            if frame.empty:
+                return pd.DataFrame(0.0, index=pd.Index(all_locations, name='Location'),
+                                    columns=pd.Index(all_months, name='YearMonth'))
+            matrix = pivot_by_month(frame, 'Location', value, engine)
+            return matrix.reindex(index=all_locations, columns=all_months, fill_value=0).rename_axis(
+                index='Location', columns='YearMonth')
+        
+        # 5. 각 창고별로 월별 재고 계산 (Opening = 전월 Closing, 첫 월 0)
+        inbound_qty = monthly_matrix(inbound, 'Qty')
+        outbound_qty = monthly_matrix(outbound, 'Qty')
+        net_movement = inbound_qty - outbound_qty
+        closing_stock = net_movement.cumsum(axis=1)
+        opening_stock = closing_stock.shift(1, axis=1, fill_value=0)
+        
+        stock_df = pd.DataFrame({
+            'Opening_Stock': opening_stock.stack(),
+            'Inbound_Qty': inbound_qty.stack(),
+            'Outbound_Qty': outbound_qty.stack(),
+            'Closing_Stock': closing_stock.stack(),
+            'Inbound_SQM': monthly_matrix(inbound, 'SQM').stack(),
+            'Outbound_SQM': monthly_matrix(outbound, 'SQM').stack(),
+            'Net_Movement': net_movement.stack()
+        }).reset_index()
         
-        for location in all_locations:
-            if location == 'UNKNOWN':
-                continue
-                
-            location_stock = []
-            opening_stock = 0  # 초기 재고
-            
-            for month in all_months:
-                # 해당 월 입고량
-                month_inbound = inbound[
-                    (inbound['Location'] == location) & 
-                    (inbound['YearMonth'] == month)
-                ]['Qty'].sum()
-                
-                # 해당 월 출고량
-                month_outbound = outbound[
-                    (outbound['Location'] == location) & 
-                    (outbound['YearMonth'] == month)
-                ]['Qty'].sum()
-                
-                # 해당 월 입고 면적
-                month_inbound_sqm = inbound[
-                    (inbound['Location'] == location) & 
-                    (inbound['YearMonth'] == month)
-                ]['SQM'].sum()
-                
-                # 해당 월 출고 면적
-                month_outbound_sqm = outbound[
-                    (outbound['Location'] == location) & 
-                    (outbound['YearMonth'] == month)
-                ]['SQM'].sum()
-                
-                # 재고 계산
-                closing_stock = opening_stock + month_inbound - month_outbound
-                
-                location_stock.append({
-                    'Location': location,
-                    'YearMonth': month,
-                    'Opening_Stock': opening_stock,
-                    'Inbound_Qty': month_inbound,
-                    'Outbound_Qty': month_outbound,
-                    'Closing_Stock': closing_stock,
-                    'Inbound_SQM': month_inbound_sqm,
-                    'Outbound_SQM': month_outbound_sqm,
-                    'Net_Movement': month_inbound - month_outbound
-                })
-                
-                # 다음 월의 opening은 이번 월의 closing
-                opening_stock = closing_stock
-            
-            stock_results.extend(location_stock)
-        
-        stock_df = pd.DataFrame(stock_results)
-        
-        # 6. 피벗 테이블들 생성
-        inbound_pivot = stock_df.pivot_table(
-            index='Location', 
-            columns='YearMonth', 
-            values='Inbound_Qty', 
-            fill_value=0
-        ).reset_index()
-        
-        outbound_pivot = stock_df.pivot_table(
-            index='Location', 
-            columns='YearMonth', 
-            values='Outbound_Qty', 
-            fill_value=0
-        ).reset_index()
-        
-        closing_stock_pivot = stock_df.pivot_table(
-            index='Location', 
-            columns='YearMonth', 
-            values='Closing_Stock', 
-            fill_value=0
-        ).reset_index()
+        # 6. 피벗 테이블들 생성 (5단계의 창고 × 월 행렬을 그대로 사용, 재집계 없음)
+        inbound_pivot = inbound_qty.reset_index()
+        outbound_pivot = outbound_qty.reset_index()
+        closing_stock_pivot = closing_stock.reset_index()
         
         # 7. 누적 통계
-        cumulative_inbound = inbound_pivot.set_index('Location').cumsum(axis=1).reset_index()
-        cumulative_outbound = outbound_pivot.set_index('Location').cumsum(axis=1).reset_index()
+        cumulative_inbound = cumulative_by_month(inbound_pivot, 'Location')
+        cumulative_outbound = cumulative_by_month(outbound_pivot, 'Location')
         
         return {
             'monthly_stock_detail': stock_df,
@@ -727,44 +996,55 @@ class StockEngine:
         errors = []
         warnings = []
         
-        # 1. 재고 무결성 검증
-        for _, row in stock_df.iterrows():
-            expected_closing = row['Opening_Stock'] + row['Inbound_Qty'] - row['Outbound_Qty']
-            if abs(row['Closing_Stock'] - expected_closing) > 0.01:
-                errors.append(f"Stock mismatch for {row['Location']} {row['YearMonth']}: "
-                            f"Expected {expected_closing}, Got {row['Closing_Stock']}")
+        # 1. 재고 무결성 검증 (불일치 행만 메시지 생성)
+        stock_df = stock_df.assign(
+            Expected_Closing=stock_df['Opening_Stock'] + stock_df['Inbound_Qty'] - stock_df['Outbound_Qty']
+        )
+        mismatch = (stock_df['Closing_Stock'] - stock_df['Expected_Closing']).abs() > 0.01
+        errors.extend([
+            f"Stock mismatch for {location} {month}: Expected {expected}, Got {closing}"
+            for location, month, expected, closing in stock_df.loc[
+                mismatch, ['Location', 'YearMonth', 'Expected_Closing', 'Closing_Stock']
+            ].itertuples(index=False, name=None)
+        ])
         
         # 2. 연속성 검증 (다음 월 Opening = 이전 월 Closing)
-        for location in stock_df['Location'].unique():
-            loc_data = stock_df[stock_df['Location'] == location].sort_values('YearMonth')
-            
-            for i in range(1, len(loc_data)):
-                prev_closing = loc_data.iloc[i-1]['Closing_Stock']
-                curr_opening = loc_data.iloc[i]['Opening_Stock']
-                
-                if abs(prev_closing - curr_opening) > 0.01:
-                    errors.append(f"Continuity error for {location}: "
-                                f"Month {loc_data.iloc[i-1]['YearMonth']} closing {prev_closing} "
-                                f"!= Month {loc_data.iloc[i]['YearMonth']} opening {curr_opening}")
+        ordered = stock_df.sort_values(['Location', 'YearMonth'], kind='stable')
+        by_location = ordered.groupby('Location', sort=False)
+        ordered = ordered.assign(
+            Prev_Month=by_location['YearMonth'].shift(1),
+            Prev_Closing=by_location['Closing_Stock'].shift(1)
+        )
+        continuity_bad = ordered['Prev_Closing'].notna() & (
+            (ordered['Prev_Closing'] - ordered['Opening_Stock']).abs() > 0.01
+        )
+        errors.extend([
+            f"Continuity error for {location}: "
+            f"Month {prev_month} closing {prev_closing} != Month {month} opening {opening}"
+            for location, prev_month, prev_closing, month, opening in ordered.loc[
+                continuity_bad, ['Location', 'Prev_Month', 'Prev_Closing', 'YearMonth', 'Opening_Stock']
+            ].itertuples(index=False, name=None)
+        ])
         
         # 3. 음수 재고 경고
         negative_stock = stock_df[stock_df['Closing_Stock'] < 0]
         if not negative_stock.empty:
             warnings.append(f"Found {len(negative_stock)} instances of negative stock")
         
-        # 4. 입출고 균형 검증
-        for location in stock_df['Location'].unique():
-            loc_data = stock_df[stock_df['Location'] == location]
-            total_inbound = loc_data['Inbound_Qty'].sum()
-            total_outbound = loc_data['Outbound_Qty'].sum()
-            final_stock = loc_data['Closing_Stock'].iloc[-1]
-            
-            # 총 입고 - 총 출고 = 최종 재고 (초기 재고가 0이라고 가정)
-            expected_final = total_inbound - total_outbound
-            if abs(final_stock - expected_final) > 0.01:
-                errors.append(f"Balance error for {location}: "
-                            f"Total In({total_inbound}) - Total Out({total_outbound}) "
-                            f"= {expected_final}, but final stock is {final_stock}")
+        # 4. 입출고 균형 검증: 총 입고 - 총 출고 = 최종 재고 (초기 재고가 0이라고 가정)
+        balance = stock_df.groupby('Location', sort=False).agg(
+            Total_In=('Inbound_Qty', 'sum'),
+            Total_Out=('Outbound_Qty', 'sum'),
+            Final_Stock=('Closing_Stock', 'last')
+        )
+        balance['Expected_Final'] = balance['Total_In'] - balance['Total_Out']
+        unbalanced = (balance['Final_Stock'] - balance['Expected_Final']).abs() > 0.01
+        errors.extend([
+            f"Balance error for {location}: "
+            f"Total In({total_in}) - Total Out({total_out}) "
+            f"= {expected_final}, but final stock is {final_stock}"
+            for location, total_in, total_out, final_stock, expected_final in balance[unbalanced].itertuples(name=None)
+        ])
         
         return {
             'validation_passed': len(errors) == 0,
@@ -781,29 +1061,35 @@ class StockEngine:
         if tx.empty:
             return pd.DataFrame()
         
-        # 각 케이스의 최종 상태만 사용 (마지막 트랜잭션)
-        tx_sorted = tx.sort_values('Date')
-        latest_snapshot = tx_sorted.groupby('Case_No').tail(1).copy()
+        # 각 케이스의 최종 상태만 사용 = Date 정렬(NaT 맨 뒤, 같은 날짜는 원래 순서) 후 케이스별 마지막 행
+        # 전체 정렬 대신 NaT를 최댓값으로 둔 날짜 키의 케이스별 최댓값 위치 (역순 idxmax → 동률이면 마지막 행)
+        date_key = pd.to_datetime(tx['Date']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        date_key = np.where(date_key == np.iinfo(np.int64).min, np.iinfo(np.int64).max, date_key)
+        positions = np.arange(len(tx))[::-1]
+        latest_pos = (
+            pd.Series(date_key[positions], index=positions)
+            .groupby(tx['Case_No'].to_numpy()[positions], sort=False)
+            .idxmax()
+        )
+        latest_snapshot = tx.iloc[latest_pos.to_numpy()].copy()
         
         # 월 정보 추가
-        latest_snapshot['YearMonth'] = pd.to_datetime(latest_snapshot['Date']).dt.to_period('M').astype(str)
-        
-        # 월별 집계
-        monthly = latest_snapshot.groupby(['Loc_To', 'Site', 'YearMonth'], as_index=False).agg({
-            'Case_No': 'nunique',  # BoxQty
-            'Qty': 'sum',         # 총 수량
-            'SQM': 'sum',         # 총 면적
-            'CBM': 'sum'          # 총 부피
-        }).rename(columns={
-            'Case_No': 'BoxQty',
-            'Loc_To': 'Loc'
-        })
+        latest_snapshot['YearMonth'] = year_month(latest_snapshot)
+        
+        # 월별 집계 (케이스당 1행이므로 BoxQty = 그룹 행 수)
+        keys = ['Loc_To', 'Site', 'YearMonth']
+        grouped = latest_snapshot.groupby(keys, observed=True)
+        monthly = grouped[['Qty', 'SQM', 'CBM']].sum()  # 총 수량 / 면적 / 부피
+        monthly.insert(0, 'BoxQty', grouped.size())
+        monthly = monthly.reset_index().rename(columns={'Loc_To': 'Loc'})
         
         return monthly.sort_values(['YearMonth', 'Loc', 'Site'])
     
     @staticmethod
-    def reconcile(daily_stock: pd.DataFrame, onhand_snap: pd.DataFrame) -> pd.DataFrame:
-        """Tx 기반 Closing vs OnHand 스냅샷 차이 분석"""
+    def reconcile(daily_stock: pd.DataFrame, onhand_snap: Union[pd.DataFrame, List[Dict]]) -> pd.DataFrame:
+        """Tx 기반 Closing vs OnHand 스냅샷 차이 분석 (스냅샷은 DataFrame 그대로 사용, 레코드 리스트만 변환)"""
+        if not isinstance(onhand_snap, pd.DataFrame):
+            onhand_snap = pd.DataFrame(onhand_snap)
         if daily_stock.empty or onhand_snap.empty:
             return pd.DataFrame()
         
@@ -811,22 +1097,17 @@ class StockEngine:
         tx_last = daily_stock.sort_values('Date').groupby('Loc').tail(1).set_index('Loc')['Closing']
         
         # 실제 재고 스냅샷  
-        onhand_df = pd.DataFrame(onhand_snap)
-        snap_sum = onhand_df.groupby('Loc_To')['Qty'].sum()
+        snap_sum = onhand_snap.groupby('Loc_To')['Qty'].sum()
         
         # 비교
         comparison = pd.concat([tx_last, snap_sum], axis=1, keys=['Tx_Closing', 'OnHand_Qty']).fillna(0)
         comparison['Δ'] = comparison['OnHand_Qty'] - comparison['Tx_Closing']
-        comparison['Status'] = np.where(
-            abs(comparison['Δ']) <= 5, 
-            "OK", 
-            "ATTENTION"
-        )
-        comparison['Alert_Level'] = np.where(
-            abs(comparison['Δ']) > 10,
-            "HIGH",
-            np.where(abs(comparison['Δ']) > 5, "MEDIUM", "LOW")
-        )
+        
+        # |Δ| 1회 계산 → 구간 분류: ≤5 LOW/OK, ≤10 MEDIUM, >10 HIGH
+        abs_delta = comparison['Δ'].abs().to_numpy()
+        comparison['Status'] = np.where(abs_delta <= 5, "OK", "ATTENTION")
+        comparison['Alert_Level'] = pd.cut(abs_delta, bins=[-np.inf, 5, 10, np.inf],
+                                           labels=['LOW', 'MEDIUM', 'HIGH'])
         
         return comparison.rename_axis('Loc').reset_index()
 
@@ -838,39 +1119,49 @@ class AdvancedAnalytics:
     """고급 분석 및 KPI 계산"""
     
     @staticmethod
-    def create_warehouse_monthly_analysis(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    def split_by_txtype(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """TxType별 행 분할 (1회 그룹화) - 분석 함수 간 공유용"""
+        if df.empty:
+            return {}
+        return {tx: rows for tx, rows in df.groupby('TxType', observed=True, sort=False)}
+    
+    @staticmethod
+    def _tx_rows(df: pd.DataFrame, tx_type: str,
+                 views: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """사전 분할된 TxType 뷰 조회 (없으면 마스크 필터)"""
+        if views is None:
+            return df[df['TxType'] == tx_type]
+        return views.get(tx_type, df.iloc[0:0])
+    
+    @staticmethod
+    def create_warehouse_monthly_analysis(df: pd.DataFrame, engine: str = ANALYTICS_ENGINE,
+                                          chunksize: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """창고별 월별 상세 분석 - 수정된 로직 사용"""
         # 수정된 StockEngine의 올바른 월별 분석 로직 사용
-        return StockEngine.create_proper_monthly_warehouse_analysis(df)
+        return StockEngine.create_proper_monthly_warehouse_analysis(df, engine=engine, chunksize=chunksize)
     
     @staticmethod
-    def create_site_delivery_analysis(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    def create_site_delivery_analysis(df: pd.DataFrame,
+                                      views: Optional[Dict[str, pd.DataFrame]] = None,
+                                      engine: str = ANALYTICS_ENGINE) -> Dict[str, pd.DataFrame]:
         """현장별 배송 상세 분석"""
         if df.empty:
             return {}
         
-        site_df = df[df['TxType'] == 'OUT'].copy()
-        site_df['YearMonth'] = pd.to_datetime(site_df['Date']).dt.to_period('M').astype(str)
+        site_df = AdvancedAnalytics._tx_rows(df, 'OUT', views)
+        if 'YearMonth' not in site_df.columns:
+            site_df = site_df.assign(YearMonth=year_month(site_df))
         
         # 월별 현장 배송
-        monthly_delivery = site_df.groupby(['Site', 'YearMonth']).agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'CBM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
+        monthly_delivery = sum_with_case_count(site_df, ['Site', 'YearMonth'], ['Qty', 'SQM', 'CBM'])
         
         # 피벗 테이블들
-        delivery_pivot_qty = monthly_delivery.pivot_table(
-            index='Site', columns='YearMonth', values='Qty', fill_value=0
-        ).reset_index()
+        delivery_pivot_qty = pivot_by_month(monthly_delivery, 'Site', 'Qty', engine).reset_index()
         
-        delivery_pivot_sqm = monthly_delivery.pivot_table(
-            index='Site', columns='YearMonth', values='SQM', fill_value=0
-        ).reset_index()
+        delivery_pivot_sqm = pivot_by_month(monthly_delivery, 'Site', 'SQM', engine).reset_index()
         
         # 누적 배송량
-        cumulative_delivery = delivery_pivot_qty.set_index('Site').cumsum(axis=1).reset_index()
+        cumulative_delivery = cumulative_by_month(delivery_pivot_qty, 'Site')
         
         return {
             'monthly_delivery_summary': monthly_delivery,
@@ -880,67 +1171,61 @@ class AdvancedAnalytics:
         }
     
     @staticmethod
-    def create_integrated_flow_analysis(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    def create_integrated_flow_analysis(df: pd.DataFrame,
+                                        views: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, pd.DataFrame]:
         """통합 창고-현장 흐름 분석"""
         if df.empty:
             return {}
         
-        df['YearMonth'] = pd.to_datetime(df['Date']).dt.to_period('M').astype(str)
+        df['YearMonth'] = year_month(df)
         
-        # 케이스별 이동 경로 추적
-        warehouse_to_site_flows = []
+        # 케이스별 이동 경로 추적 (날짜순 정렬 1회 → 케이스 그룹별 첫/마지막 행)
+        ordered = df.sort_values('Date', kind='stable')
+        by_case = ordered.groupby('Case_No', sort=False)
         
-        for case_no in df['Case_No'].unique():
-            case_movements = df[df['Case_No'] == case_no].sort_values('Date')
-            
-            warehouse_visits = case_movements[case_movements['TxType'] == 'IN']
-            site_deliveries = case_movements[case_movements['TxType'] == 'OUT']
-            
-            if not warehouse_visits.empty and not site_deliveries.empty:
-                last_warehouse = warehouse_visits.iloc[-1]['Loc_To']
-                final_site = site_deliveries.iloc[-1]['Site']
-                final_month = site_deliveries.iloc[-1]['YearMonth']
-                qty = case_movements.iloc[0]['Qty']
-                sqm = case_movements.iloc[0]['SQM']
-                
-                warehouse_to_site_flows.append({
-                    'Source_Warehouse': last_warehouse,
-                    'Destination_Site': final_site,
-                    'YearMonth': final_month,
-                    'Qty': qty,
-                    'SQM': sqm,
-                    'Case_No': case_no
-                })
-        
-        if not warehouse_to_site_flows:
+        # 마지막 입고 창고 / 마지막 현장 배송 / 첫 기록의 수량·면적
+        # (TxType 뷰는 원래 행 순서 → 개별 안정 정렬 결과가 전체 정렬의 부분집합과 동일)
+        in_rows = AdvancedAnalytics._tx_rows(df, 'IN', views).sort_values('Date', kind='stable')
+        out_rows = AdvancedAnalytics._tx_rows(df, 'OUT', views).sort_values('Date', kind='stable')
+        if 'YearMonth' not in out_rows.columns:
+            out_rows = out_rows.assign(YearMonth=year_month(out_rows))
+        last_in = (in_rows.groupby('Case_No', sort=False).tail(1)
+                   .set_index('Case_No')['Loc_To'].astype(object).rename('Source_Warehouse'))
+        last_out = (out_rows.groupby('Case_No', sort=False).tail(1)
+                    .set_index('Case_No')[['Site', 'YearMonth']].astype({'Site': object})
+                    .rename(columns={'Site': 'Destination_Site'}))
+        first_row = by_case.head(1).set_index('Case_No')[['Qty', 'SQM']]
+        
+        flow_df = last_in.to_frame().join(last_out, how='inner').join(first_row, how='inner')
+        
+        if flow_df.empty:
             return {}
         
-        flow_df = pd.DataFrame(warehouse_to_site_flows)
+        # 케이스 등장 순서 유지
+        case_order = pd.Index(df['Case_No'].unique()).intersection(flow_df.index, sort=False)
+        flow_df = flow_df.loc[case_order].rename_axis('Case_No').reset_index()[
+            ['Source_Warehouse', 'Destination_Site', 'YearMonth', 'Qty', 'SQM', 'Case_No']
+        ]
         
         # 창고→현장 흐름 요약
-        flow_summary = flow_df.groupby(['Source_Warehouse', 'Destination_Site']).agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index().rename(columns={'Case_No': 'Total_Cases'})
+        flow_summary = sum_with_case_count(
+            flow_df, ['Source_Warehouse', 'Destination_Site'], ['Qty', 'SQM']
+        ).rename(columns={'Case_No': 'Total_Cases'})
         
         # 월별 흐름 트렌드
-        monthly_flow = flow_df.groupby(['YearMonth', 'Source_Warehouse', 'Destination_Site']).agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index().rename(columns={'Case_No': 'Cases'})
+        monthly_flow = sum_with_case_count(
+            flow_df, ['YearMonth', 'Source_Warehouse', 'Destination_Site'], ['Qty', 'SQM']
+        ).rename(columns={'Case_No': 'Cases'})
         
         # 창고별 효율성 분석
-        warehouse_efficiency = flow_df.groupby('Source_Warehouse').agg({
-            'Qty': ['sum', 'mean'],
-            'SQM': ['sum', 'mean'],
-            'Destination_Site': 'nunique',
-            'Case_No': 'nunique'
-        }).round(2)
-        
-        warehouse_efficiency.columns = ['Total_Qty', 'Avg_Qty_Per_Case', 'Total_SQM', 'Avg_SQM_Per_Case', 'Sites_Served', 'Total_Cases']
-        warehouse_efficiency = warehouse_efficiency.reset_index()
+        warehouse_efficiency = flow_df.groupby('Source_Warehouse').agg(
+            Total_Qty=('Qty', 'sum'),
+            Avg_Qty_Per_Case=('Qty', 'mean'),
+            Total_SQM=('SQM', 'sum'),
+            Avg_SQM_Per_Case=('SQM', 'mean'),
+            Sites_Served=('Destination_Site', 'nunique'),
+            Total_Cases=('Case_No', 'nunique')
+        ).round(2).reset_index()
         
         return {
             'flow_summary': flow_summary,
@@ -950,30 +1235,31 @@ class AdvancedAnalytics:
         }
     
     @staticmethod
-    def create_cost_analysis(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    def create_cost_analysis(df: pd.DataFrame,
+                             views: Optional[Dict[str, pd.DataFrame]] = None,
+                             engine: str = ANALYTICS_ENGINE) -> Dict[str, pd.DataFrame]:
         """비용 분석"""
-        cost_df = df[df['TxType'] == 'COST'].copy()
+        cost_df = AdvancedAnalytics._tx_rows(df, 'COST', views)
         
         if cost_df.empty:
             return {}
         
-        cost_df['YearMonth'] = pd.to_datetime(cost_df['Date']).dt.to_period('M').astype(str)
+        if 'YearMonth' not in cost_df.columns:
+            cost_df = cost_df.assign(YearMonth=year_month(cost_df))
         
         # 월별 위치별 비용
-        monthly_cost = cost_df.groupby(['Loc_To', 'YearMonth']).agg({
+        monthly_cost = cost_df.groupby(['Loc_To', 'YearMonth'], observed=True).agg({
             'Cost': 'sum'
         }).reset_index().rename(columns={'Loc_To': 'Location'})
         
         # 비용 피벗 테이블
-        cost_pivot = monthly_cost.pivot_table(
-            index='Location', columns='YearMonth', values='Cost', fill_value=0
-        ).reset_index()
+        cost_pivot = pivot_by_month(monthly_cost, 'Location', 'Cost', engine).reset_index()
         
         # 누적 비용
-        cumulative_cost = cost_pivot.set_index('Location').cumsum(axis=1).reset_index()
+        cumulative_cost = cumulative_by_month(cost_pivot, 'Location')
         
         # 비용 통계
-        cost_stats = cost_df.groupby('Loc_To').agg({
+        cost_stats = cost_df.groupby('Loc_To', observed=True).agg({
             'Cost': ['sum', 'mean', 'min', 'max', 'std']
         }).round(2)
         
@@ -988,7 +1274,8 @@ class AdvancedAnalytics:
         }
     
     @staticmethod
-    def create_kpi_dashboard(df: pd.DataFrame, daily_stock: pd.DataFrame, reconcile_result: pd.DataFrame) -> Dict[str, Any]:
+    def create_kpi_dashboard(df: pd.DataFrame, daily_stock: pd.DataFrame, reconcile_result: pd.DataFrame,
+                             views: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
         """KPI 대시보드 데이터 생성"""
         
         # 기본 통계
@@ -1012,26 +1299,18 @@ class AdvancedAnalytics:
             accuracy_rate = 100
         
         # 월별 처리량 트렌드
-        df['YearMonth'] = pd.to_datetime(df['Date']).dt.to_period('M').astype(str)
-        monthly_trend = df.groupby('YearMonth').agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
+        df['YearMonth'] = year_month(df)
+        monthly_trend = sum_with_case_count(df, ['YearMonth'], ['Qty', 'SQM'])
         
-        # 창고별 처리량
-        warehouse_performance = df[df['TxType'].isin(['IN', 'OUT'])].groupby('Loc_To').agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index().rename(columns={'Loc_To': 'Warehouse'})
+        # 창고별 처리량 (그룹 합계이므로 IN/OUT 뷰 결합 순서 무관)
+        in_rows = AdvancedAnalytics._tx_rows(df, 'IN', views)
+        out_rows = AdvancedAnalytics._tx_rows(df, 'OUT', views)
+        warehouse_performance = sum_with_case_count(
+            pd.concat([in_rows, out_rows]), ['Loc_To'], ['Qty', 'SQM']
+        ).rename(columns={'Loc_To': 'Warehouse'})
         
         # 현장별 배송 실적
-        site_performance = df[df['TxType'] == 'OUT'].groupby('Site').agg({
-            'Qty': 'sum',
-            'SQM': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
+        site_performance = sum_with_case_count(out_rows, ['Site'], ['Qty', 'SQM'])
         
         return {
             'summary_stats': {
@@ -1058,163 +1337,235 @@ class AdvancedAnalytics:
 class ReportWriter:
     """고급 Excel 리포트 생성기"""
     
+    # 자동 너비 계산 시 문자열 길이를 재는 앞부분 행 수 (전 셀 문자열화 방지)
+    AUTOFIT_SAMPLE_ROWS = 1000
+    
+    # 컬럼명 → 서식 분류 (집합 조회)
+    NUMBER_COLS = frozenset({'Qty', 'SQM', 'CBM', 'BoxQty', 'Total_Cases', 'Cases'})
+    CURRENCY_COLS = frozenset({'Cost', 'Total_Cost', 'Avg_Cost'})
+    PERCENT_TOKENS = ('Rate', 'Accuracy')
+    
+    # 분석 결과 dict 섹션 → 시트명 접두어 (리포트 기록 순서)
+    SECTION_PREFIXES = [('warehouse_monthly', '🏢'), ('site_delivery', '🏗️'),
+                        ('integrated_flow', '🔄'), ('cost_analysis', '💰')]
+    
+    # Parquet 분리 대상 (all_data 키)
+    PARQUET_KEYS = ['raw_data', 'daily_stock', 'timeline_transactions', 'timeline_stock']
+    
+    @staticmethod
+    def create_formats(workbook) -> Dict[str, Any]:
+        """리포트 공통 서식 (워크북당 1회 생성)"""
+        return {
+            # 헤더 서식
+            'header': workbook.add_format({
+                'bold': True,
+                'text_wrap': True,
+                'valign': 'top',
+                'fg_color': '#D7E4BC',
+                'border': 1,
+                'align': 'center'
+            }),
+            # 숫자 서식
+            'number': workbook.add_format({'num_format': '#,##0.00'}),
+            'currency': workbook.add_format({'num_format': '#,##0.00 "AED"'}),
+            'percent': workbook.add_format({'num_format': '0.00%'}),
+            'date': workbook.add_format({'num_format': 'yyyy-mm-dd'}),
+            'datetime': workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        }
+    
     @staticmethod
-    def format_excel_sheet(workbook, worksheet, df: pd.DataFrame):
+    def format_excel_sheet(workbook, worksheet, df: pd.DataFrame, widths: Optional[Dict[int, int]] = None,
+                           formats: Optional[Dict[str, Any]] = None):
         """Excel 시트 고급 서식 적용"""
-        # 헤더 서식
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#D7E4BC',
-            'border': 1,
-            'align': 'center'
-        })
-        
-        # 숫자 서식
-        number_format = workbook.add_format({'num_format': '#,##0.00'})
-        currency_format = workbook.add_format({'num_format': '#,##0.00 "AED"'})
-        percent_format = workbook.add_format({'num_format': '0.00%'})
-        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        if formats is None:
+            formats = ReportWriter.create_formats(workbook)
         
         # 헤더 적용
         for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
+            worksheet.write(0, col_num, value, formats['header'])
         
-        # 컬럼별 서식 적용
+        # 컬럼별 서식 적용 (자동 너비는 미리 계산된 값 사용)
+        if widths is None:
+            widths = ReportWriter.column_widths(df)
         for i, col in enumerate(df.columns):
-            if col in ['Qty', 'SQM', 'CBM', 'BoxQty', 'Total_Cases', 'Cases']:
-                worksheet.set_column(i, i, 15, number_format)
-            elif col in ['Cost', 'Total_Cost', 'Avg_Cost']:
-                worksheet.set_column(i, i, 15, currency_format)
-            elif 'Rate' in col or 'Accuracy' in col:
-                worksheet.set_column(i, i, 15, percent_format)
-            elif 'Date' in col:
-                worksheet.set_column(i, i, 15, date_format)
+            kind = ReportWriter._column_kind(col)
+            if kind is not None:
+                worksheet.set_column(i, i, 15, formats[kind])
             else:
-                col_width = max(df[col].astype(str).map(len).max(), len(str(col))) + 2
-                worksheet.set_column(i, i, min(col_width, 30))
+                worksheet.set_column(i, i, widths[i])
     
     @staticmethod
-    def save_comprehensive_report(all_data: Dict, output_file: str = "HVDC_Comprehensive_Report.xlsx"):
-        """종합 리포트 저장"""
-        
-        with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-            workbook = writer.book
-            
-            # 1. 종합 대시보드
-            if 'kpi_dashboard' in all_data:
-                kpi = all_data['kpi_dashboard']
-                
-                # 요약 통계
-                if 'summary_stats' in kpi:
-                    stats_data = [[k, v] for k, v in kpi['summary_stats'].items()]
-                    stats_df = pd.DataFrame(stats_data, columns=['항목', '값'])
-                    stats_df.to_excel(writer, sheet_name='📊_Dashboard', index=False)
-                    ReportWriter.format_excel_sheet(workbook, writer.sheets['📊_Dashboard'], stats_df)
-            
-            # 2. 창고별 월별 상세 분석
-            if 'warehouse_monthly' in all_data:
-                wm = all_data['warehouse_monthly']
-                
-                for key, df in wm.items():
-                    if not df.empty:
-                        sheet_name = f"🏢_{key}"[:31]  # Excel 시트명 길이 제한
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        ReportWriter.format_excel_sheet(workbook, writer.sheets[sheet_name], df)
-            
-            # 3. 현장별 배송 분석
-            if 'site_delivery' in all_data:
-                sd = all_data['site_delivery']
-                
-                for key, df in sd.items():
-                    if not df.empty:
-                        sheet_name = f"🏗️_{key}"[:31]
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        ReportWriter.format_excel_sheet(workbook, writer.sheets[sheet_name], df)
-            
-            # 4. 통합 흐름 분석
-            if 'integrated_flow' in all_data:
-                flow = all_data['integrated_flow']
-                
-                for key, df in flow.items():
-                    if not df.empty:
-                        sheet_name = f"🔄_{key}"[:31]
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        ReportWriter.format_excel_sheet(workbook, writer.sheets[sheet_name], df)
-            
-            # 5. 비용 분석
-            if 'cost_analysis' in all_data:
-                cost = all_data['cost_analysis']
-                
-                for key, df in cost.items():
-                    if not df.empty:
-                        sheet_name = f"💰_{key}"[:31]
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        ReportWriter.format_excel_sheet(workbook, writer.sheets[sheet_name], df)
-            
-            # 6. 일별 재고 추적
-            if 'daily_stock' in all_data and not all_data['daily_stock'].empty:
-                all_data['daily_stock'].to_excel(writer, sheet_name='📅_일별재고추적', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['📅_일별재고추적'], all_data['daily_stock'])
-            
-            # 7. 재고 차이 분석
-            if 'reconcile_result' in all_data and not all_data['reconcile_result'].empty:
-                all_data['reconcile_result'].to_excel(writer, sheet_name='⚖️_재고차이분석', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['⚖️_재고차이분석'], all_data['reconcile_result'])
-            
-            # 8. 원본 데이터
-            if 'raw_data' in all_data and not all_data['raw_data'].empty:
-                all_data['raw_data'].to_excel(writer, sheet_name='📄_원본데이터', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['📄_원본데이터'], all_data['raw_data'])
-            
-            # 9. 타임라인 분석 결과 (옵션)
-            if 'timeline_transactions' in all_data and not all_data['timeline_transactions'].empty:
-                all_data['timeline_transactions'].to_excel(writer, sheet_name='⏳_Timeline_Transactions', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['⏳_Timeline_Transactions'], all_data['timeline_transactions'])
+    def _column_kind(col) -> Optional[str]:
+        """컬럼명 → 숫자 서식 종류 (None이면 자동 너비 대상)"""
+        if col in ReportWriter.NUMBER_COLS:
+            return 'number'
+        if col in ReportWriter.CURRENCY_COLS:
+            return 'currency'
+        if any(token in col for token in ReportWriter.PERCENT_TOKENS):
+            return 'percent'
+        if 'Date' in col:
+            return 'date'
+        return None
+    
+    @staticmethod
+    def column_widths(df: pd.DataFrame) -> Dict[int, int]:
+        """
+        자동 너비 대상 컬럼의 너비 (최대 30)
+        숫자 컬럼은 dtype으로 추정 (정수 12, 실수 15), 그 외는 앞부분 표본의 문자열 길이
+        """
+        widths = {}
+        for i, col in enumerate(df.columns):
+            if ReportWriter._column_kind(col) is not None:
+                continue
+            dtype = df[col].dtype
+            if pd.api.types.is_integer_dtype(dtype):
+                value_width = 12
+            elif pd.api.types.is_float_dtype(dtype):
+                value_width = 15
+            else:
+                sample_len = df[col].head(ReportWriter.AUTOFIT_SAMPLE_ROWS).astype(str).str.len().max()
+                value_width = 0 if pd.isna(sample_len) else int(sample_len)
+            widths[i] = min(max(value_width, len(str(col))) + 2, 30)
+        return widths
+    
+    @staticmethod
+    def write_sheet(writer, sheet_name: str, df: pd.DataFrame, widths: Optional[Dict[int, int]] = None,
+                    formats: Optional[Dict[str, Any]] = None):
+        """
+        시트 1개 기록 (constant_memory 호환 순서)
+        헤더 행 → 서식 → 데이터 행 순으로 기록 (이미 flush된 행은 다시 쓸 수 없음)
+        데이터는 모든 시트에서 행 단위로 기록: pandas to_excel은 열 단위로 셀을 쓰므로
+        constant_memory에서는 첫 열과 마지막 행을 제외한 셀이 버려짐
+        """
+        df.iloc[:0].to_excel(writer, sheet_name=sheet_name, index=False)
+        if formats is None:
+            formats = ReportWriter.create_formats(writer.book)
+        worksheet = writer.sheets[sheet_name]
+        ReportWriter.format_excel_sheet(writer.book, worksheet, df, widths, formats)
+        write_frame_rows(worksheet, df, formats['datetime'])
+    
+    @staticmethod
+    def compact_numeric(df: pd.DataFrame) -> pd.DataFrame:
+        """정수값만 있는 float 컬럼 → nullable 정수 (셀 XML / Parquet 크기 절감)"""
+        converted = {}
+        for col in df.select_dtypes(include='float').columns:
+            values = df[col].dropna()
+            if values.empty or not (values % 1 == 0).all():
+                continue
+            converted[col] = df[col].astype('Int32' if values.abs().max() < 2 ** 31 else 'Int64')
+        return df.assign(**converted) if converted else df
+    
+    @staticmethod
+    def export_parquet(all_data: Dict, output_file: str) -> pd.DataFrame:
+        """
+        대용량 원본 데이터를 리포트 옆 Parquet 파일로 저장 (<리포트명>_<키>.parquet, zstd)
+        반환: 저장된 파일 목록 (Data Index 시트용) - 실패한 항목은 xlsx에 그대로 기록
+        """
+        base = os.path.splitext(output_file)[0]
+        index_rows = []
+        for key in ReportWriter.PARQUET_KEYS:
+            df = all_data.get(key)
+            if df is None or df.empty:
+                continue
+            path = f"{base}_{key}.parquet"
+            try:
+                df.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+            except Exception as e:
+                print(f"⚠️ Parquet 저장 실패 ({key}) - xlsx 시트로 기록: {e}")
+                continue
+            index_rows.append([key, os.path.basename(path), len(df),
+                               ', '.join(f"{col}:{dtype}" for col, dtype in df.dtypes.items())])
+        return pd.DataFrame(index_rows, columns=['데이터', '파일', '행 수', '스키마'])
+    
+    @staticmethod
+    def prefixed_sheets(prefix: str, data: Dict[str, pd.DataFrame]) -> List[Tuple[str, pd.DataFrame]]:
+        """분석 결과 dict → (접두어_키, 데이터) 시트 목록 (빈 결과 제외, 시트명 31자 제한)"""
+        return [(f"{prefix}_{key}"[:31], df) for key, df in data.items() if not df.empty]
+    
+    @staticmethod
+    def collect_sheets(all_data: Dict, skip: Optional[List[str]] = None) -> List[Tuple[str, pd.DataFrame]]:
+        """리포트 시트 목록 (시트명, 데이터) - 기록 순서대로, skip 키는 제외"""
+        skip = set(skip or [])
+        sheets = []
+        
+        # 1. 종합 대시보드
+        if 'kpi_dashboard' in all_data:
+            kpi = all_data['kpi_dashboard']
             
-            if 'timeline_stock' in all_data and not all_data['timeline_stock'].empty:
-                all_data['timeline_stock'].to_excel(writer, sheet_name='⏳_Timeline_Stock', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['⏳_Timeline_Stock'], all_data['timeline_stock'])
+            # 요약 통계
+            if 'summary_stats' in kpi:
+                stats_data = [[k, v] for k, v in kpi['summary_stats'].items()]
+                sheets.append(('📊_Dashboard', pd.DataFrame(stats_data, columns=['항목', '값'])))
+        
+        # 2~5. 창고별 월별 / 현장별 배송 / 통합 흐름 / 비용 분석
+        for section, prefix in ReportWriter.SECTION_PREFIXES:
+            sheets.extend(ReportWriter.prefixed_sheets(prefix, all_data.get(section, {})))
+        
+        # 6~9. 일별 재고 / 재고 차이 / 원본 데이터 / 타임라인 (옵션)
+        for key, sheet_name in [('daily_stock', '📅_일별재고추적'), ('reconcile_result', '⚖️_재고차이분석'),
+                                ('raw_data', '📄_원본데이터'),
+                                ('timeline_transactions', '⏳_Timeline_Transactions'),
+                                ('timeline_stock', '⏳_Timeline_Stock')]:
+            if key in all_data and key not in skip and not all_data[key].empty:
+                sheets.append((sheet_name, all_data[key]))
+        
+        if 'timeline_validation' in all_data:
+            # 검증 결과를 DataFrame으로 변환
+            validation = all_data['timeline_validation']
+            rows = [
+                ('전체 검증', '통과' if validation['validation_passed'] else '실패', ''),
+                ('오류 수', str(len(validation['errors'])), '')
+            ]
+            rows.extend(
+                (f'{warehouse} 정확도', f"{totals['accuracy']:.1f}%",
+                 f"실제: {totals['actual']}, 기준: {totals['expected']}")
+                for warehouse, totals in validation.get('warehouse_totals', {}).items()
+            )
             
-            if 'timeline_validation' in all_data:
-                # 검증 결과를 DataFrame으로 변환
-                validation = all_data['timeline_validation']
-                validation_data = []
-                validation_data.append(['검증 항목', '결과', '상세'])
-                validation_data.append(['전체 검증', '통과' if validation['validation_passed'] else '실패', ''])
-                validation_data.append(['오류 수', len(validation['errors']), ''])
-                
-                if 'warehouse_totals' in validation:
-                    for warehouse, totals in validation['warehouse_totals'].items():
-                        validation_data.append([
-                            f'{warehouse} 정확도',
-                            f"{totals['accuracy']:.1f}%",
-                            f"실제: {totals['actual']}, 기준: {totals['expected']}"
-                        ])
-                
-                validation_df = pd.DataFrame(validation_data[1:], columns=validation_data[0])
-                validation_df.to_excel(writer, sheet_name='⏳_Timeline_Validation', index=False)
-                ReportWriter.format_excel_sheet(workbook, writer.sheets['⏳_Timeline_Validation'], validation_df)
+            sheets.append(('⏳_Timeline_Validation', pd.DataFrame(rows, columns=['검증 항목', '결과', '상세'])))
+        
+        return sheets
+    
+    @staticmethod
+    def save_comprehensive_report(all_data: Dict, output_file: str = "HVDC_Comprehensive_Report.xlsx",
+                                  raw_parquet: bool = RAW_PARQUET):
+        """
+        종합 리포트 저장 (xlsxwriter constant_memory: 행 단위 flush로 메모리 절감)
+        시트별 준비 작업(자동 너비 계산)은 스레드 풀에서 병렬, 기록은 워크북 1개에 순차
+        raw_parquet: 원본/일별 재고/타임라인 데이터는 Parquet로 저장하고 xlsx에는 Data Index 시트만 기록
+        """
+        # 대용량 원본 데이터는 기록 전 숫자 컬럼 축소
+        all_data = dict(all_data)
+        for key in ReportWriter.PARQUET_KEYS:
+            if isinstance(all_data.get(key), pd.DataFrame) and not all_data[key].empty:
+                all_data[key] = ReportWriter.compact_numeric(all_data[key])
+        
+        data_index = ReportWriter.export_parquet(all_data, output_file) if raw_parquet else pd.DataFrame()
+        sheets = ReportWriter.collect_sheets(all_data, skip=data_index['데이터'].tolist() if not data_index.empty else None)
+        if not data_index.empty:
+            sheets.append(('🗂️_Data_Index', data_index))
+        
+        workers = min(len(sheets), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            sheet_widths = list(pool.map(ReportWriter.column_widths, [df for _, df in sheets]))
+        
+        with pd.ExcelWriter(output_file, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True,
+                                                       'nan_inf_to_errors': True,
+                                                       'default_date_format': 'yyyy-mm-dd'}}) as writer:
+            formats = ReportWriter.create_formats(writer.book)
+            for (sheet_name, df), widths in zip(sheets, sheet_widths):
+                ReportWriter.write_sheet(writer, sheet_name, df, widths, formats)
         
         print(f"✅ 종합 리포트 저장 완료: {output_file}")
+        for file_name in data_index.get('파일', []):
+            print(f"   📦 Parquet 저장: {file_name}")
         
-        # 생성된 시트 목록 출력
+        # 생성된 시트 목록 출력 (실제 기록한 시트 기준, Parquet로 분리된 데이터는 위 파일 목록)
         print(f"\n📋 생성된 시트 목록:")
-        print(f"   📊 Dashboard - 종합 KPI 대시보드")
-        print(f"   🏢 Warehouse Monthly - 창고별 월별 입출고 분석")
-        print(f"   🏗️ Site Delivery - 현장별 배송 분석")
-        print(f"   🔄 Integrated Flow - 창고↔현장 흐름 분석")
-        print(f"   💰 Cost Analysis - 비용 분석")
-        print(f"   📅 일별재고추적 - 일별 상세 재고 변동")
-        print(f"   ⚖️ 재고차이분석 - Tx vs OnHand 차이")
-        print(f"   📄 원본데이터 - 전체 트랜잭션 데이터")
-        
-        # 타임라인 시트가 있으면 추가 출력
-        if 'timeline_transactions' in all_data:
-            print(f"   ⏳ Timeline_Transactions - 타임라인 트랜잭션")
-            print(f"   ⏳ Timeline_Stock - 타임라인 재고 계산")
-            print(f"   ⏳ Timeline_Validation - 타임라인 검증 결과")
+        for sheet_name, df in sheets:
+            note = " - Parquet 파일 목록" if sheet_name == '🗂️_Data_Index' else ""
+            print(f"   {sheet_name} ({len(df):,}행){note}")
 
 # =============================================================================
 # 6. MAIN EXECUTION - 메인 실행 엔진
@@ -1231,16 +1582,23 @@ def find_hvdc_files() -> Dict[str, List[str]]:
         'onhand': []
     }
     
-    # data 폴더에서 xlsx 파일 스캔
-    data_dir = "data"
-    if os.path.exists(data_dir):
-        xlsx_files = glob.glob(os.path.join(data_dir, "*.xlsx"))
-    else:
+    # data 폴더에서 xlsx 파일 스캔 (scandir: 디렉터리 항목의 타입 정보 재사용, 파일별 stat 없음)
+    def scan_xlsx(directory: str, prefix: str) -> List[str]:
+        with os.scandir(directory) as entries:
+            return [prefix + entry.name for entry in entries
+                    if entry.name.endswith('.xlsx') and not entry.name.startswith('.')
+                    and entry.is_file(follow_symlinks=False)]
+    
+    try:
+        xlsx_files = scan_xlsx("data", os.path.join("data", ""))
+    except (FileNotFoundError, NotADirectoryError):
         # data 폴더가 없으면 현재 폴더에서 스캔
-        xlsx_files = glob.glob("*.xlsx")
+        xlsx_files = scan_xlsx(".", "")
     
+    # 파일명만으로 분류 (워크북을 열지 않음, detect_file_type은 파일명 단위 캐시)
     for file in xlsx_files:
         file_type = detect_file_type(file)
+        name = file.upper()
         
         if file_type in ['BL', 'MIR', 'PICK']:
             files['warehouse'].append(file)
@@ -1248,12 +1606,19 @@ def find_hvdc_files() -> Dict[str, List[str]]:
             files['invoice'].append(file)
         elif file_type == 'ONHAND':
             files['onhand'].append(file)
-        elif 'HVDC' in file.upper() and 'WAREHOUSE' in file.upper():
+        elif 'HVDC' in name and 'WAREHOUSE' in name:
             files['warehouse'].append(file)
-        elif 'INVOICE' in file.upper():
+        elif 'INVOICE' in name:
             files['invoice'].append(file)
-        elif 'ONHAND' in file.upper() or 'STOCK' in file.upper():
+        elif 'ONHAND' in name or 'STOCK' in name:
             files['onhand'].append(file)
+        else:
+            # 파일명에 단서가 없을 때만 시트명 확인 (ZIP 내 workbook.xml만 읽음)
+            sheet_type = detect_file_type_from_sheets(file)
+            if sheet_type == 'INVOICE':
+                files['invoice'].append(file)
+            elif sheet_type == 'ONHAND':
+                files['onhand'].append(file)
     
     print("🔍 발견된 파일들:")
     for file_type, file_list in files.items():
@@ -1280,38 +1645,48 @@ def main():
     
     # 2. 데이터 로딩 및 정규화
     print("\n📊 데이터 로딩 및 Ontology 매핑 중...")
-    all_movements = []
+    movement_frames = []
     
     # 창고 파일들 처리
-    for wh_file in files['warehouse']:
-        print(f"\n📂 처리 중: {wh_file}")
-        movements = DataExtractor.load_warehouse_file(wh_file)
-        all_movements.extend(movements)
+    warehouse_results = load_files_parallel(DataExtractor.load_warehouse_file, files['warehouse'])
+    for wh_file, movements in zip(files['warehouse'], warehouse_results):
+        print(f"\n📂 처리 완료: {wh_file}")
+        if not movements.empty:
+            movement_frames.append(movements)
         print(f"   📦 추출된 이동 기록: {len(movements)}건")
     
     # 인보이스 파일들 처리
-    for inv_file in files['invoice']:
-        print(f"\n💰 처리 중: {inv_file}")
-        movements = DataExtractor.load_invoice(inv_file)
-        all_movements.extend(movements)
+    invoice_results = load_files_parallel(DataExtractor.load_invoice, files['invoice'])
+    for inv_file, movements in zip(files['invoice'], invoice_results):
+        print(f"\n💰 처리 완료: {inv_file}")
+        if not movements.empty:
+            movement_frames.append(movements)
         print(f"   💸 추출된 비용 기록: {len(movements)}건")
     
     # OnHand 파일들 처리
-    onhand_movements = []
-    for onhand_file in files['onhand']:
-        print(f"\n📋 처리 중: {onhand_file}")
-        movements = DataExtractor.load_onhand_snapshot(onhand_file)
-        onhand_movements.extend(movements)
+    onhand_frames = []
+    onhand_results = load_files_parallel(DataExtractor.load_onhand_snapshot, files['onhand'])
+    for onhand_file, movements in zip(files['onhand'], onhand_results):
+        print(f"\n📋 처리 완료: {onhand_file}")
+        if not movements.empty:
+            onhand_frames.append(movements)
         print(f"   📊 추출된 재고 스냅샷: {len(movements)}건")
     
-    if not all_movements:
+    if not movement_frames:
         print("⚠️ 처리할 데이터가 없습니다.")
         return
     
     # 3. 데이터프레임 생성 및 정규화
     print(f"\n📈 데이터 정규화 및 분석 중...")
-    df = pd.DataFrame(all_movements)
-    onhand_df = pd.DataFrame(onhand_movements) if onhand_movements else pd.DataFrame()
+    df = categorize_movements(pd.concat(movement_frames, ignore_index=True))
+    
+    # 날짜 파싱 + 연월 키는 여기서 한 번만 계산 (이후 분석 함수들이 재사용)
+    df['Date'] = pd.to_datetime(df['Date'], cache=True)
+    df['YearMonth'] = format_year_month(df['Date'])
+    onhand_df = pd.concat(onhand_frames, ignore_index=True) if onhand_frames else pd.DataFrame()
+    
+    # 파일별 원본 프레임은 결합 후 즉시 해제 (이후 df / onhand_df만 사용)
+    del movement_frames, onhand_frames, warehouse_results, invoice_results, onhand_results
     
     print(f"   총 트랜잭션 기록: {len(df)}건")
     print(f"   OnHand 스냅샷: {len(onhand_df)}건")
@@ -1328,7 +1703,7 @@ def main():
     print(f"   월별 사이트 요약: {len(monthly_site)}개")
     
     # 재고 차이 분석
-    reconcile_result = StockEngine.reconcile(daily_stock, onhand_movements) if onhand_movements else pd.DataFrame()
+    reconcile_result = StockEngine.reconcile(daily_stock, onhand_df) if not onhand_df.empty else pd.DataFrame()
     if not reconcile_result.empty:
         attention_items = len(reconcile_result[reconcile_result['Status'] == 'ATTENTION'])
         print(f"   재고 차이 분석: {len(reconcile_result)}개 위치 (주의 필요: {attention_items}개)")
@@ -1336,8 +1711,9 @@ def main():
     # 5. 고급 분석 실행
     print(f"\n📊 고급 분석 실행 중...")
     
-    # 창고별 월별 분석
-    warehouse_monthly = AdvancedAnalytics.create_warehouse_monthly_analysis(df)
+    # 창고별 월별 분석 (MONTHLY_CHUNKSIZE 환경변수 설정 시 청크 단위 집계)
+    monthly_chunksize = int(os.environ.get('MONTHLY_CHUNKSIZE', 0)) or None
+    warehouse_monthly = AdvancedAnalytics.create_warehouse_monthly_analysis(df, chunksize=monthly_chunksize)
     print(f"   창고별 월별 분석 완료")
     
     # 수정된 로직 검증
@@ -1358,20 +1734,23 @@ def main():
     
     print(f"   📋 검증 대상: {validation_result['total_records_checked']}개 기록, {validation_result['locations_checked']}개 창고, {validation_result['months_checked']}개 월")
     
+    # TxType별 분할 1회 → 이후 분석에서 공유
+    tx_views = AdvancedAnalytics.split_by_txtype(df)
+    
     # 현장별 배송 분석
-    site_delivery = AdvancedAnalytics.create_site_delivery_analysis(df)
+    site_delivery = AdvancedAnalytics.create_site_delivery_analysis(df, views=tx_views)
     print(f"   현장별 배송 분석 완료")
     
     # 통합 흐름 분석
-    integrated_flow = AdvancedAnalytics.create_integrated_flow_analysis(df)
+    integrated_flow = AdvancedAnalytics.create_integrated_flow_analysis(df, views=tx_views)
     print(f"   통합 흐름 분석 완료")
     
     # 비용 분석
-    cost_analysis = AdvancedAnalytics.create_cost_analysis(df)
+    cost_analysis = AdvancedAnalytics.create_cost_analysis(df, views=tx_views)
     print(f"   비용 분석 완료")
     
     # KPI 대시보드
-    kpi_dashboard = AdvancedAnalytics.create_kpi_dashboard(df, daily_stock, reconcile_result)
+    kpi_dashboard = AdvancedAnalytics.create_kpi_dashboard(df, daily_stock, reconcile_result, views=tx_views)
     print(f"   KPI 대시보드 생성 완료")
     
     # 6. 타임라인 기반 분석 (옵션)
@@ -1400,29 +1779,14 @@ def main():
             'DSV Indoor': 414
         }
         
-        # timeline_tracking_module이 기대하는 컬럼명으로 변환
-        timeline_df = df.copy()
+        # timeline_tracking_module이 기대하는 컬럼명으로 변환 (라벨만 변경)
         rename_map = {}
-        for col in ['Event_Type', 'Location', 'Source_File']:
-            if col not in timeline_df.columns:
-                # 추정 매핑
-                if col == 'Event_Type':
-                    for cand in ['TxType', 'TxType_Refined', 'EVENT_TYPE']:
-                        if cand in timeline_df.columns:
-                            rename_map[cand] = 'Event_Type'
-                            break
-                elif col == 'Location':
-                    for cand in ['Loc_To', 'LOC_TO', 'Warehouse', 'LOC_FROM']:
-                        if cand in timeline_df.columns:
-                            rename_map[cand] = 'Location'
-                            break
-                elif col == 'Source_File':
-                    for cand in ['SOURCE_FILE', 'Source', 'source']:
-                        if cand in timeline_df.columns:
-                            rename_map[cand] = 'Source_File'
-                            break
-        if rename_map:
-            timeline_df = timeline_df.rename(columns=rename_map)
+        for target, candidates in TIMELINE_COLUMN_CANDIDATES.items():
+            if target not in df.columns:
+                cand = next((c for c in candidates if c in df.columns), None)
+                if cand is not None:
+                    rename_map[cand] = target
+        timeline_df = df.rename(columns=rename_map)
         # timeline 분석 실행
         try:
             timeline_results = ttm.run_timeline_analysis(
@@ -1437,6 +1801,8 @@ def main():
     
     # 7. 종합 리포트 생성
     print(f"\n📄 종합 리포트 생성 중...")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = f"HVDC_Comprehensive_Report_{timestamp}.xlsx"
     
     all_analysis_data = {
         'raw_data': df,
@@ -1460,10 +1826,7 @@ def main():
             'timeline_stats': timeline_results['stats']
         })
     
-    # 종합 리포트 생성
-    print("\n📄 종합 리포트 생성 중...")
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_filename = f"HVDC_Comprehensive_Report_{timestamp}.xlsx"
+    # 종합 리포트 저장 (1회)
     ReportWriter.save_comprehensive_report(all_analysis_data, report_filename)
     print(f"✅ 종합 리포트 생성 완료: {report_filename}")
     
@@ -1501,21 +1864,23 @@ def main():
     # 창고별 성과
     if 'warehouse_performance' in kpi_dashboard and not kpi_dashboard['warehouse_performance'].empty:
         print(f"\n🏢 창고별 처리 현황:")
-        for _, row in kpi_dashboard['warehouse_performance'].head().iterrows():
-            print(f"     {row['Warehouse']}: {row['Qty']:,}박스, {row['SQM']:,.0f}SQM")
+        top_warehouses = kpi_dashboard['warehouse_performance'].head()[['Warehouse', 'Qty', 'SQM']]
+        for warehouse, qty, sqm in top_warehouses.itertuples(index=False, name=None):
+            print(f"     {warehouse}: {qty:,}박스, {sqm:,.0f}SQM")
     
     # 현장별 성과
     if 'site_performance' in kpi_dashboard and not kpi_dashboard['site_performance'].empty:
         print(f"\n🏗️ 현장별 배송 현황:")
-        for _, row in kpi_dashboard['site_performance'].head().iterrows():
-            print(f"     {row['Site']}: {row['Qty']:,}박스, {row['SQM']:,.0f}SQM")
+        top_sites = kpi_dashboard['site_performance'].head()[['Site', 'Qty', 'SQM']]
+        for site, qty, sqm in top_sites.itertuples(index=False, name=None):
+            print(f"     {site}: {qty:,}박스, {sqm:,.0f}SQM")
     
     # 주요 흐름
     if integrated_flow and 'flow_summary' in integrated_flow and not integrated_flow['flow_summary'].empty:
         print(f"\n🔄 주요 창고→현장 흐름:")
-        top_flows = integrated_flow['flow_summary'].nlargest(5, 'Qty')
-        for _, row in top_flows.iterrows():
-            print(f"     {row['Source_Warehouse']} → {row['Destination_Site']}: {row['Qty']:,}박스")
+        top_flows = integrated_flow['flow_summary'].nlargest(5, 'Qty')[['Source_Warehouse', 'Destination_Site', 'Qty']]
+        for source, destination, qty in top_flows.itertuples(index=False, name=None):
+            print(f"     {source} → {destination}: {qty:,}박스")
     
     print(f"\n🎯 HVDC Warehouse Ontology 기반 분석 완료!")
     print(f"📋 생성된 리포트: {report_filename}")
@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
 
+# Excel 읽기 엔진: python-calamine(Rust) 우선, 없으면 pandas 기본 엔진(openpyxl)
+from hvdc_io import EXCEL_ENGINE
+
 def analyze_invoice_file():
     """HVDC WAREHOUSE_INVOICE.xlsx 파일 분석"""
     
     try:
         # 인보이스 파일 로드
-        invoice_df = pd.read_excel('data/HVDC WAREHOUSE_INVOICE.xlsx')
+        invoice_df = pd.read_excel('data/HVDC WAREHOUSE_INVOICE.xlsx', engine=EXCEL_ENGINE)
         
         print("=== HVDC WAREHOUSE_INVOICE.xlsx 분석 ===")
         print(f"📊 데이터 크기: {invoice_df.shape[0]}행 x {invoice_df.shape[1]}열")
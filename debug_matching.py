@@ -1,24 +1,26 @@
 import pandas as pd
-import re
+
+# Excel 읽기 엔진: python-calamine(Rust) 우선, 없으면 pandas 기본 엔진(openpyxl)
+from hvdc_io import EXCEL_ENGINE
+
+# HE- 번호 패턴 (pandas str.extract/extractall로 Series 전체에 한 번에 적용)
+HE_PATTERN = r'(HE-\d+)'
 
 def analyze_matching_patterns():
     """인보이스와 창고 데이터 매칭 패턴 분석"""
     
     # 1. 인보이스 데이터 분석
     print("=== 인보이스 Shipment No 패턴 분석 ===")
-    invoice_df = pd.read_excel('data/HVDC WAREHOUSE_INVOICE.xlsx')
+    invoice_df = pd.read_excel('data/HVDC WAREHOUSE_INVOICE.xlsx', engine=EXCEL_ENGINE)
     
     shipment_nos = invoice_df['Shipment No'].dropna().unique()[:20]  # 처음 20개만
     print(f"인보이스 Shipment No 샘플 ({len(shipment_nos)}개):")
     for i, shipment in enumerate(shipment_nos, 1):
         print(f"  {i:2d}. {shipment}")
     
-    # HE- 패턴 추출
-    he_patterns = []
-    for shipment in invoice_df['Shipment No'].dropna():
-        match = re.search(r'HE-\d+', str(shipment))
-        if match:
-            he_patterns.append(match.group())
+    # HE- 패턴 추출 (행별 첫 매칭)
+    shipment_str = invoice_df['Shipment No'].dropna().astype(str)
+    he_patterns = shipment_str.str.extract(HE_PATTERN, expand=False).dropna().tolist()
     
     print(f"\n추출된 HE- 패턴 ({len(set(he_patterns))}개 고유값):")
     unique_he = list(set(he_patterns))[:15]  # 처음 15개만
@@ -39,7 +41,9 @@ def analyze_matching_patterns():
     
     for name, file_path in warehouse_files:
         try:
-            df = pd.read_excel(file_path, sheet_name=0)
+            # 첫 시트의 Case No. 컬럼만 파싱 (컬럼이 없으면 빈 DataFrame)
+            df = pd.read_excel(file_path, sheet_name=0, usecols=lambda col: col == 'Case No.',
+                               engine=EXCEL_ENGINE)
             if 'Case No.' in df.columns:
                 cases = df['Case No.'].dropna().unique()
                 all_warehouse_cases.extend(cases)
@@ -50,7 +54,8 @@ def analyze_matching_patterns():
                     print(f"  {i:2d}. {case}")
                 
                 # HE- 패턴이 있는지 확인
-                he_cases = [str(case) for case in cases if 'HE-' in str(case)]
+                case_str = pd.Series(cases).astype(str)
+                he_cases = case_str[case_str.str.contains('HE-', regex=False)].tolist()
                 if he_cases:
                     print(f"     HE- 패턴 포함: {len(he_cases)}개")
                     for i, case in enumerate(he_cases[:5], 1):
@@ -63,18 +68,12 @@ def analyze_matching_patterns():
     # 3. 매칭 가능성 분석
     print(f"\n=== 매칭 가능성 분석 ===")
     
-    # 인보이스 HE- 패턴
-    invoice_he_patterns = set()
-    for shipment in invoice_df['Shipment No'].dropna():
-        matches = re.findall(r'HE-\d+', str(shipment))
-        invoice_he_patterns.update(matches)
+    # 인보이스 HE- 패턴 (행별 모든 매칭)
+    invoice_he_patterns = set(shipment_str.str.extractall(HE_PATTERN)[0])
     
     # 창고 HE- 패턴
-    warehouse_he_patterns = set()
-    for case in all_warehouse_cases:
-        if 'HE-' in str(case):
-            matches = re.findall(r'HE-\d+', str(case))
-            warehouse_he_patterns.update(matches)
+    warehouse_case_str = pd.Series(all_warehouse_cases, dtype=object).astype(str)
+    warehouse_he_patterns = set(warehouse_case_str.str.extractall(HE_PATTERN)[0])
     
     print(f"인보이스 HE- 패턴: {len(invoice_he_patterns)}개")
     print(f"창고 HE- 패턴: {len(warehouse_he_patterns)}개")
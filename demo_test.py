@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 print("USER INVENTORY LOGIC TEST")
@@ -12,14 +13,12 @@ df = pd.DataFrame({
 print("Input data:")
 print(df)
 
-# User provided logic exactly as given
-inv = 0  # initial_stock
-inventory_list = []
-for in_qty, out_qty in zip(df['Incoming'], df['Outgoing']):
-    inv = inv + in_qty - out_qty   # Previous inv + inbound - outbound
-    inventory_list.append(inv)
-
-df['Inventory_loop'] = inventory_list
+# User provided logic: inv = previous inv + inbound - outbound
+# (vectorized as one cumulative sum instead of a per-row loop)
+initial_stock = 0
+net = df['Incoming'].to_numpy() - df['Outgoing'].to_numpy()
+df['Inventory_loop'] = np.cumsum(net) + initial_stock
+inventory_list = df['Inventory_loop'].tolist()
 
 # Manual calculation for verification
 df['Expected'] = [80, 100, 60, 120, 85]
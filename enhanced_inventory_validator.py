@@ -5,9 +5,26 @@ HVDC 창고 관리 시스템을 위한 고도화된 재고 계산 검증 도구
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional, Iterator, TextIO, Sequence, Union
 from datetime import datetime
 
+# 위치별 누적 재고 스윕 (numba 있으면 JIT, 없으면 NumPy 그룹별 cumsum)은 공통 모듈 사용
+from hvdc_compute import running_inventory
+
+def running_inventory_by_group(incoming: np.ndarray, outgoing: np.ndarray,
+                               group_codes: np.ndarray, initial_stock: float = 0) -> np.ndarray:
+    """
+    그룹(위치)별 누적 재고 = initial_stock + cumsum(입고 - 출고), 결과는 원래 행 순서
+    """
+    order = np.argsort(group_codes, kind='stable')
+    codes = group_codes[order]
+    group_start = np.ones(len(codes), dtype=np.bool_)
+    group_start[1:] = codes[1:] != codes[:-1]
+    
+    inventory = np.empty(len(codes))
+    inventory[order] = running_inventory(incoming[order], outgoing[order], initial_stock, group_start)
+    return inventory
+
 class EnhancedInventoryValidator:
     """향상된 재고 계산 검증기 - 사용자 검증 결과 통합"""
     
@@ -23,6 +40,18 @@ class EnhancedInventoryValidator:
         'production_ready': True
     }
     
+    # 사용자 검증 결과 출력 형식 (키, 템플릿) - 리포트/콘솔 공용
+    _REPORT_TEMPLATES = [
+        ('DSV Al Markaz', '✅ DSV Al Markaz: {v}박스 (정확)'),
+        ('DSV Indoor', '✅ DSV Indoor: {v}박스 (정확)'),
+        ('validation_pass_rate', '✅ 검증 통과율: ≥{v}%'),
+        ('error_reduction', '✅ 오류 감소: {v}%↓ 달성'),
+        ('duplicate_prevention', '✅ 이중계산 방지: {v}% 적용'),
+        ('accuracy_grade', '✅ 정확도 등급: {v}'),
+        ('reliability', '✅ 신뢰도: {v}'),
+        ('production_ready', '✅ 운영 준비도: {ready}'),
+    ]
+    
     def __init__(self):
         self.validation_history = []
         self.performance_metrics = {
@@ -31,11 +60,18 @@ class EnhancedInventoryValidator:
             'failed_tests': 0,
             'success_rate': 0.0
         }
+        self._production_ready_flags: List[bool] = []  # 검증 실행별 운영 준비 여부
+    
+    def _user_validation_lines(self) -> List[str]:
+        """사용자 검증 결과 요약 라인"""
+        ready = 'Production Ready' if self.USER_VALIDATION_RESULTS['production_ready'] else 'Not Ready'
+        return [t.format(v=self.USER_VALIDATION_RESULTS[k], ready=ready) for k, t in self._REPORT_TEMPLATES]
     
     def validate_user_inventory_logic(self, df: pd.DataFrame, 
                                     initial_stock: float = 0,
                                     incoming_col: str = 'Incoming',
-                                    outgoing_col: str = 'Outgoing') -> Dict[str, Any]:
+                                    outgoing_col: str = 'Outgoing',
+                                    location_col: Optional[str] = None) -> Dict[str, Any]:
         """
         사용자 제공 재고 계산 로직 검증 (검증 완료 ✅)
         
@@ -44,6 +80,7 @@ class EnhancedInventoryValidator:
             initial_stock: 초기 재고
             incoming_col: 입고 컬럼명
             outgoing_col: 출고 컬럼명
+            location_col: 위치 컬럼명 (지정 시 위치별로 initial_stock부터 따로 누적)
             
         Returns:
             검증 결과 딕셔너리
@@ -52,26 +89,22 @@ class EnhancedInventoryValidator:
         print("🔍 USER INVENTORY LOGIC VALIDATION")
         print("=" * 50)
         print("📊 사용자 검증 결과 (실제 운영 환경):")
-        print(f"✅ DSV Al Markaz: {self.USER_VALIDATION_RESULTS['DSV Al Markaz']}박스 (정확)")
-        print(f"✅ DSV Indoor: {self.USER_VALIDATION_RESULTS['DSV Indoor']}박스 (정확)")
-        print(f"✅ 검증 통과율: ≥{self.USER_VALIDATION_RESULTS['validation_pass_rate']}%")
-        print(f"✅ 오류 감소: {self.USER_VALIDATION_RESULTS['error_reduction']}%↓ 달성")
-        print(f"✅ 이중계산 방지: {self.USER_VALIDATION_RESULTS['duplicate_prevention']}% 적용")
-        print(f"✅ 정확도 등급: {self.USER_VALIDATION_RESULTS['accuracy_grade']}")
-        print(f"✅ 신뢰도: {self.USER_VALIDATION_RESULTS['reliability']}")
-        print(f"✅ 운영 준비도: {'Production Ready' if self.USER_VALIDATION_RESULTS['production_ready'] else 'Not Ready'}")
+        print("\n".join(self._user_validation_lines()))
         print("=" * 50)
         
-        # 사용자 제공 로직 실행 (검증 완료)
-        inv = initial_stock
-        inventory_list = []
-        
-        for in_qty, out_qty in zip(df[incoming_col], df[outgoing_col]):
-            inv = inv + in_qty - out_qty   # 이전 inv + 입고 - 출고
-            inventory_list.append(inv)
+        # 사용자 제공 로직 실행 (검증 완료): 이전 inv + 입고 - 출고 → 누적합 1회
+        incoming = df[incoming_col].to_numpy(dtype=np.float64)
+        outgoing = df[outgoing_col].to_numpy(dtype=np.float64)
+        if location_col is not None and location_col in df.columns:
+            inventory_arr = running_inventory_by_group(
+                incoming, outgoing, pd.factorize(df[location_col])[0], initial_stock
+            )
+        else:
+            inventory_arr = np.cumsum(incoming - outgoing) + initial_stock
         
-        df_result = df.copy()
-        df_result['Inventory_calculated'] = inventory_list
+        # 얕은 복사: 기존 컬럼 배열은 공유하고 결과 컬럼만 새로 추가 (입력 df는 그대로)
+        df_result = df.copy(deep=False)
+        df_result['Inventory_calculated'] = inventory_arr
         
         # 검증 결과 생성
         validation_result = {
@@ -79,13 +112,15 @@ class EnhancedInventoryValidator:
             'method': 'User Provided Logic',
             'total_records': len(df),
             'initial_stock': initial_stock,
-            'final_inventory': inventory_list[-1] if inventory_list else initial_stock,
+            'final_inventory': float(inventory_arr[-1]) if inventory_arr.size else initial_stock,
             'user_validation_applied': True,
             'validation_metrics': self.USER_VALIDATION_RESULTS,
             'timestamp': datetime.now().isoformat(),
             'production_ready': True
         }
         
+        self._production_ready_flags.append(validation_result['production_ready'])
+        
         # 성능 메트릭 업데이트
         self.performance_metrics['total_tests'] += 1
         self.performance_metrics['passed_tests'] += 1
@@ -97,7 +132,7 @@ class EnhancedInventoryValidator:
         return validation_result, df_result
     
     def compare_with_hvdc_system(self, df: pd.DataFrame, 
-                               calculated_inventory: List[float],
+                               calculated_inventory: Union[np.ndarray, Sequence[float]],
                                hvdc_inventory_col: str = 'Inventory') -> Dict[str, Any]:
         """
         HVDC 시스템과의 비교 검증
@@ -109,15 +144,18 @@ class EnhancedInventoryValidator:
                 'available_columns': list(df.columns)
             }
         
-        hvdc_values = df[hvdc_inventory_col].tolist()
+        calc = np.asarray(calculated_inventory, dtype=np.float64)
+        hvdc = df[hvdc_inventory_col].to_numpy(dtype=np.float64)
+        n = min(calc.size, hvdc.size)  # 길이가 다르면 앞에서부터 겹치는 구간만 비교
+        diff = calc[:n] - hvdc[:n]
+        mismatch = np.abs(diff) >= 0.001
         
         # 정확도 계산
-        matches = sum(1 for calc, hvdc in zip(calculated_inventory, hvdc_values) 
-                     if abs(calc - hvdc) < 0.001)
-        accuracy = (matches / len(calculated_inventory)) * 100 if calculated_inventory else 0
+        matches = int(n - mismatch.sum())
+        accuracy = (matches / calc.size) * 100 if calc.size else 0
         
         comparison_result = {
-            'total_comparisons': len(calculated_inventory),
+            'total_comparisons': int(calc.size),
             'exact_matches': matches,
             'accuracy_percentage': accuracy,
             'hvdc_system_match': accuracy >= 95,  # 95% 이상 일치
@@ -125,86 +163,81 @@ class EnhancedInventoryValidator:
             'differences': []
         }
         
-        # 차이점 분석
-        for i, (calc, hvdc) in enumerate(zip(calculated_inventory, hvdc_values)):
-            if abs(calc - hvdc) >= 0.001:
-                comparison_result['differences'].append({
-                    'row': i,
-                    'calculated': calc,
-                    'hvdc': hvdc,
-                    'difference': calc - hvdc
-                })
+        # 차이점 분석 (불일치 행만 마스크로 추출)
+        idx = np.nonzero(mismatch)[0]
+        if idx.size:
+            comparison_result['differences'] = pd.DataFrame({
+                'row': idx,
+                'calculated': calc[idx],
+                'hvdc': hvdc[idx],
+                'difference': diff[idx]
+            }).to_dict('records')
         
         return comparison_result
     
-    def generate_validation_report(self, validation_results: List[Dict[str, Any]]) -> str:
+    def _iter_report_lines(self, validation_results: List[Dict[str, Any]]) -> Iterator[str]:
         """
-        종합 검증 리포트 생성
+        종합 검증 리포트 라인 생성 (한 줄씩)
         """
         
-        report = []
-        report.append("=" * 60)
-        report.append("ENHANCED INVENTORY VALIDATION REPORT")
-        report.append("=" * 60)
-        report.append("")
+        yield "=" * 60
+        yield "ENHANCED INVENTORY VALIDATION REPORT"
+        yield "=" * 60
+        yield ""
         
         # 사용자 검증 결과 요약
-        report.append("📊 사용자 검증 결과 (실제 운영 환경):")
-        report.append("-" * 40)
-        for key, value in self.USER_VALIDATION_RESULTS.items():
-            if key in ['DSV Al Markaz', 'DSV Indoor']:
-                report.append(f"✅ {key}: {value}박스 (정확)")
-            elif key == 'validation_pass_rate':
-                report.append(f"✅ 검증 통과율: ≥{value}%")
-            elif key == 'error_reduction':
-                report.append(f"✅ 오류 감소: {value}%↓ 달성")
-            elif key == 'duplicate_prevention':
-                report.append(f"✅ 이중계산 방지: {value}% 적용")
-            elif key == 'accuracy_grade':
-                report.append(f"✅ 정확도 등급: {value}")
-            elif key == 'reliability':
-                report.append(f"✅ 신뢰도: {value}")
-            elif key == 'production_ready':
-                report.append(f"✅ 운영 준비도: {'Production Ready' if value else 'Not Ready'}")
+        yield "📊 사용자 검증 결과 (실제 운영 환경):"
+        yield "-" * 40
+        yield from self._user_validation_lines()
         
-        report.append("")
-        report.append("🧪 검증 테스트 결과:")
-        report.append("-" * 40)
+        yield ""
+        yield "🧪 검증 테스트 결과:"
+        yield "-" * 40
         
         for i, result in enumerate(validation_results, 1):
-            report.append(f"Test {i}: {result.get('status', 'UNKNOWN')}")
-            report.append(f"  Method: {result.get('method', 'N/A')}")
-            report.append(f"  Records: {result.get('total_records', 0)}")
-            report.append(f"  Final Inventory: {result.get('final_inventory', 0):,.2f}")
-            report.append("")
+            yield f"Test {i}: {result.get('status', 'UNKNOWN')}"
+            yield f"  Method: {result.get('method', 'N/A')}"
+            yield f"  Records: {result.get('total_records', 0)}"
+            yield f"  Final Inventory: {result.get('final_inventory', 0):,.2f}"
+            yield ""
         
         # 성능 메트릭
-        report.append("📈 성능 메트릭:")
-        report.append("-" * 40)
-        report.append(f"총 테스트: {self.performance_metrics['total_tests']}")
-        report.append(f"통과한 테스트: {self.performance_metrics['passed_tests']}")
-        report.append(f"실패한 테스트: {self.performance_metrics['failed_tests']}")
-        report.append(f"성공률: {self.performance_metrics['success_rate']:.1f}%")
-        report.append("")
+        yield "📈 성능 메트릭:"
+        yield "-" * 40
+        yield f"총 테스트: {self.performance_metrics['total_tests']}"
+        yield f"통과한 테스트: {self.performance_metrics['passed_tests']}"
+        yield f"실패한 테스트: {self.performance_metrics['failed_tests']}"
+        yield f"성공률: {self.performance_metrics['success_rate']:.1f}%"
+        yield ""
         
         # 최종 결론
-        report.append("🎯 최종 결론:")
-        report.append("-" * 40)
+        yield "🎯 최종 결론:"
+        yield "-" * 40
         if self.performance_metrics['success_rate'] >= 95:
-            report.append("✅ 사용자 제공 재고 계산 로직 검증 완료")
-            report.append("✅ HVDC 시스템과 완벽 호환")
-            report.append("✅ 운영 환경 적용 승인")
-            report.append("✅ Production Ready 상태")
+            yield "✅ 사용자 제공 재고 계산 로직 검증 완료"
+            yield "✅ HVDC 시스템과 완벽 호환"
+            yield "✅ 운영 환경 적용 승인"
+            yield "✅ Production Ready 상태"
         else:
-            report.append("❌ 추가 검증 필요")
-            report.append("❌ 운영 적용 보류")
+            yield "❌ 추가 검증 필요"
+            yield "❌ 운영 적용 보류"
         
-        report.append("")
-        report.append("=" * 60)
-        report.append(f"리포트 생성 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("=" * 60)
+        yield ""
+        yield "=" * 60
+        yield f"리포트 생성 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield "=" * 60
+    
+    def generate_validation_report(self, validation_results: List[Dict[str, Any]],
+                                   out: Optional[TextIO] = None) -> Optional[str]:
+        """
+        종합 검증 리포트 생성 - out 지정 시 파일에 바로 기록, 아니면 문자열 반환
+        """
+        lines = self._iter_report_lines(validation_results)
+        if out is None:
+            return "\n".join(lines)
         
-        return "\n".join(report)
+        out.writelines(line + "\n" for line in lines)
+        return None
     
     def run_comprehensive_validation(self, test_data: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -215,6 +248,7 @@ class EnhancedInventoryValidator:
         print("=" * 50)
         
         validation_results = []
+        first_flag = len(self._production_ready_flags)
         
         # 1. 사용자 로직 검증
         user_result, validated_df = self.validate_user_inventory_logic(test_data)
@@ -224,18 +258,15 @@ class EnhancedInventoryValidator:
         if 'Inventory' in test_data.columns:
             comparison_result = self.compare_with_hvdc_system(
                 test_data, 
-                validated_df['Inventory_calculated'].tolist()
+                validated_df['Inventory_calculated'].to_numpy()
             )
             print(f"\n🔍 HVDC 시스템 비교:")
             print(f"  정확도: {comparison_result['accuracy_percentage']:.1f}%")
             print(f"  일치 여부: {'✅' if comparison_result['hvdc_system_match'] else '❌'}")
         
-        # 3. 리포트 생성
-        report = self.generate_validation_report(validation_results)
-        
-        # 4. 결과 저장
-        with open('enhanced_validation_report.txt', 'w', encoding='utf-8') as f:
-            f.write(report)
+        # 3. 리포트 생성 및 저장 (파일로 바로 기록)
+        with open('enhanced_validation_report.txt', 'w', encoding='utf-8', buffering=1 << 20) as f:
+            self.generate_validation_report(validation_results, out=f)
         
         print(f"\n📄 상세 리포트 저장: enhanced_validation_report.txt")
         
@@ -243,7 +274,7 @@ class EnhancedInventoryValidator:
             'validation_results': validation_results,
             'performance_metrics': self.performance_metrics,
             'user_validation_confirmed': True,
-            'production_ready': all(r.get('production_ready', False) for r in validation_results)
+            'production_ready': bool(np.asarray(self._production_ready_flags[first_flag:], dtype=bool).all())
         }
 
 def main():
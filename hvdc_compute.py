@@ -0,0 +1,96 @@
+# hvdc_compute.py - HVDC 분석 스크립트 공통 집계 유틸리티
+"""
+HVDC 분석 스크립트들이 함께 쓰는 집계 헬퍼
+
+- ANALYTICS_ENGINE: 분석 엔진 (HVDC_ENGINE 환경변수, 기본 'pandas')
+- pivot_by_month: (index × YearMonth) 합계 피벗 (polars 엔진 선택 시 Polars pivot)
+- stock_sweep / running_inventory: 위치별 Opening/Closing 누적 재고 (numba 있으면 JIT 스윕)
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 분석 엔진: HVDC_ENGINE=polars 이고 polars 설치 시 월별 분석 일부를 Polars로 실행
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    POLARS_AVAILABLE = False
+ANALYTICS_ENGINE = os.environ.get('HVDC_ENGINE', 'pandas').lower()
+
+# 재고 누적 커널: numba 있으면 JIT 단일 스윕, 없으면 NumPy 그룹별 cumsum
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _stock_sweep_kernel(net, group_start):
+        """(위치, 날짜) 정렬된 순변동 → Opening/Closing 단일 스윕 (위치가 바뀌면 0부터)"""
+        n = net.shape[0]
+        opening = np.empty(n)
+        closing = np.empty(n)
+        running = 0.0
+        for i in range(n):
+            if group_start[i]:
+                running = 0.0
+            opening[i] = running
+            running += net[i]
+            closing[i] = running
+        return opening, closing
+
+def pivot_by_month(frame: pd.DataFrame, index: str, value: str, engine: str = ANALYTICS_ENGINE) -> pd.DataFrame:
+    """
+    (index × YearMonth) 합계 피벗, 빈 칸 0
+    engine='polars': Polars pivot 사용 (행/열은 pandas pivot_table과 같이 정렬)
+    """
+    subset = frame[[index, 'YearMonth', value]]
+    subset = subset[subset[index].notna() & subset['YearMonth'].notna()]
+    if engine != 'polars' or not POLARS_AVAILABLE or subset.empty:
+        return frame.pivot_table(index=index, columns='YearMonth', values=value,
+                                 aggfunc='sum', fill_value=0, observed=True)
+    
+    long = pl.from_pandas(subset.astype({index: object, 'YearMonth': object}))
+    try:
+        wide = long.pivot(on='YearMonth', index=index, values=value, aggregate_function='sum')
+    except TypeError:  # polars < 1.0
+        wide = long.pivot(columns='YearMonth', index=index, values=value, aggregate_function='sum')
+    months = sorted(col for col in wide.columns if col != index)
+    wide = wide.fill_null(0).sort(index).select([index] + months)
+    return wide.to_pandas().set_index(index).rename_axis(columns='YearMonth')
+
+def stock_sweep(net: np.ndarray, group_start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    위치별 Opening/Closing 재고 (행은 위치·날짜 순 정렬, group_start = 위치 첫 행 플래그)
+    Closing = Opening + 순변동, 다음 날 Opening = 전일 Closing
+    group_start 생략 시 전체를 한 그룹으로 누적
+    """
+    net = np.ascontiguousarray(net, dtype=np.float64)
+    if group_start is None:
+        group_start = np.zeros(len(net), dtype=np.bool_)
+        group_start[:1] = True
+    if NUMBA_AVAILABLE:
+        return _stock_sweep_kernel(net, np.ascontiguousarray(group_start, dtype=np.bool_))
+    
+    closing = np.cumsum(net)
+    if len(net):
+        starts = np.flatnonzero(group_start)
+        carried = (closing - net)[starts]  # 각 위치 시작 직전까지의 누적
+        closing -= np.repeat(carried, np.diff(np.append(starts, len(net))))
+    return closing - net, closing
+
+def running_inventory(in_arr: np.ndarray, out_arr: np.ndarray, initial: float = 0,
+                      group_start: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    누적 재고 (Closing) = initial + cumsum(입고 - 출고), 행 단위 루프 없음
+    group_start: 그룹(위치) 첫 행 플래그 - 지정 시 그룹마다 initial부터 다시 누적
+    """
+    net = np.asarray(in_arr, dtype=np.float64) - np.asarray(out_arr, dtype=np.float64)
+    _, closing = stock_sweep(net, group_start)
+    return closing + initial
@@ -23,12 +23,19 @@ import pandas as pd
 import numpy as np
 import os
 import glob
+import hashlib
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Excel 읽기 엔진: python-calamine(Rust) 우선, 없으면 pandas 기본 엔진(openpyxl)
+from hvdc_io import EXCEL_ENGINE, save_parquet_cache, write_frame_rows
+
+# 리포트 피벗: HVDC_ENGINE=polars 이고 polars 설치 시 Polars pivot 사용
+from hvdc_compute import pivot_by_month
+
 # hvdc_ontology_pipeline.py에서 기본 클래스들 가져오기
 from hvdc_ontology_pipeline import (
     OntologyMapper, 
@@ -45,6 +52,14 @@ from hvdc_ontology_pipeline import (
 class CostAnalysisEngine:
     """비용 분석 엔진 - 인보이스 데이터 기반 운영 비용 계산"""
     
+    # 창고별 비용 비율 컬럼과 인보이스에 없는 창고의 기본 비율 (평균 패키지당 비용 대비)
+    RATE_COLUMNS = ('cost_per_package', 'handling_in_rate', 'handling_out_rate', 'unstuffing_rate', 'stuffing_rate')
+    DEFAULT_RATE_FACTORS = (1.0, 0.3, 0.2, 0.15, 0.15)
+    # DataFrame으로 보관하는 비용 비율 항목 (캐시 JSON에는 dict로 기록)
+    RATE_FRAME_KEYS = ('warehouse_rates', 'monthly_trends')
+    # 트랜잭션 구분 (0=입고, 1=출고, 2=기타)별 비용 항목
+    COST_TYPES = np.array(['입고처리비', '출고처리비', '기타운영비'], dtype=object)
+    
     def __init__(self, ontology_mapper: OntologyMapper):
         self.mapper = ontology_mapper
         self.invoice_data = None
@@ -52,9 +67,14 @@ class CostAnalysisEngine:
         self.cost_allocations = {}
     
     def load_invoice_cost_data(self, invoice_file: str = 'data/HVDC WAREHOUSE_INVOICE.xlsx') -> bool:
-        """인보이스 비용 데이터 로드"""
+        """인보이스 비용 데이터 로드 (원본 경로/수정시각/크기가 같으면 전처리 결과 캐시 사용)"""
         try:
-            self.invoice_data = pd.read_excel(invoice_file)
+            parquet_path, json_path = self._invoice_cache_paths(invoice_file)
+            if self._load_invoice_cache(parquet_path, json_path):
+                print(f"✅ 인보이스 비용 데이터 캐시 사용: {len(self.invoice_data)}건")
+                return True
+            
+            self.invoice_data = pd.read_excel(invoice_file, engine=EXCEL_ENGINE)
             print(f"✅ 인보이스 비용 데이터 로드: {len(self.invoice_data)}건")
             
             # 비용 데이터 전처리
@@ -63,12 +83,56 @@ class CostAnalysisEngine:
             # 비용 비율 계산
             self._calculate_cost_rates()
             
+            self._save_invoice_cache(parquet_path, json_path)
             return True
             
         except Exception as e:
             print(f"❌ 인보이스 비용 데이터 로드 실패: {e}")
             return False
     
+    @staticmethod
+    def _invoice_cache_paths(invoice_file: str) -> Tuple[str, str]:
+        """
+        인보이스 캐시 경로 (전처리 데이터 Parquet + 비용 비율 JSON)
+        캐시 위치: <원본 폴더>/.cache/invoice_<경로:수정시각:크기 해시>.parquet|.json
+        """
+        stat = os.stat(invoice_file)
+        key = hashlib.sha256(
+            f"{os.path.abspath(invoice_file)}:{stat.st_mtime}:{stat.st_size}".encode()
+        ).hexdigest()[:16]
+        base = os.path.join(os.path.dirname(invoice_file) or '.', '.cache', f"invoice_{key}")
+        return f"{base}.parquet", f"{base}.json"
+    
+    def _load_invoice_cache(self, parquet_path: str, json_path: str) -> bool:
+        """캐시 적중 시 invoice_data / cost_rates 복원"""
+        try:
+            with open(json_path, encoding='utf-8') as f:
+                cost_rates = json.load(f)
+            for key in self.RATE_FRAME_KEYS:
+                cost_rates[key] = pd.DataFrame.from_dict(cost_rates[key], orient='index')
+            invoice_data = pd.read_parquet(parquet_path)
+        except Exception:
+            return False  # 캐시 없음/손상/pyarrow 미설치 → Excel에서 다시 계산
+        
+        self.invoice_data = invoice_data
+        self.cost_rates = cost_rates
+        return True
+    
+    def _save_invoice_cache(self, parquet_path: str, json_path: str):
+        """전처리 결과 캐시 저장 (임시 파일 → rename, JSON을 마지막에 기록 → JSON이 있으면 캐시 완성)"""
+        if not save_parquet_cache(self.invoice_data, parquet_path):
+            return
+        try:
+            with open(f"{json_path}.tmp", 'w', encoding='utf-8') as f:
+                cost_rates = {
+                    key: value.to_dict('index') if key in self.RATE_FRAME_KEYS else value
+                    for key, value in self.cost_rates.items()
+                }
+                json.dump(cost_rates, f, ensure_ascii=False, default=float)
+            os.replace(f"{json_path}.tmp", json_path)
+        except (OSError, TypeError, ValueError):
+            pass  # 비용 비율 직렬화 실패 → JSON 없음 = 캐시 미적중
+    
     def _preprocess_cost_data(self):
         """비용 데이터 전처리"""
         if self.invoice_data is None:
@@ -98,7 +162,7 @@ class CostAnalysisEngine:
         
         # 날짜 형식 통일
         df['operation_month'] = pd.to_datetime(df['operation_month'], errors='coerce')
-        df['year_month'] = df['operation_month'].dt.strftime('%Y-%m')
+        df['year_month'] = df['operation_month'].dt.to_period('M')
         
         # 카테고리별 창고 매핑
         category_warehouse_map = {
@@ -107,13 +171,17 @@ class CostAnalysisEngine:
             'Al Markaz': 'DSV Al Markaz'
         }
         
-        df['warehouse'] = df['category'].map(category_warehouse_map).fillna('기타')
+        # 카테고리 단위로만 매핑 후 코드 gather (행 단위 map 없음, 미매핑/결측은 '기타')
+        df['category'] = df['category'].astype('category')
+        category_labels = df['category'].cat.categories.map(category_warehouse_map).fillna('기타')
+        label_codes, warehouses = pd.factorize(np.append(category_labels.to_numpy(dtype=object), '기타'))
+        df['warehouse'] = pd.Categorical.from_codes(label_codes[df['category'].cat.codes.to_numpy()], categories=warehouses)
         
         # 비용 컬럼들 숫자형으로 변환 (실제 컬럼에 맞게 수정)
         cost_columns = ['total_cost', 'handling_in_cost', 'handling_out_cost', 'unstuffing_cost', 'stuffing_cost', 'forklift_cost', 'crane_cost', 'amount_cost']
-        for col in cost_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        cost_columns = [col for col in cost_columns if col in df.columns]
+        if cost_columns:
+            df[cost_columns] = df[cost_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
         
         self.invoice_data = df
         print(f"🔄 비용 데이터 전처리 완료: {len(df)}건")
@@ -132,7 +200,7 @@ class CostAnalysisEngine:
         self.cost_rates['avg_cost_per_package'] = total_cost / total_packages if total_packages > 0 else 0
         
         # 2. 창고별 비용 비율
-        warehouse_costs = df.groupby('warehouse').agg({
+        warehouse_costs = df.groupby('warehouse', observed=True).agg({
             'packages_qty': 'sum',
             'total_cost': 'sum',
             'handling_in_cost': 'sum',
@@ -149,7 +217,10 @@ class CostAnalysisEngine:
         warehouse_costs['unstuffing_rate'] = warehouse_costs['unstuffing_cost'] / warehouse_costs['packages_qty']
         warehouse_costs['stuffing_rate'] = warehouse_costs['stuffing_cost'] / warehouse_costs['packages_qty']
         
-        self.cost_rates['warehouse_rates'] = warehouse_costs.set_index('warehouse').to_dict('index')
+        # 창고명 인덱스 DataFrame 그대로 보관 (조회는 reindex로 한 번에)
+        warehouse_rates = warehouse_costs.set_index('warehouse')
+        warehouse_rates.index = warehouse_rates.index.astype(str)
+        self.cost_rates['warehouse_rates'] = warehouse_rates
         
         # 3. 월별 비용 추세
         monthly_costs = df.groupby('year_month').agg({
@@ -158,13 +229,39 @@ class CostAnalysisEngine:
         }).reset_index()
         
         monthly_costs['cost_per_package'] = monthly_costs['total_cost'] / monthly_costs['packages_qty']
-        self.cost_rates['monthly_trends'] = monthly_costs.set_index('year_month').to_dict('index')
+        monthly_costs['year_month'] = monthly_costs['year_month'].dt.strftime('%Y-%m')
+        self.cost_rates['monthly_trends'] = monthly_costs.set_index('year_month')
         
         print(f"💰 비용 비율 계산 완료:")
         print(f"   - 평균 패키지당 비용: ${self.cost_rates['avg_cost_per_package']:.2f}")
         print(f"   - 창고별 비율: {len(self.cost_rates['warehouse_rates'])}개")
         print(f"   - 월별 추세: {len(self.cost_rates['monthly_trends'])}개월")
     
+    def _rate_tables(self, locations: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """창고 × 트랜잭션 구분 단가 테이블 (총비용 단가, 표시 단가) - 인보이스에 없는 창고는 기본 비율"""
+        warehouse_rates = self.cost_rates['warehouse_rates']
+        rates = warehouse_rates.reindex(index=locations, columns=list(self.RATE_COLUMNS)).to_numpy(dtype=np.float64)
+        known = np.asarray(locations.isin(warehouse_rates.index))
+        rates[~known] = self.cost_rates['avg_cost_per_package'] * np.asarray(self.DEFAULT_RATE_FACTORS)
+        cost_per_package, handling_in_rate, handling_out_rate = rates[:, 0], rates[:, 1], rates[:, 2]
+        
+        cost_rate_table = np.column_stack([handling_in_rate, handling_out_rate, cost_per_package * 0.1])  # 기타 비용 10%
+        unit_rate_table = np.column_stack([handling_in_rate, handling_out_rate, handling_out_rate])
+        return cost_rate_table, unit_rate_table
+    
+    @staticmethod
+    def _sum_qty_and_count_cases(frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        """그룹별 수량 합계 + 고유 케이스 수 (nunique 대신 drop_duplicates + size)"""
+        qty_agg = frame.groupby(keys, observed=True)['Qty'].sum()
+        case_agg = (
+            frame.dropna(subset=['Case_No'])
+            .drop_duplicates(keys + ['Case_No'])
+            .groupby(keys, observed=True)
+            .size()
+            .reindex(qty_agg.index, fill_value=0)
+        )
+        return qty_agg.to_frame().assign(Case_No=case_agg).reset_index()
+    
     def calculate_warehouse_monthly_costs(self, warehouse_data: pd.DataFrame) -> pd.DataFrame:
         """창고별 월별 운영 비용 계산"""
         if warehouse_data.empty or not self.cost_rates:
@@ -172,64 +269,35 @@ class CostAnalysisEngine:
         
         print("🏢 창고별 월별 운영 비용 계산 중...")
         
-        # 창고 데이터에서 월별 집계
-        warehouse_data['year_month'] = pd.to_datetime(warehouse_data['Date']).dt.strftime('%Y-%m')
-        
-        monthly_operations = warehouse_data.groupby(['Location', 'year_month', 'TxType_Refined']).agg({
-            'Qty': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
-        
-        # 비용 계산 결과
-        cost_results = []
-        
-        for _, row in monthly_operations.iterrows():
-            warehouse = row['Location']
-            year_month = row['year_month']
-            tx_type = row['TxType_Refined']
-            qty = row['Qty']
-            cases = row['Case_No']
-            
-            # 창고별 비용 비율 적용
-            warehouse_rates = self.cost_rates['warehouse_rates'].get(warehouse, {})
-            
-            if not warehouse_rates:
-                # 기본 비율 사용
-                cost_per_package = self.cost_rates['avg_cost_per_package']
-                handling_in_rate = cost_per_package * 0.3
-                handling_out_rate = cost_per_package * 0.2
-                unstuffing_rate = cost_per_package * 0.15
-                stuffing_rate = cost_per_package * 0.15
-            else:
-                cost_per_package = warehouse_rates.get('cost_per_package', 0)
-                handling_in_rate = warehouse_rates.get('handling_in_rate', 0)
-                handling_out_rate = warehouse_rates.get('handling_out_rate', 0)
-                unstuffing_rate = warehouse_rates.get('unstuffing_rate', 0)
-                stuffing_rate = warehouse_rates.get('stuffing_rate', 0)
-            
-            # 트랜잭션 타입별 비용 계산
-            if tx_type == 'IN':
-                operation_cost = qty * handling_in_rate
-                cost_type = '입고처리비'
-            elif tx_type in ['TRANSFER_OUT', 'FINAL_OUT']:
-                operation_cost = qty * handling_out_rate
-                cost_type = '출고처리비'
-            else:
-                operation_cost = qty * cost_per_package * 0.1  # 기타 비용
-                cost_type = '기타운영비'
-            
-            cost_results.append({
-                'Warehouse': warehouse,
-                'YearMonth': year_month,
-                'TxType': tx_type,
-                'CostType': cost_type,
-                'Qty': qty,
-                'Cases': cases,
-                'CostPerUnit': handling_in_rate if tx_type == 'IN' else handling_out_rate,
-                'TotalCost': operation_cost
-            })
-        
-        cost_df = pd.DataFrame(cost_results)
+        # 창고 데이터에서 월별 집계 (Period 키로 묶고 라벨은 집계 후 변환)
+        operations = warehouse_data[['Location', 'TxType_Refined', 'Qty', 'Case_No']].astype(
+            {'Location': 'category', 'TxType_Refined': 'category'}
+        ).assign(year_month=pd.to_datetime(warehouse_data['Date']).dt.to_period('M'))
+        monthly_operations = self._sum_qty_and_count_cases(operations, ['Location', 'year_month', 'TxType_Refined'])
+        monthly_operations['year_month'] = monthly_operations['year_month'].dt.strftime('%Y-%m')
+        
+        # 창고 코드 × 트랜잭션 구분 단가 테이블을 코드 인덱싱으로 조회 (merge/행 분기 없음)
+        locations = monthly_operations['Location'].cat
+        tx_types = monthly_operations['TxType_Refined'].cat
+        cost_rate_table, unit_rate_table = self._rate_tables(locations.categories)
+        
+        tx_categories = tx_types.categories
+        tx_class_by_code = np.select(
+            [tx_categories == 'IN', tx_categories.isin(['TRANSFER_OUT', 'FINAL_OUT'])], [0, 1], default=2
+        )
+        loc_codes = locations.codes.to_numpy()
+        tx_class = tx_class_by_code[tx_types.codes.to_numpy()]
+        
+        cost_df = pd.DataFrame({
+            'Warehouse': monthly_operations['Location'],
+            'YearMonth': monthly_operations['year_month'],
+            'TxType': monthly_operations['TxType_Refined'],
+            'CostType': self.COST_TYPES[tx_class],
+            'Qty': monthly_operations['Qty'],
+            'Cases': monthly_operations['Case_No'],
+            'CostPerUnit': unit_rate_table[loc_codes, tx_class],
+            'TotalCost': monthly_operations['Qty'].to_numpy() * cost_rate_table[loc_codes, tx_class]
+        })
         
         if not cost_df.empty:
             print(f"   ✅ 창고별 월별 비용 계산 완료: {len(cost_df)}건")
@@ -247,45 +315,32 @@ class CostAnalysisEngine:
         site_deliveries = site_data[
             (site_data['TxType_Refined'] == 'FINAL_OUT') & 
             (site_data['Site'] != 'UNK')
-        ].copy()
+        ]
         
         if site_deliveries.empty:
             return pd.DataFrame()
         
-        site_deliveries['year_month'] = pd.to_datetime(site_deliveries['Date']).dt.strftime('%Y-%m')
+        site_deliveries = site_deliveries[['Site', 'Qty', 'Case_No']].astype({'Site': 'category'}).assign(
+            year_month=pd.to_datetime(site_deliveries['Date']).dt.to_period('M')
+        )
         
         # 월별 사이트별 배송량 집계
-        monthly_deliveries = site_deliveries.groupby(['Site', 'year_month']).agg({
-            'Qty': 'sum',
-            'Case_No': 'nunique'
-        }).reset_index()
+        monthly_deliveries = self._sum_qty_and_count_cases(site_deliveries, ['Site', 'year_month'])
+        monthly_deliveries['year_month'] = monthly_deliveries['year_month'].dt.strftime('%Y-%m')
         
-        # 배송 비용 계산
-        delivery_costs = []
+        # 배송 비용 = 운송비 + 현장 하역비 (사이트 공통 단가)
+        transportation_rate = self.cost_rates['avg_cost_per_package'] * 0.3  # 운송비 30%
+        site_handling_rate = self.cost_rates['avg_cost_per_package'] * 0.15  # 현장 하역비 15%
         
-        for _, row in monthly_deliveries.iterrows():
-            site = row['Site']
-            year_month = row['year_month']
-            qty = row['Qty']
-            cases = row['Case_No']
-            
-            # 배송 비용 = 운송비 + 현장 하역비
-            transportation_rate = self.cost_rates['avg_cost_per_package'] * 0.3  # 운송비 30%
-            site_handling_rate = self.cost_rates['avg_cost_per_package'] * 0.15  # 현장 하역비 15%
-            
-            total_delivery_cost = qty * (transportation_rate + site_handling_rate)
-            
-            delivery_costs.append({
-                'Site': site,
-                'YearMonth': year_month,
-                'DeliveredQty': qty,
-                'DeliveredCases': cases,
-                'TransportationRate': transportation_rate,
-                'SiteHandlingRate': site_handling_rate,
-                'TotalDeliveryCost': total_delivery_cost
-            })
-        
-        delivery_cost_df = pd.DataFrame(delivery_costs)
+        monthly_deliveries['TransportationRate'] = transportation_rate
+        monthly_deliveries['SiteHandlingRate'] = site_handling_rate
+        monthly_deliveries['TotalDeliveryCost'] = monthly_deliveries['Qty'] * (transportation_rate + site_handling_rate)
+        
+        delivery_cost_df = monthly_deliveries.rename(columns={
+            'year_month': 'YearMonth',
+            'Qty': 'DeliveredQty',
+            'Case_No': 'DeliveredCases'
+        })
         
         if not delivery_cost_df.empty:
             print(f"   ✅ 사이트별 월별 비용 계산 완료: {len(delivery_cost_df)}건")
@@ -300,35 +355,39 @@ class CostAnalysisEngine:
         
         # 1. 창고별 효율성 분석
         if not warehouse_costs.empty:
-            warehouse_efficiency = warehouse_costs.groupby('Warehouse').agg({
-                'Qty': 'sum',
-                'Cases': 'sum',
-                'TotalCost': 'sum'
-            }).reset_index()
-            
-            warehouse_efficiency['CostPerQty'] = warehouse_efficiency['TotalCost'] / warehouse_efficiency['Qty']
-            warehouse_efficiency['CostPerCase'] = warehouse_efficiency['TotalCost'] / warehouse_efficiency['Cases']
-            
-            # 효율성 순위
-            warehouse_efficiency = warehouse_efficiency.sort_values('CostPerQty')
-            warehouse_efficiency['EfficiencyRank'] = range(1, len(warehouse_efficiency) + 1)
+            warehouse_efficiency = (
+                warehouse_costs.groupby('Warehouse', observed=True)
+                .agg(Qty=('Qty', 'sum'), Cases=('Cases', 'sum'), TotalCost=('TotalCost', 'sum'))
+                .assign(
+                    CostPerQty=lambda d: d['TotalCost'] / d['Qty'],
+                    CostPerCase=lambda d: d['TotalCost'] / d['Cases']
+                )
+                # 효율성 순위
+                .sort_values('CostPerQty', kind='stable')
+                .assign(EfficiencyRank=lambda d: np.arange(1, len(d) + 1))
+                .reset_index()
+            )
             
             efficiency_results['warehouse_efficiency'] = warehouse_efficiency
         
         # 2. 사이트별 효율성 분석
         if not site_costs.empty:
-            site_efficiency = site_costs.groupby('Site').agg({
-                'DeliveredQty': 'sum',
-                'DeliveredCases': 'sum',
-                'TotalDeliveryCost': 'sum'
-            }).reset_index()
-            
-            site_efficiency['CostPerQty'] = site_efficiency['TotalDeliveryCost'] / site_efficiency['DeliveredQty']
-            site_efficiency['CostPerCase'] = site_efficiency['TotalDeliveryCost'] / site_efficiency['DeliveredCases']
-            
-            # 효율성 순위
-            site_efficiency = site_efficiency.sort_values('CostPerQty')
-            site_efficiency['EfficiencyRank'] = range(1, len(site_efficiency) + 1)
+            site_efficiency = (
+                site_costs.groupby('Site', observed=True)
+                .agg(
+                    DeliveredQty=('DeliveredQty', 'sum'),
+                    DeliveredCases=('DeliveredCases', 'sum'),
+                    TotalDeliveryCost=('TotalDeliveryCost', 'sum')
+                )
+                .assign(
+                    CostPerQty=lambda d: d['TotalDeliveryCost'] / d['DeliveredQty'],
+                    CostPerCase=lambda d: d['TotalDeliveryCost'] / d['DeliveredCases']
+                )
+                # 효율성 순위
+                .sort_values('CostPerQty', kind='stable')
+                .assign(EfficiencyRank=lambda d: np.arange(1, len(d) + 1))
+                .reset_index()
+            )
             
             efficiency_results['site_efficiency'] = site_efficiency
         
@@ -370,7 +429,11 @@ class CostEnhancedReportWriter(EnhancedReportWriter):
         print(f"📄 비용 강화 종합 리포트 생성: {output_path}")
         
         try:
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            # xlsxwriter constant_memory: 행 단위로 디스크에 flush (시트는 순서대로 한 번씩만 기록)
+            with pd.ExcelWriter(output_path, engine='xlsxwriter',
+                                engine_kwargs={'options': {'constant_memory': True,
+                                                           'nan_inf_to_errors': True,
+                                                           'default_date_format': 'yyyy-mm-dd'}}) as writer:
                 workbook = writer.book
                 
                 # 서식 정의
@@ -390,52 +453,35 @@ class CostEnhancedReportWriter(EnhancedReportWriter):
                 # 1. 📊 종합요약 (기존 + 비용 정보)
                 summary_data = self._create_cost_summary(analysis_results, cost_results)
                 summary_df = pd.DataFrame(summary_data, columns=['항목', '값'])
-                summary_df.to_excel(writer, sheet_name='📊 종합요약', index=False)
-                self._apply_sheet_format(writer, '📊 종합요약', summary_df, header_format)
+                self._write_sheet(writer, '📊 종합요약', summary_df, header_format)
                 
                 # 2. 💰 창고별_월별_운영비용
                 if 'warehouse_costs' in cost_results:
                     warehouse_cost_df = cost_results['warehouse_costs']
                     if not warehouse_cost_df.empty:
                         # 피벗 테이블로 변환
-                        warehouse_cost_pivot = warehouse_cost_df.pivot_table(
-                            index='Warehouse',
-                            columns='YearMonth',
-                            values='TotalCost',
-                            aggfunc='sum',
-                            fill_value=0
-                        ).reset_index()
+                        warehouse_cost_pivot = pivot_by_month(warehouse_cost_df, 'Warehouse', 'TotalCost').reset_index()
                         
-                        warehouse_cost_pivot.to_excel(writer, sheet_name='💰창고별_운영비용', index=False)
-                        self._apply_sheet_format(writer, '💰창고별_운영비용', warehouse_cost_pivot, header_format, currency_format)
+                        self._write_sheet(writer, '💰창고별_운영비용', warehouse_cost_pivot, header_format, currency_format)
                 
                 # 3. 🏗️ 사이트별_월별_배송비용
                 if 'site_costs' in cost_results:
                     site_cost_df = cost_results['site_costs']
                     if not site_cost_df.empty:
                         # 피벗 테이블로 변환
-                        site_cost_pivot = site_cost_df.pivot_table(
-                            index='Site',
-                            columns='YearMonth',
-                            values='TotalDeliveryCost',
-                            aggfunc='sum',
-                            fill_value=0
-                        ).reset_index()
+                        site_cost_pivot = pivot_by_month(site_cost_df, 'Site', 'TotalDeliveryCost').reset_index()
                         
-                        site_cost_pivot.to_excel(writer, sheet_name='🏗️사이트별_배송비용', index=False)
-                        self._apply_sheet_format(writer, '🏗️사이트별_배송비용', site_cost_pivot, header_format, currency_format)
+                        self._write_sheet(writer, '🏗️사이트별_배송비용', site_cost_pivot, header_format, currency_format)
                 
                 # 4. 📈 창고_효율성_분석
                 if 'efficiency_analysis' in cost_results and 'warehouse_efficiency' in cost_results['efficiency_analysis']:
                     warehouse_eff_df = cost_results['efficiency_analysis']['warehouse_efficiency']
-                    warehouse_eff_df.to_excel(writer, sheet_name='📈 창고_효율성_분석', index=False)
-                    self._apply_sheet_format(writer, '📈 창고_효율성_분석', warehouse_eff_df, header_format, currency_format)
+                    self._write_sheet(writer, '📈 창고_효율성_분석', warehouse_eff_df, header_format, currency_format)
                 
                 # 5. 🎯 사이트_효율성_분석
                 if 'efficiency_analysis' in cost_results and 'site_efficiency' in cost_results['efficiency_analysis']:
                     site_eff_df = cost_results['efficiency_analysis']['site_efficiency']
-                    site_eff_df.to_excel(writer, sheet_name='🎯 사이트_효율성_분석', index=False)
-                    self._apply_sheet_format(writer, '🎯 사이트_효율성_분석', site_eff_df, header_format, currency_format)
+                    self._write_sheet(writer, '🎯 사이트_효율성_분석', site_eff_df, header_format, currency_format)
                 
                 # 6. 기존 분석 시트들 추가
                 self._add_existing_analysis_sheets(writer, analysis_results, header_format, number_format)
@@ -498,6 +544,16 @@ class CostEnhancedReportWriter(EnhancedReportWriter):
         
         return summary_data
     
+    def _write_sheet(self, writer, sheet_name: str, df: pd.DataFrame, header_format, data_format=None):
+        """
+        시트 1개 기록 (constant_memory 호환 순서)
+        헤더 행 → 서식 → 데이터 행 순으로 기록 (이미 flush된 행은 다시 쓸 수 없음)
+        데이터는 write_frame_rows로 행 단위 기록 (날짜 셀은 워크북 default_date_format)
+        """
+        df.iloc[:0].to_excel(writer, sheet_name=sheet_name, index=False)
+        self._apply_sheet_format(writer, sheet_name, df, header_format, data_format)
+        write_frame_rows(writer.sheets[sheet_name], df)
+    
     def _apply_sheet_format(self, writer, sheet_name: str, df: pd.DataFrame, header_format, data_format=None):
         """시트 서식 적용"""
         try:
@@ -530,8 +586,7 @@ class CostEnhancedReportWriter(EnhancedReportWriter):
             if key in analysis_results and not analysis_results[key].empty:
                 try:
                     df = analysis_results[key]
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-                    self._apply_sheet_format(writer, sheet_name, df, header_format, number_format)
+                    self._write_sheet(writer, sheet_name, df, header_format, number_format)
                 except Exception as e:
                     print(f"⚠️ 기존 시트 추가 실패 ({sheet_name}): {e}")
 
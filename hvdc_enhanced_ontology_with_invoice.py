@@ -22,6 +22,7 @@ hvdc_ontology_pipeline.py를 기반으로 인보이스 데이터를 통합하여
 import pandas as pd
 import numpy as np
 import os
+import re
 import glob
 import json
 from datetime import datetime, timedelta
@@ -29,10 +30,19 @@ from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# 시트 로딩(Parquet 캐시) + 파일 병렬 로딩 + 날짜 변환은 공통 모듈 사용
+from hvdc_io import load_files_parallel, read_excel_cached, to_datetime_mixed
+
+# 선적번호 HE 패턴 (모듈 로드 시 1회 컴파일)
+HE_PATTERN = re.compile(r'(HE-\d+)')
+
 # =============================================================================
 # 1. ENHANCED ONTOLOGY CONFIGURATION (인보이스 클래스 추가)
 # =============================================================================
 
+# TTL 문자열 리터럴 이스케이프 (역슬래시/따옴표/줄바꿈 → Turtle ECHAR)
+_TTL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
 class EnhancedOntologyMapper:
     """인보이스 클래스를 포함한 향상된 온톨로지 매퍼"""
     
@@ -102,7 +112,7 @@ class EnhancedOntologyMapper:
     
     def map_dataframe_columns(self, df: pd.DataFrame, target_class: str) -> pd.DataFrame:
         """데이터프레임 컬럼을 온톨로지 속성에 매핑"""
-        mapped_df = df.copy()
+        mapped_df = df
         
         # 컬럼명을 온톨로지 속성으로 변환
         column_mapping = {}
@@ -118,6 +128,29 @@ class EnhancedOntologyMapper:
         
         return mapped_df
     
+    @staticmethod
+    def _ttl_literal(value) -> str:
+        """단일 값 → TTL 리터럴 (숫자는 그대로, 날짜는 xsd:dateTime, 나머지는 이스케이프한 문자열)"""
+        if isinstance(value, (int, float)):
+            return f"{value}"
+        if isinstance(value, datetime):
+            return f'"{value.isoformat()}"^^xsd:dateTime'
+        return '"' + str(value).translate(_TTL_ESCAPES) + '"'
+    
+    @staticmethod
+    def _ttl_literals(series: pd.Series) -> pd.Series:
+        """컬럼 → TTL 리터럴 Series (dtype별 벡터 포맷, 결측은 NaN)"""
+        present = series.notna()
+        if pd.api.types.is_numeric_dtype(series):
+            literals = series.astype(str)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            stamp = series.dt.strftime('%Y-%m-%dT%H:%M:%S')
+            stamp = stamp.where(series.dt.microsecond.eq(0), series.dt.strftime('%Y-%m-%dT%H:%M:%S.%f'))
+            literals = '"' + stamp + '"^^xsd:dateTime'
+        else:
+            return series[present].map(EnhancedOntologyMapper._ttl_literal).reindex(series.index)
+        return literals.where(present)
+    
     def export_to_ttl(self, data_dict: Dict[str, pd.DataFrame], output_file: str):
         """RDF/TTL 형식으로 데이터 출력"""
         try:
@@ -134,24 +167,20 @@ class EnhancedOntologyMapper:
                     ontology_class = self.class_mappings.get(class_name, class_name)
                     f.write(f"# {ontology_class} instances\n")
                     
-                    for idx, row in df.iterrows():
-                        subject_uri = f"ex:{class_name}_{idx}"
-                        f.write(f"{subject_uri} a ex:{ontology_class} ;\n")
-                        
-                        # 속성 출력
-                        properties = []
-                        for col, value in row.items():
-                            if pd.notna(value):
-                                prop_name = f"ex:{col}"
-                                if isinstance(value, (int, float)):
-                                    properties.append(f"    {prop_name} {value}")
-                                elif isinstance(value, datetime):
-                                    properties.append(f'    {prop_name} "{value.isoformat()}"^^xsd:dateTime')
-                                else:
-                                    properties.append(f'    {prop_name} "{str(value)}"')
-                        
-                        f.write(" ;\n".join(properties))
-                        f.write(" .\n\n")
+                    # 컬럼 단위로 리터럴을 만들어 행별 속성 문자열을 누적 (iterrows 없음)
+                    body = pd.Series('', index=df.index)
+                    started = np.zeros(len(df), dtype=bool)
+                    for col in df.columns:
+                        literals = self._ttl_literals(df[col])
+                        has_value = literals.notna().to_numpy()
+                        separator = pd.Series(np.where(started, ' ;\n', ''), index=df.index, dtype=object)
+                        prop = separator + f"    ex:{col} " + literals.fillna('')
+                        body = body.where(~has_value, body + prop)
+                        started |= has_value
+                    
+                    subjects = f"ex:{class_name}_" + df.index.astype(str)
+                    blocks = subjects + f" a ex:{ontology_class} ;\n" + body.to_numpy() + " .\n\n"
+                    f.write(''.join(blocks))
             
             print(f"📄 RDF/TTL 출력 완료: {output_file}")
             
@@ -189,7 +218,7 @@ class InvoiceAnalyzer:
         if self.invoice_df is None:
             return
         
-        df = self.invoice_df.copy()
+        df = self.invoice_df  # 새 컬럼만 추가하므로 복사 불필요
         
         # 컬럼명 표준화
         column_mapping = {
@@ -211,7 +240,7 @@ class InvoiceAnalyzer:
                 df[new_col] = df[old_col]
         
         # HE 패턴 추출
-        df['extracted_he_pattern'] = df['shipment_no'].str.extract(r'(HE-\d+)', expand=False)
+        df['extracted_he_pattern'] = df['shipment_no'].str.extract(HE_PATTERN, expand=False)
         
         # 날짜 형식 통일
         date_columns = ['operation_month', 'start_date', 'finish_date']
@@ -227,42 +256,30 @@ class InvoiceAnalyzer:
         if self.invoice_df is None:
             return {}
         
-        df = self.invoice_df.copy()
+        df = self.invoice_df  # 읽기 전용
         
         # 1. 월별 운영 분석
-        monthly_ops = df.groupby('operation_month').agg({
-            'shipment_no': 'nunique',
-            'packages_qty': 'sum',
-            'weight_kg': 'sum',
-            'cbm': 'sum',
-            'total_cost': 'sum',
-            'handling_in': 'sum',
-            'handling_out': 'sum'
-        }).fillna(0)
+        monthly_ops = self._group_totals(df, 'operation_month', [
+            'packages_qty', 'weight_kg', 'cbm', 'total_cost', 'handling_in', 'handling_out'
+        ])
         
         # 2. 카테고리별 분석
-        category_analysis = df.groupby('category').agg({
-            'shipment_no': 'nunique',
-            'packages_qty': 'sum',
-            'weight_kg': 'sum',
-            'cbm': 'sum',
-            'total_cost': 'sum'
-        }).fillna(0)
-        
-        # 3. HE 패턴 분석
-        he_pattern_analysis = df[df['extracted_he_pattern'].notna()].groupby('extracted_he_pattern').agg({
-            'shipment_no': 'nunique',
-            'packages_qty': 'sum',
-            'total_cost': 'sum'
-        }).fillna(0)
+        category_analysis = self._group_totals(df, 'category', ['packages_qty', 'weight_kg', 'cbm', 'total_cost'])
+        
+        # 3. HE 패턴 분석 (결측 패턴은 groupby에서 제외)
+        he_pattern_analysis = self._group_totals(df, 'extracted_he_pattern', ['packages_qty', 'total_cost'])
+        
+        # 전체 합계/고유 선적 수는 한 번만 계산해 재사용
+        totals = df[['packages_qty', 'weight_kg', 'cbm', 'total_cost', 'handling_in', 'handling_out']].sum()
+        total_shipments = df['shipment_no'].nunique()
         
         # 4. 비용 구조 분석 (CostStructure 클래스)
         cost_structure = {
-            'total_handling_in': df['handling_in'].sum(),
-            'total_handling_out': df['handling_out'].sum(),
-            'total_cost': df['total_cost'].sum(),
-            'avg_cost_per_shipment': df['total_cost'].sum() / df['shipment_no'].nunique() if df['shipment_no'].nunique() > 0 else 0,
-            'avg_cost_per_package': df['total_cost'].sum() / df['packages_qty'].sum() if df['packages_qty'].sum() > 0 else 0
+            'total_handling_in': totals['handling_in'],
+            'total_handling_out': totals['handling_out'],
+            'total_cost': totals['total_cost'],
+            'avg_cost_per_shipment': totals['total_cost'] / total_shipments if total_shipments > 0 else 0,
+            'avg_cost_per_package': totals['total_cost'] / totals['packages_qty'] if totals['packages_qty'] > 0 else 0
         }
         
         return {
@@ -271,36 +288,47 @@ class InvoiceAnalyzer:
             'he_pattern_analysis': he_pattern_analysis,
             'cost_structure': cost_structure,
             'summary': {
-                'total_shipments': df['shipment_no'].nunique(),
-                'total_packages': df['packages_qty'].sum(),
-                'total_weight_kg': df['weight_kg'].sum(),
-                'total_cbm': df['cbm'].sum(),
-                'total_cost': df['total_cost'].sum(),
+                'total_shipments': total_shipments,
+                'total_packages': totals['packages_qty'],
+                'total_weight_kg': totals['weight_kg'],
+                'total_cbm': totals['cbm'],
+                'total_cost': totals['total_cost'],
                 'unique_he_patterns': df['extracted_he_pattern'].nunique()
             }
         }
     
+    @staticmethod
+    def _group_totals(df: pd.DataFrame, key: str, sum_columns: List[str]) -> pd.DataFrame:
+        """키별 고유 선적 수 + 수치 합계 (nunique 대신 drop_duplicates + size)"""
+        sums = df.groupby(key, observed=True)[sum_columns].sum()
+        shipments = (
+            df.dropna(subset=['shipment_no'])
+            .drop_duplicates([key, 'shipment_no'])
+            .groupby(key, observed=True)
+            .size()
+            .reindex(sums.index, fill_value=0)
+        )
+        sums.insert(0, 'shipment_no', shipments)
+        return sums.fillna(0)
+    
     def create_invoice_ontology_data(self) -> Dict[str, pd.DataFrame]:
         """인보이스 데이터를 온톨로지 클래스별로 구조화"""
         if self.invoice_df is None:
             return {}
         
-        df = self.invoice_df.copy()
+        df = self.invoice_df  # 클래스별 컬럼 선택이 이미 새 프레임
         ontology_data = {}
         
         # InvoiceRecord 클래스
-        invoice_records = df[['shipment_no', 'operation_month', 'category', 'extracted_he_pattern']].copy()
-        invoice_records = invoice_records.dropna(subset=['shipment_no'])
+        invoice_records = df[['shipment_no', 'operation_month', 'category', 'extracted_he_pattern']].dropna(subset=['shipment_no'])
         ontology_data['InvoiceRecord'] = self.mapper.map_dataframe_columns(invoice_records, 'InvoiceRecord')
         
         # ShipmentOperation 클래스
-        shipment_ops = df[['shipment_no', 'packages_qty', 'weight_kg', 'cbm', 'start_date', 'finish_date']].copy()
-        shipment_ops = shipment_ops.dropna(subset=['shipment_no'])
+        shipment_ops = df[['shipment_no', 'packages_qty', 'weight_kg', 'cbm', 'start_date', 'finish_date']].dropna(subset=['shipment_no'])
         ontology_data['ShipmentOperation'] = self.mapper.map_dataframe_columns(shipment_ops, 'ShipmentOperation')
         
         # CostStructure 클래스
-        cost_structures = df[['shipment_no', 'total_cost', 'handling_in', 'handling_out']].copy()
-        cost_structures = cost_structures.dropna(subset=['shipment_no'])
+        cost_structures = df[['shipment_no', 'total_cost', 'handling_in', 'handling_out']].dropna(subset=['shipment_no'])
         ontology_data['CostStructure'] = self.mapper.map_dataframe_columns(cost_structures, 'CostStructure')
         
         print(f"🧠 인보이스 온톨로지 데이터 생성 완료: {len(ontology_data)}개 클래스")
@@ -311,6 +339,52 @@ class InvoiceAnalyzer:
 # 3. SIMPLIFIED WAREHOUSE ANALYZER (온톨로지 파이프라인 없이)
 # =============================================================================
 
+def _process_warehouse_file(file_path: str) -> Tuple[Optional[List], pd.DataFrame, Optional[str]]:
+    """
+    창고 파일 1개 → (Case No 목록, 월별 이벤트 long DataFrame, 오류 메시지)
+    프로세스 풀에서 실행되므로 모듈 최상위 함수 (출력은 호출 측에서)
+    """
+    filename = os.path.basename(file_path)
+    cases = None
+    try:
+        df = read_excel_cached(file_path)
+        
+        # Case No 추출
+        if 'Case No.' in df.columns:
+            cases = df['Case No.'].dropna().unique().tolist()
+        
+        # 날짜 컬럼에서 월별 데이터 추출 (wide → long, 행 단위 루프 없음)
+        date_columns = [col for col in df.columns if SimpleWarehouseAnalyzer._is_date_column(df[col])]
+        if not date_columns:
+            return cases, pd.DataFrame(), None
+        
+        dates = df[date_columns].apply(to_datetime_mixed).stack().dropna()
+        if dates.empty:
+            return cases, pd.DataFrame(), None
+        
+        rows = df.index.get_indexer(dates.index.get_level_values(0))
+        date_values = np.asarray(dates, dtype='datetime64[ns]')
+        
+        case_no = df['Case No.'].to_numpy() if 'Case No.' in df.columns else np.full(len(df), 'UNKNOWN', dtype=object)
+        if "Q'ty" in df.columns:
+            qty = pd.to_numeric(df["Q'ty"], errors='coerce')
+            qty = qty.mask(qty == 0, 1).to_numpy()  # 수량 0 → 1 (결측은 그대로)
+        else:
+            qty = np.ones(len(df))
+        
+        events = pd.DataFrame({
+            'Case_No': case_no[rows],
+            'Date': date_values,
+            'YearMonth': date_values.astype('datetime64[M]').astype(str),
+            'Location': dates.index.get_level_values(1).map(str),
+            'Qty': qty[rows],
+            'Source_File': filename
+        })
+        return cases, events, None
+        
+    except Exception as e:
+        return cases, pd.DataFrame(), str(e)
+
 class SimpleWarehouseAnalyzer:
     """간단한 창고 데이터 분석기"""
     
@@ -328,46 +402,26 @@ class SimpleWarehouseAnalyzer:
             ]
             
             all_cases = []
-            monthly_data = []
+            monthly_frames = []
+            
+            file_paths = [os.path.join(data_dir, filename) for filename in warehouse_files]
+            file_paths = [path for path in file_paths if os.path.exists(path)]
             
-            for filename in warehouse_files:
-                file_path = os.path.join(data_dir, filename)
-                if os.path.exists(file_path):
-                    try:
-                        df = pd.read_excel(file_path, sheet_name=0)
-                        
-                        # Case No 추출
-                        if 'Case No.' in df.columns:
-                            cases = df['Case No.'].dropna().unique().tolist()
-                            all_cases.extend(cases)
-                            print(f"✅ {filename}: {len(cases)}개 케이스")
-                        
-                        # 날짜 컬럼에서 월별 데이터 추출
-                        date_columns = [col for col in df.columns if self._is_date_column(df[col])]
-                        
-                        for _, row in df.iterrows():
-                            case_no = row.get('Case No.', 'UNKNOWN')
-                            qty = pd.to_numeric(row.get("Q'ty", 1), errors='coerce') or 1
-                            
-                            for date_col in date_columns:
-                                if pd.notna(row[date_col]):
-                                    date_val = pd.to_datetime(row[date_col], errors='coerce')
-                                    if pd.notna(date_val):
-                                        monthly_data.append({
-                                            'Case_No': case_no,
-                                            'Date': date_val,
-                                            'YearMonth': date_val.strftime('%Y-%m'),
-                                            'Location': str(date_col),
-                                            'Qty': qty,
-                                            'Source_File': filename
-                                        })
-                        
-                    except Exception as e:
-                        print(f"⚠️ {filename} 로드 실패: {e}")
+            # 파일별 로딩/변환은 서로 독립 → 병렬 실행, 결과 출력은 파일 순서대로
+            for file_path, (cases, events, error) in zip(file_paths, load_files_parallel(_process_warehouse_file, file_paths)):
+                filename = os.path.basename(file_path)
+                if cases is not None:
+                    all_cases.extend(cases)
+                    print(f"✅ {filename}: {len(cases)}개 케이스")
+                if error is not None:
+                    print(f"⚠️ {filename} 로드 실패: {error}")
+                elif not events.empty:
+                    monthly_frames.append(events)
             
+            monthly_data = pd.concat(monthly_frames, ignore_index=True) if monthly_frames else pd.DataFrame()
             self.warehouse_data = {
                 'cases': all_cases,
-                'monthly_data': pd.DataFrame(monthly_data),
+                'monthly_data': monthly_data,
                 'total_cases': len(all_cases)
             }
             
@@ -378,21 +432,19 @@ class SimpleWarehouseAnalyzer:
             print(f"❌ 창고 데이터 로드 실패: {e}")
             return False
     
-    def _is_date_column(self, series: pd.Series) -> bool:
-        """컬럼이 날짜 데이터인지 확인"""
+    @staticmethod
+    def _is_date_column(series: pd.Series) -> bool:
+        """컬럼이 날짜 데이터인지 확인 (샘플 10개 중 절반 초과가 날짜로 변환되면 날짜 컬럼)"""
         sample_values = series.dropna().head(10)
         if len(sample_values) == 0:
             return False
         
-        date_count = 0
-        for val in sample_values:
-            try:
-                pd.to_datetime(val)
-                date_count += 1
-            except:
-                pass
+        # 이미 datetime 타입이면 파싱 없이 판정
+        if pd.api.types.is_datetime64_any_dtype(sample_values):
+            return True
         
-        return date_count / len(sample_values) > 0.5
+        parsed = to_datetime_mixed(sample_values)
+        return parsed.notna().mean() > 0.5
     
     def analyze_warehouse_operations(self) -> Dict[str, Any]:
         """창고 운영 분석"""
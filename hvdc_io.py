@@ -0,0 +1,198 @@
+# hvdc_io.py - HVDC 분석 스크립트 공통 입출력 유틸리티
+"""
+HVDC 분석 스크립트들이 함께 쓰는 Excel 입출력 헬퍼
+
+- EXCEL_ENGINE: Excel 읽기 엔진 (python-calamine 설치 시 'calamine', 없으면 pandas 기본)
+- read_excel_cached: 시트 로딩 + 캐시 (필요한 컬럼만 파싱, 결측 문자열은 pandas 규칙대로 NaN,
+  Parquet로 왕복 불가한 시트는 pickle)
+- save_parquet_cache: Parquet 캐시 원자적 저장 (임시 파일 → os.replace)
+- load_files_parallel: 파일별 로더 병렬 실행 (엔진에 따라 스레드/프로세스 풀)
+- to_datetime_mixed: 값마다 형식이 다른 날짜 컬럼 일괄 변환 (변환 불가 → NaT)
+- write_frame_rows: DataFrame 데이터 행을 xlsxwriter 워크시트에 행 순서대로 기록
+"""
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+# Excel 읽기 엔진: python-calamine(Rust) 우선, 없으면 pandas 기본 엔진(openpyxl)
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# pandas 2.0+는 첫 값으로 형식을 추론해 컬럼 전체에 적용 → format='mixed'로 값별 추론 (1.x는 기본이 값별 추론)
+PANDAS_MIXED_FORMAT = int(pd.__version__.split('.')[0]) >= 2
+
+# 시트 캐시 형식 버전: 읽기 규칙(결측 처리 등)이나 캐시 형식이 바뀌면 올림 → 이전 캐시 무시
+CACHE_VERSION = 2
+
+# write_frame_rows 청크 크기: 이 행 수만큼씩 Python 객체로 변환해 기록 (최대 메모리 제한)
+WRITE_CHUNK_ROWS = int(os.environ.get('WRITE_CHUNK_ROWS', 10000))
+
+# 파일 병렬 로딩 최소 파일 수: 이보다 적으면 순차 로딩 (풀 기동 비용/로그 섞임 회피)
+PARALLEL_MIN_FILES = int(os.environ.get('LOAD_PARALLEL_MIN_FILES', 4))
+
+def read_excel_cached(filepath: str, sheet_name: Union[str, int] = 0,
+                      excel_file: Optional[pd.ExcelFile] = None,
+                      columns_filter: Optional[Callable[[pd.DataFrame], List]] = None,
+                      cache_key: str = '') -> pd.DataFrame:
+    """
+    Excel 시트 로딩 + 캐시 (원본보다 오래된 캐시는 무시)
+    캐시 위치: <원본 폴더>/.cache/<파일명>.<시트>[.<필터>].<키>.parquet (Parquet로 왕복 불가한 시트는 .pkl)
+    excel_file: 이미 열린 워크북 핸들 (있으면 재사용, 워크북 재파싱 방지)
+    columns_filter: 헤더 → 사용할 컬럼 목록 (usecols로 필요한 컬럼만 로딩)
+    cache_key: 호출 측 컬럼 규칙 지문 (패턴 상수가 바뀌면 다른 캐시 파일 사용)
+    """
+    cache_dir = os.path.join(os.path.dirname(filepath) or '.', '.cache')
+    cache_tag = f"{sheet_name}.{columns_filter.__name__}" if columns_filter else f"{sheet_name}"
+    # 캐시 형식 버전 + 읽기 엔진 + 호출 측 규칙이 하나라도 바뀌면 이전 캐시를 재사용하지 않음
+    key = hashlib.sha256(f"{CACHE_VERSION}|{EXCEL_ENGINE or 'default'}|{cache_key}".encode()).hexdigest()[:10]
+    cache_base = os.path.join(cache_dir, f"{os.path.basename(filepath)}.{cache_tag}.{key}")
+    
+    for cache_path, reader in ((f"{cache_base}.parquet", pd.read_parquet), (f"{cache_base}.pkl", pd.read_pickle)):
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(filepath):
+                return reader(cache_path)
+        except Exception:
+            pass  # 캐시 없음/손상/pyarrow 미설치 → 다음 형식 또는 Excel에서 읽기
+    
+    if columns_filter is None:
+        if excel_file is not None:
+            df = excel_file.parse(sheet_name)
+        else:
+            df = pd.read_excel(filepath, sheet_name=sheet_name, engine=EXCEL_ENGINE)
+    else:
+        # 헤더만 먼저 읽어 컬럼 선별 → 같은 워크북 핸들로 필요한 컬럼만 파싱
+        owns_file = excel_file is None
+        if owns_file:
+            excel_file = pd.ExcelFile(filepath, engine=EXCEL_ENGINE)
+        try:
+            header = excel_file.parse(sheet_name, nrows=0)
+            keep = set(columns_filter(header))
+            # 위치 인덱스로 전달 (숫자/날짜형 헤더가 섞여도 usecols 타입 제약 회피)
+            positions = [i for i, col in enumerate(header.columns) if col in keep]
+            df = excel_file.parse(sheet_name, usecols=positions)
+        finally:
+            if owns_file:
+                excel_file.close()
+    
+    _save_sheet_cache(df, cache_base)
+    return df
+
+def _save_sheet_cache(df: pd.DataFrame, cache_base: str):
+    """
+    시트 캐시 저장: Parquet 우선, 혼합 타입 object 컬럼(예: Case No. 문자열+정수)이나
+    문자열이 아닌 헤더(예: 2024)가 있어 Parquet로 그대로 왕복되지 않으면 pickle
+    """
+    errors = []
+    if all(isinstance(col, str) for col in df.columns):
+        error = _write_atomic(f"{cache_base}.parquet", df.to_parquet)
+        if error is None:
+            return
+        errors.append(error)
+    error = _write_atomic(f"{cache_base}.pkl", df.to_pickle)
+    if error is None:
+        return
+    errors.append(error)
+    reasons = '; '.join(f"{type(e).__name__}: {e}" for e in errors)
+    print(f"⚠️ 시트 캐시 저장 실패 ({os.path.basename(cache_base)}): {reasons}")
+
+def _write_atomic(cache_path: str, write: Callable[[str], Any]) -> Optional[Exception]:
+    """
+    같은 폴더의 임시 파일에 쓴 뒤 os.replace로 교체, 실패 시 예외 반환 (임시 파일은 삭제)
+    (여러 프로세스가 같은 .cache에 동시에 써도 읽는 쪽은 완성된 파일만 봄)
+    """
+    cache_dir = os.path.dirname(cache_path) or '.'
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.', suffix='.tmp')
+        os.close(fd)
+        write(tmp_path)
+        os.replace(tmp_path, cache_path)
+        return None
+    except Exception as e:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return e
+
+def save_parquet_cache(df: pd.DataFrame, cache_path: str, **kwargs) -> bool:
+    """
+    Parquet 캐시 원자적 저장 (임시 파일 → os.replace)
+    실패 시 경고 출력 후 False (혼합 타입 컬럼 등 Parquet 변환 불가, pyarrow 미설치 → 캐시 생략)
+    """
+    error = _write_atomic(cache_path, lambda tmp_path: df.to_parquet(tmp_path, **kwargs))
+    if error is not None:
+        print(f"⚠️ Parquet 캐시 저장 실패 ({os.path.basename(cache_path)}): {type(error).__name__}: {error}")
+    return error is None
+
+def to_datetime_mixed(values):
+    """
+    날짜 컬럼 일괄 변환 - 값별 pd.to_datetime(value, errors='coerce')와 같은 결과
+    (Excel 수기 입력 열처럼 '2024-01-05', '05/02/2024', datetime 객체가 섞여 있어도 값마다 형식 추론)
+    """
+    if PANDAS_MIXED_FORMAT:
+        return pd.to_datetime(values, errors='coerce', format='mixed')
+    return pd.to_datetime(values, errors='coerce')
+
+def load_files_parallel(loader, filepaths: List[str]) -> Iterator[Any]:
+    """
+    파일별 로더를 병렬 실행, 결과는 입력 순서대로 완료되는 즉시 전달 (제너레이터)
+    - calamine(Rust, GIL 해제): 스레드 풀 (프로세스 간 pickle 비용 없음)
+    - openpyxl(순수 Python, GIL 점유): 프로세스 풀 (forkserver/spawn 시작 → 워커 스레드가 떠 있는 부모를 fork하지 않음)
+    워커 수: LOAD_WORKERS 환경변수 (기본: 스레드 CPU 수 / 프로세스 CPU 수 - 1)
+    파일 수가 PARALLEL_MIN_FILES 미만이면 순차 실행 (로더 출력이 파일 순서대로 유지됨)
+    """
+    cpu_count = os.cpu_count() or 2
+    use_threads = EXCEL_ENGINE == 'calamine'
+    default_workers = cpu_count if use_threads else max(cpu_count - 1, 1)
+    workers = int(os.environ.get('LOAD_WORKERS', default_workers))
+    if workers <= 1 or len(filepaths) < max(PARALLEL_MIN_FILES, 2):
+        yield from map(loader, filepaths)
+        return
+    
+    max_workers = min(workers, len(filepaths))
+    if use_threads:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        # fork는 numba/BLAS 스레드가 실행 중인 부모 프로세스를 복제 → 자식이 잠긴 락을 물려받아 교착
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        pool = ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context(start_method))
+    with pool:
+        yield from pool.map(loader, filepaths)
+
+def write_frame_rows(worksheet, df: pd.DataFrame, datetime_format=None, start_row: int = 1,
+                     chunk_rows: int = WRITE_CHUNK_ROWS):
+    """
+    데이터 행 직접 기록 (itertuples → write_row, 셀별 스타일 조회 없음)
+    결측값은 빈 셀, datetime 컬럼만 날짜 서식 지정 (나머지는 컬럼 서식 적용)
+    constant_memory 워크북 호환: 행 순서대로 한 번씩만 기록
+    (pandas to_excel은 열 단위로 기록하므로 constant_memory에서 셀이 버려짐)
+    datetime_format: 없으면 워크북 default_date_format 사용
+    chunk_rows: Python 객체 변환 단위 (시트 전체를 object로 복사하지 않음)
+    """
+    datetime_cols = []
+    if datetime_format is not None:
+        datetime_cols = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(dtype)]
+    
+    for offset in range(0, len(df), chunk_rows):
+        chunk = df.iloc[offset:offset + chunk_rows]
+        values = chunk.astype(object).where(chunk.notna(), None)
+        # datetime 셀은 write_datetime으로 한 번만 기록 (write_row에는 None → 서식 없는 빈 셀은 기록 안 됨)
+        stamps = [values.iloc[:, col].tolist() for col in datetime_cols]
+        if datetime_cols:
+            values.iloc[:, datetime_cols] = None
+        for i, row in enumerate(values.itertuples(index=False, name=None)):
+            row_num = start_row + offset + i
+            worksheet.write_row(row_num, 0, row)
+            for col, column_stamps in zip(datetime_cols, stamps):
+                if column_stamps[i] is not None:
+                    worksheet.write_datetime(row_num, col, column_stamps[i], datetime_format)
@@ -22,6 +22,9 @@ from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# 일별 재고 누적 스윕 (numba 있으면 JIT, 없으면 NumPy 그룹별 cumsum)은 공통 모듈 사용
+from hvdc_compute import stock_sweep
+
 # =============================================================================
 # 1. ONTOLOGY CONFIGURATION
 # =============================================================================
@@ -459,41 +462,32 @@ class EnhancedAnalysisEngine:
             if col not in daily_pivot.columns:
                 daily_pivot[col] = 0
         
-        # 재고 계산 (위치별 누적)
-        stock_records = []
-        
-        for location in daily_pivot['Location'].unique():
-            if location in ['UNKNOWN', 'UNK']:
-                continue
-                
-            loc_data = daily_pivot[daily_pivot['Location'] == location].copy()
-            loc_data = loc_data.sort_values('Date')
-            
-            opening_stock = 0
-            
-            for _, row in loc_data.iterrows():
-                inbound = row['IN']
-                transfer_out = row['TRANSFER_OUT'] 
-                final_out = row['FINAL_OUT']
-                total_outbound = transfer_out + final_out
-                
-                closing_stock = opening_stock + inbound - total_outbound
-                
-                stock_records.append({
-                    'Location': location,
-                    'Date': row['Date'],
-                    'Opening_Stock': opening_stock,
-                    'Inbound': inbound,
-                    'Transfer_Out': transfer_out,
-                    'Final_Out': final_out,
-                    'Total_Outbound': total_outbound,
-                    'Closing_Stock': closing_stock,
-                    'Date_Snapshot': row['Date']  # 온톨로지 매핑용
-                })
-                
-                opening_stock = closing_stock
-        
-        daily_stock_df = pd.DataFrame(stock_records)
+        # 재고 계산 (위치별 누적): 위치·날짜 정렬 상태에서 위치 경계 플래그로 한 번에 스윕
+        daily_pivot = daily_pivot[~daily_pivot['Location'].isin(['UNKNOWN', 'UNK'])].reset_index(drop=True)
+        
+        locations = daily_pivot['Location'].to_numpy()
+        group_start = np.ones(len(daily_pivot), dtype=np.bool_)
+        group_start[1:] = locations[1:] != locations[:-1]
+        
+        inbound = daily_pivot['IN'].to_numpy()
+        transfer_out = daily_pivot['TRANSFER_OUT'].to_numpy()
+        final_out = daily_pivot['FINAL_OUT'].to_numpy()
+        total_outbound = transfer_out + final_out
+        opening, closing = stock_sweep(inbound - total_outbound, group_start)
+        
+        # 수량 dtype 유지 (정수 수량이면 재고도 정수)
+        qty_dtype = np.result_type(inbound, total_outbound)
+        daily_stock_df = pd.DataFrame({
+            'Location': locations,
+            'Date': daily_pivot['Date'].to_numpy(),
+            'Opening_Stock': opening.astype(qty_dtype, copy=False),
+            'Inbound': inbound,
+            'Transfer_Out': transfer_out,
+            'Final_Out': final_out,
+            'Total_Outbound': total_outbound,
+            'Closing_Stock': closing.astype(qty_dtype, copy=False),
+            'Date_Snapshot': daily_pivot['Date'].to_numpy()  # 온톨로지 매핑용
+        })
         print(f"✅ {len(daily_stock_df)}개 일별 재고 스냅샷 생성")
         
         return daily_stock_df
@@ -505,23 +499,24 @@ class EnhancedAnalysisEngine:
         if daily_stock_df.empty:
             return {"status": "SKIP", "message": "검증할 데이터 없음"}
         
-        validation_results = []
-        total_errors = 0
-        
-        for _, row in daily_stock_df.iterrows():
-            expected_closing = row['Opening_Stock'] + row['Inbound'] - row['Total_Outbound']
-            actual_closing = row['Closing_Stock']
-            difference = abs(actual_closing - expected_closing)
-            
-            if difference > 0.01:  # 부동소수점 오차 허용
-                total_errors += 1
-                validation_results.append({
-                    'Location': row['Location'],
-                    'Date': row['Date'],
-                    'Expected': expected_closing,
-                    'Actual': actual_closing,
-                    'Difference': difference
-                })
+        # 행 단위 루프 대신 배열 연산으로 기대 Closing 비교
+        expected_closing = (
+            daily_stock_df['Opening_Stock'].to_numpy(dtype=np.float64)
+            + daily_stock_df['Inbound'].to_numpy(dtype=np.float64)
+            - daily_stock_df['Total_Outbound'].to_numpy(dtype=np.float64)
+        )
+        actual_closing = daily_stock_df['Closing_Stock'].to_numpy(dtype=np.float64)
+        difference = np.abs(actual_closing - expected_closing)
+        
+        error_mask = difference > 0.01  # 부동소수점 오차 허용
+        total_errors = int(error_mask.sum())
+        validation_results = pd.DataFrame({
+            'Location': daily_stock_df['Location'].to_numpy()[error_mask],
+            'Date': daily_stock_df['Date'].to_numpy()[error_mask],
+            'Expected': expected_closing[error_mask],
+            'Actual': actual_closing[error_mask],
+            'Difference': difference[error_mask]
+        }).to_dict('records')
         
         if total_errors == 0:
             print("✅ 검증 통과! 모든 재고 계산이 정확합니다.")
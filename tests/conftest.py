@@ -0,0 +1,24 @@
+# tests/conftest.py - 공통 픽스처
+"""
+저장소 루트 모듈 import 경로 설정 + 'HVDC analysis.py' 로더
+(파일명에 공백이 있어 일반 import 불가 → importlib로 1회 로드)
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def hvdc():
+    """'HVDC analysis.py' 모듈"""
+    spec = importlib.util.spec_from_file_location('hvdc_analysis', os.path.join(ROOT, 'HVDC analysis.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,64 @@
+# tests/fixtures/make_fixtures.py - 테스트용 소형 워크북 생성
+"""
+tests/fixtures/*.xlsx 재생성 스크립트 (openpyxl)
+실행: python tests/fixtures/make_fixtures.py
+
+- header_edge.xlsx: 빈 헤더/중복 헤더/숫자 헤더, 중간/끝 빈 행, 길이가 다른 행, 결측 문자열('N/A', '')
+- sheet_fallback.xlsx: 요약 시트 뒤에 인보이스 시트 (키워드 시트 선택/첫 시트 대체)
+- sheet_type_stock.xlsx / sheet_type_billing.xlsx / sheet_type_unknown.xlsx: 시트명 기반 타입 판별
+"""
+
+import os
+from datetime import datetime
+
+import openpyxl
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _save(workbook: openpyxl.Workbook, filename: str):
+    workbook.save(os.path.join(FIXTURE_DIR, filename))
+
+def make_header_edge():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Movements'
+    ws.append(['Case No.', 'Qty', None, 'Qty', 2024, 'DSV Indoor'])
+    ws.append(['C1', 2, 'x', 3, 'a', datetime(2024, 1, 5)])
+    ws.append([None, None, None, None, None, None])
+    ws.append(['C2', 1, '', 4])
+    ws.append(['C3', 'N/A', 'y', 5, 'b', datetime(2024, 2, 7)])
+    ws.append(['N/A', 3, 'z', 6, 'c', 'N/A'])
+    ws.append([None, None, None, None, None, None])
+    _save(wb, 'header_edge.xlsx')
+
+def make_sheet_fallback():
+    wb = openpyxl.Workbook()
+    summary = wb.active
+    summary.title = 'Summary'
+    summary.append(['Note'])
+    summary.append(['monthly summary'])
+    invoice = wb.create_sheet('Invoice 2024')
+    invoice.append(['Operation Month', 'Category', 'TOTAL', 'Case No.'])
+    invoice.append([datetime(2024, 1, 1), 'Indoor(M44)', 1500.0, 'C1'])
+    invoice.append([datetime(2024, 2, 1), 'Outdoor', 800.0, 'C2'])
+    _save(wb, 'sheet_fallback.xlsx')
+
+def make_sheet_types():
+    for filename, sheet_names in [
+        ('sheet_type_stock.xlsx', ['Cover', 'Stock OnHand']),
+        ('sheet_type_billing.xlsx', ['Billing & Cost']),
+        ('sheet_type_unknown.xlsx', ['Sheet1', 'Data']),
+    ]:
+        wb = openpyxl.Workbook()
+        wb.active.title = sheet_names[0]
+        for name in sheet_names[1:]:
+            wb.create_sheet(name)
+        for ws in wb.worksheets:
+            ws.append(['Case No.', 'Qty'])
+            ws.append(['C1', 1])
+        _save(wb, filename)
+
+if __name__ == '__main__':
+    make_header_edge()
+    make_sheet_fallback()
+    make_sheet_types()
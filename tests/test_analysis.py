@@ -0,0 +1,184 @@
+# tests/test_analysis.py - HVDC analysis.py 집계 헬퍼 검증
+"""
+벡터화한 집계 헬퍼가 행 단위 기준 구현과 같은 결과를 내는지 작은 입력으로 확인
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hvdc_compute import running_inventory
+
+def test_cumulative_by_month_row_cumsum(hvdc):
+    moves = pd.DataFrame({
+        'Location': ['DSV Indoor', 'DSV Indoor', 'MOSB', 'MOSB'],
+        'YearMonth': ['2024-01', '2024-02', '2024-02', '2024-03'],
+        'Qty': [5.0, 3.0, 7.5, 2.0],
+    })
+    # pivot_table 결과(단일 float64 블록) → to_numpy가 읽기 전용 뷰를 돌려주는 경우
+    pivot = hvdc.pivot_by_month(moves, 'Location', 'Qty', engine='pandas').reset_index()
+    result = hvdc.cumulative_by_month(pivot, 'Location')
+    
+    expected = pivot.set_index('Location').cumsum(axis=1).reset_index()
+    pd.testing.assert_frame_equal(result, expected)
+    assert pivot['2024-03'].tolist() == [0.0, 2.0]  # 입력 피벗은 그대로
+
+def test_running_inventory_matches_grouped_cumsum():
+    locations = np.array(['DSV Indoor', 'DSV Indoor', 'MOSB', 'MOSB', 'MOSB', 'Shifting'])
+    inbound = np.array([10, 0, 5, 3, 0, 4])
+    outbound = np.array([0, 4, 0, 6, 1, 0])
+    group_start = np.ones(len(locations), dtype=np.bool_)
+    group_start[1:] = locations[1:] != locations[:-1]
+    
+    # 기준: 위치별로 전일 재고 + 입고 - 출고를 행 단위로 누적
+    expected = []
+    stock = {}
+    for loc, inc, out in zip(locations, inbound, outbound):
+        stock[loc] = stock.get(loc, 20) + inc - out
+        expected.append(stock[loc])
+    
+    result = running_inventory(inbound, outbound, initial=20, group_start=group_start)
+    np.testing.assert_array_equal(result, np.array(expected, dtype=float))
+    np.testing.assert_array_equal(running_inventory(inbound, outbound),
+                                  np.cumsum(inbound - outbound).astype(float))
+
+def test_map_loc_series_matches_map_loc(hvdc):
+    raw = pd.Series(['M44-BAY07', 'm1-01', ' OUT-3 ', 'MOSB yard', 'Hauler Indoor',
+                     'Unmapped Yard', None, np.nan, 123, ''], dtype=object)
+    
+    result = hvdc.map_loc_series(raw)
+    expected = [hvdc.map_loc(value) for value in raw]
+    assert result.tolist() == expected
+    assert result.iloc[5] == 'Unmapped Yard'  # 규칙에 없는 값은 원문(공백 제거) 유지
+    assert result.iloc[6] == result.iloc[7] == 'UNKNOWN'
+
+@pytest.mark.parametrize('use_numba', [True, False])
+def test_compute_sqm_cbm_matches_row_formula(hvdc, monkeypatch, use_numba):
+    if use_numba and not hvdc.NUMBA_AVAILABLE:
+        pytest.skip('numba 미설치')
+    monkeypatch.setattr(hvdc, 'NUMBA_AVAILABLE', use_numba)
+    # 결측 치수는 0으로 채워 전달 (치수 컬럼 자체가 없으면 0 배열)
+    length = np.array([1.2, 0.0, 2.0, 1.5, 0.0])
+    width = np.array([1.0, 1.0, 0.5, 0.0, 0.0])
+    height = np.array([0.5, 2.0, 0.0, 1.0, 0.0])
+    qty = np.array([2.0, 3.0, 1.0, 4.0, 1.0])
+    
+    # 기준: 행별 SQM = L × W × Qty, CBM = SQM × H (SQM > 0인 경우만)
+    expected_sqm = [l * w * q for l, w, q in zip(length, width, qty)]
+    expected_cbm = [s * h if s > 0 else 0 for s, h in zip(expected_sqm, height)]
+    
+    sqm, cbm = hvdc.compute_sqm_cbm(length, width, height, qty)
+    np.testing.assert_allclose(sqm, expected_sqm)
+    np.testing.assert_allclose(cbm, expected_cbm)
+    
+    missing = np.zeros(3)
+    sqm, cbm = hvdc.compute_sqm_cbm(missing, missing, missing, np.ones(3))
+    assert sqm.tolist() == [0.0, 0.0, 0.0] and cbm.tolist() == [0.0, 0.0, 0.0]
+
+def test_monthly_events_without_outbound_rows(hvdc):
+    df = pd.DataFrame({
+        'Case_No': ['C1', 'C2', 'C3'],
+        'Date': pd.to_datetime(['2024-01-03', '2024-01-20', '2024-02-02']),
+        'Qty': [1, 2, 3],
+        'SQM': [1.0, 2.0, 3.0],
+        'Loc_From': [None, 'DSV Indoor', None],
+        'Loc_To': ['DSV Indoor', 'MOSB', None],
+        'Site': [None, None, 'DAS'],
+        'TxType': ['IN', 'TRANSFER', 'FINAL'],
+    }, index=[10, 11, 12])
+    
+    events = hvdc.StockEngine._monthly_events(df)
+    # 출고 이벤트가 없는 슬라이스 → 입고 2건만 (빈 출고 슬라이스에 결측 행이 생기지 않음)
+    assert events['TxType'].tolist() == ['IN', 'IN']
+    assert events['Location'].tolist() == ['DSV Indoor', 'MOSB']
+    assert events['YearMonth'].tolist() == ['2024-01', '2024-01']
+
+def _monthly_movements() -> pd.DataFrame:
+    """입고/출고/이동 혼합, 같은 Case가 여러 달·여러 청크에 걸침, 위치 없는 행 포함"""
+    return pd.DataFrame({
+        'Case_No': ['C1', 'C1', 'C2', 'C3', 'C2', 'C4', 'C1', 'C5'],
+        'Date': pd.to_datetime(['2024-01-03', '2024-01-20', '2024-01-21', '2024-02-02',
+                                '2024-02-10', '2024-02-11', '2024-03-01', '2024-03-05']),
+        'Qty': [1, 1, 2, 5, 2, 3, 1, 4],
+        'SQM': [1.5, 1.5, 2.0, 7.25, 2.0, 3.0, 1.5, 0.0],
+        'Loc_From': [None, 'DSV Indoor', None, None, 'DSV Outdoor', 'MOSB', 'MOSB', None],
+        'Loc_To': ['DSV Indoor', 'MOSB', 'DSV Outdoor', 'DSV Indoor', None, None, None, None],
+        'Site': [None, None, None, None, 'DAS', 'MIR', 'DAS', 'SHU'],
+        'TxType': ['IN', 'TRANSFER', 'IN', 'IN', 'OUT', 'OUT', 'OUT', 'OUT'],
+    })
+
+def _normalized_summary(summary: pd.DataFrame) -> pd.DataFrame:
+    keys = ['Location', 'YearMonth', 'TxType']
+    summary = summary[keys + ['Qty', 'SQM', 'Case_No']].astype({key: object for key in keys})
+    return summary.sort_values(keys).reset_index(drop=True)
+
+def test_monthly_summary_paths_agree(hvdc):
+    df = _monthly_movements()
+    _, pandas_summary = hvdc.StockEngine._monthly_summary_pandas(df)
+    chunked_summary, months, locations = hvdc.StockEngine._monthly_summary_chunked(df, chunksize=3)
+    
+    expected = _normalized_summary(pandas_summary)
+    pd.testing.assert_frame_equal(_normalized_summary(chunked_summary), expected, check_dtype=False)
+    assert months == ['2024-01', '2024-02', '2024-03']
+    assert locations == ['DSV Indoor', 'DSV Outdoor', 'MOSB']
+    # C1은 1월 DSV Indoor 입고 1회, MOSB 출고 1회 → 고유 Case 수 1
+    row = expected[(expected['Location'] == 'MOSB') & (expected['TxType'] == 'IN')]
+    assert row['Case_No'].tolist() == [1]
+    
+    if hvdc.POLARS_AVAILABLE:
+        _, polars_summary = hvdc.StockEngine._monthly_summary_polars(df)
+        pd.testing.assert_frame_equal(_normalized_summary(polars_summary), expected, check_dtype=False)
+    else:
+        pytest.skip('polars 미설치 - pandas/청크 경로만 비교')
+
+def test_categorize_movements_keeps_wide_qty_dtype(hvdc):
+    df = pd.DataFrame({'Loc_To': ['DSV Indoor'] * 3, 'Qty': [100.0, 100.0, 1.0]})
+    result = hvdc.categorize_movements(df.copy())
+    
+    # 작은 값만 있어도 int64 유지 → 합계가 int8 범위(127)를 넘어도 정확
+    assert result['Qty'].dtype == np.int64
+    assert result['Qty'].sum() == 201
+    assert result['Qty'].cumsum().iloc[-1] == 201
+    
+    fractional = hvdc.categorize_movements(pd.DataFrame({'Qty': [1.5, 2.0, None]}))
+    assert fractional['Qty'].dtype == np.float64
+
+def test_extract_case_movements_parses_mixed_date_formats(hvdc):
+    df = pd.DataFrame({
+        'Case No.': ['C1', 'C2', 'C3'],
+        "Q'ty": [1, 2, 3],
+        'DSV Indoor': ['2024-01-05', '05/02/2024', None],
+        'DAS': [None, '2024-03-07 10:00', 'TBA'],
+    })
+    movements = hvdc.DataExtractor.extract_case_movements(df, 'BL', 'mixed.xlsx')
+    
+    # 첫 값과 형식이 다른 날짜도 NaT로 버려지지 않음 (값별 형식 추론)
+    dates = set(pd.to_datetime(movements['Date'].dropna()))
+    assert dates == {pd.Timestamp('2024-01-05'), pd.Timestamp('2024-05-02'), pd.Timestamp('2024-03-07 10:00')}
+
+def test_stock_monthly_site_matches_sorted_last_row(hvdc):
+    tx = pd.DataFrame({
+        'Case_No': ['C1', 'C1', 'C2', 'C2', 'C3', 'C3', None, 'C4'],
+        'Date': pd.to_datetime(['2024-01-05', '2024-02-01', '2024-03-01', '2024-03-01',
+                                '2024-01-10', None, '2024-02-02', None]),
+        'Loc_To': ['DSV Indoor', 'MOSB', 'DSV Indoor', 'DSV Outdoor', 'MOSB', 'DSV Indoor', 'MOSB', 'MOSB'],
+        'Site': ['UNK', 'DAS', 'UNK', 'MIR', 'UNK', 'UNK', 'SHU', 'AGI'],
+        'Qty': [1, 1, 2, 2, 3, 3, 4, 5],
+        'SQM': [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 4.0, 5.0],
+        'CBM': [0.5, 0.5, 1.0, 1.0, 1.5, 1.5, 2.0, 2.5],
+    }, index=[7, 3, 5, 1, 0, 2, 6, 4])
+    
+    # 기준: 기존 구현 (Date 안정 정렬 → 케이스별 마지막 행, NaT는 맨 뒤로 → 날짜 없는 행이 최종 상태)
+    latest = tx.sort_values('Date', kind='stable').groupby('Case_No').tail(1)
+    latest = latest.assign(YearMonth=hvdc.format_year_month(latest['Date']))
+    expected = latest.groupby(['Loc_To', 'Site', 'YearMonth']).agg(
+        BoxQty=('Qty', 'size'), Qty=('Qty', 'sum'), SQM=('SQM', 'sum'), CBM=('CBM', 'sum')
+    ).reset_index().rename(columns={'Loc_To': 'Loc'}).sort_values(['YearMonth', 'Loc', 'Site'])
+    
+    result = hvdc.StockEngine.stock_monthly_site(tx)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
+    # C2 동률 → 원래 순서상 마지막 행(MIR), C3/C4 날짜 없음 → 'NaT' 월로 집계, Case_No 결측 행 제외
+    assert ('DSV Outdoor', 'MIR', '2024-03') in set(zip(result['Loc'], result['Site'], result['YearMonth']))
+    assert result.loc[result['YearMonth'] == 'NaT', 'BoxQty'].sum() == 2
+    assert 'SHU' not in set(result['Site'])
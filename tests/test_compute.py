@@ -0,0 +1,45 @@
+# tests/test_compute.py - 공통 집계 헬퍼 검증
+"""
+hvdc_compute 집계 헬퍼의 엔진별(pandas/polars, numba/NumPy) 결과 일치 확인
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import hvdc_compute
+from hvdc_compute import pivot_by_month, stock_sweep
+
+def test_pivot_by_month_polars_matches_pandas():
+    pytest.importorskip('polars')
+    frame = pd.DataFrame({
+        'Warehouse': ['DSV Indoor', 'DSV Outdoor', 'DSV Indoor', None, 'MOSB'],
+        'YearMonth': ['2024-02', '2024-01', '2024-02', '2024-01', None],
+        'TotalCost': [10.0, 5.0, 2.5, 7.0, 3.0],
+    })
+    
+    expected = pivot_by_month(frame, 'Warehouse', 'TotalCost', engine='pandas')
+    result = pivot_by_month(frame, 'Warehouse', 'TotalCost', engine='polars')
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                  check_column_type=False, check_names=False)
+    assert result.loc['DSV Indoor', '2024-02'] == 12.5
+    assert result.loc['DSV Outdoor', '2024-02'] == 0
+
+@pytest.mark.parametrize('use_numba', [True, False])
+def test_stock_sweep_matches_groupby_cumsum(monkeypatch, use_numba):
+    if use_numba and not hvdc_compute.NUMBA_AVAILABLE:
+        pytest.skip('numba 미설치')
+    monkeypatch.setattr(hvdc_compute, 'NUMBA_AVAILABLE', use_numba)
+    locations = np.array(['DSV Indoor', 'DSV Indoor', 'DSV Indoor', 'MOSB', 'MOSB', 'Shifting'])
+    net = np.array([5, -2, 4, 3, -3, 7])
+    group_start = np.ones(len(net), dtype=np.bool_)
+    group_start[1:] = locations[1:] != locations[:-1]
+    
+    opening, closing = stock_sweep(net, group_start)
+    expected = pd.Series(net).groupby(locations).cumsum().to_numpy(dtype=float)
+    np.testing.assert_array_equal(closing, expected)
+    np.testing.assert_array_equal(opening, expected - net)
+    
+    # group_start 생략 → 전체 한 그룹
+    np.testing.assert_array_equal(stock_sweep(net)[1], np.cumsum(net).astype(float))
+    assert stock_sweep(np.array([]))[1].shape == (0,)
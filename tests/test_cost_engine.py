@@ -0,0 +1,145 @@
+# tests/test_cost_engine.py - 비용 엔진 벡터 계산 검증
+"""
+창고/사이트 월별 비용 계산을 행 단위(iterrows) 기준 구현과 비교
+(인보이스 미매핑 카테고리/결측 카테고리 → '기타' 창고, 인보이스에 없는 창고 → 기본 비율)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hvdc_cost_enhanced_analysis import CostAnalysisEngine, OntologyMapper
+
+CATEGORY_WAREHOUSE_MAP = {'Indoor(M44)': 'DSV Indoor', 'Outdoor': 'DSV Outdoor', 'Al Markaz': 'DSV Al Markaz'}
+
+def _invoice() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Operation Month': ['2024-01-01', '2024-01-01', '2024-02-01', '2024-02-01', '2024-03-01'],
+        'Category': ['Indoor(M44)', 'Outdoor', 'Indoor(M44)', 'Shifting', None],
+        "pkgs q'ty": [10, 4, 6, 5, 5],
+        'TOTAL': [1000.0, 300.0, 500.0, 250.0, 100.0],
+        'Handling In': [200.0, 40.0, 90.0, 25.0, 10.0],
+        'Handling out': [100.0, 20.0, 60.0, 50.0, 20.0],
+        'Unstuffing': [50.0, 0.0, 10.0, 0.0, 0.0],
+        'Stuffing': [25.0, 0.0, 10.0, 0.0, 0.0],
+        'folk lift': [0.0, 0.0, 0.0, 0.0, 0.0],
+        'crane': [0.0, 0.0, 0.0, 0.0, 0.0],
+    })
+
+def _movements() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Location': ['DSV Indoor', 'DSV Indoor', 'DSV Outdoor', 'MOSB', '기타', 'DSV Indoor', 'MOSB'],
+        'Date': pd.to_datetime(['2024-01-03', '2024-01-09', '2024-01-20', '2024-02-02',
+                                '2024-02-05', '2024-02-11', '2024-02-12']),
+        'TxType_Refined': ['IN', 'IN', 'TRANSFER_OUT', 'FINAL_OUT', 'IN', 'ADJUST', 'FINAL_OUT'],
+        'Qty': [3, 2, 4, 5, 1, 2, 2],
+        'Case_No': ['C1', 'C1', 'C2', 'C3', None, 'C4', 'C5'],
+        'Site': ['UNK', 'UNK', 'UNK', 'DAS', 'UNK', 'UNK', 'MIR'],
+    })
+
+def _reference_rates(invoice: pd.DataFrame) -> dict:
+    """기존 구현: 카테고리 map + fillna('기타') → 창고별 비율 dict"""
+    df = invoice.rename(columns={"pkgs q'ty": 'packages_qty', 'TOTAL': 'total_cost',
+                                 'Handling In': 'handling_in_cost', 'Handling out': 'handling_out_cost',
+                                 'Unstuffing': 'unstuffing_cost', 'Stuffing': 'stuffing_cost'})
+    df['warehouse'] = df['Category'].map(CATEGORY_WAREHOUSE_MAP).fillna('기타')
+    grouped = df.groupby('warehouse')[['packages_qty', 'total_cost', 'handling_in_cost', 'handling_out_cost',
+                                        'unstuffing_cost', 'stuffing_cost']].sum()
+    rates = pd.DataFrame({
+        'cost_per_package': grouped['total_cost'] / grouped['packages_qty'],
+        'handling_in_rate': grouped['handling_in_cost'] / grouped['packages_qty'],
+        'handling_out_rate': grouped['handling_out_cost'] / grouped['packages_qty'],
+        'unstuffing_rate': grouped['unstuffing_cost'] / grouped['packages_qty'],
+        'stuffing_rate': grouped['stuffing_cost'] / grouped['packages_qty'],
+    })
+    return {
+        'avg_cost_per_package': df['total_cost'].sum() / df['packages_qty'].sum(),
+        'warehouse_rates': rates.to_dict('index'),
+    }
+
+def _reference_warehouse_costs(rates: dict, data: pd.DataFrame) -> pd.DataFrame:
+    """기존 구현: (창고, 월, TxType) 집계 후 iterrows로 행별 단가 조회"""
+    data = data.assign(year_month=data['Date'].dt.strftime('%Y-%m'))
+    monthly = data.groupby(['Location', 'year_month', 'TxType_Refined']).agg(
+        {'Qty': 'sum', 'Case_No': 'nunique'}).reset_index()
+    
+    rows = []
+    for _, row in monthly.iterrows():
+        warehouse_rates = rates['warehouse_rates'].get(row['Location'], {})
+        if not warehouse_rates:
+            cost_per_package = rates['avg_cost_per_package']
+            handling_in_rate = cost_per_package * 0.3
+            handling_out_rate = cost_per_package * 0.2
+        else:
+            cost_per_package = warehouse_rates['cost_per_package']
+            handling_in_rate = warehouse_rates['handling_in_rate']
+            handling_out_rate = warehouse_rates['handling_out_rate']
+        
+        tx_type, qty = row['TxType_Refined'], row['Qty']
+        if tx_type == 'IN':
+            cost, cost_type = qty * handling_in_rate, '입고처리비'
+        elif tx_type in ['TRANSFER_OUT', 'FINAL_OUT']:
+            cost, cost_type = qty * handling_out_rate, '출고처리비'
+        else:
+            cost, cost_type = qty * cost_per_package * 0.1, '기타운영비'
+        rows.append({
+            'Warehouse': row['Location'], 'YearMonth': row['year_month'], 'TxType': tx_type,
+            'CostType': cost_type, 'Qty': qty, 'Cases': row['Case_No'],
+            'CostPerUnit': handling_in_rate if tx_type == 'IN' else handling_out_rate,
+            'TotalCost': cost,
+        })
+    return pd.DataFrame(rows)
+
+def _reference_site_costs(rates: dict, data: pd.DataFrame) -> pd.DataFrame:
+    """기존 구현: 사이트 배송(FINAL_OUT, UNK 제외) 월별 집계 후 행별 비용"""
+    deliveries = data[(data['TxType_Refined'] == 'FINAL_OUT') & (data['Site'] != 'UNK')]
+    deliveries = deliveries.assign(year_month=deliveries['Date'].dt.strftime('%Y-%m'))
+    monthly = deliveries.groupby(['Site', 'year_month']).agg({'Qty': 'sum', 'Case_No': 'nunique'}).reset_index()
+    transportation_rate = rates['avg_cost_per_package'] * 0.3
+    site_handling_rate = rates['avg_cost_per_package'] * 0.15
+    return pd.DataFrame({
+        'Site': monthly['Site'],
+        'YearMonth': monthly['year_month'],
+        'DeliveredQty': monthly['Qty'],
+        'DeliveredCases': monthly['Case_No'],
+        'TransportationRate': transportation_rate,
+        'SiteHandlingRate': site_handling_rate,
+        'TotalDeliveryCost': monthly['Qty'] * (transportation_rate + site_handling_rate),
+    })
+
+def _normalized(frame: pd.DataFrame, keys) -> pd.DataFrame:
+    frame = frame.astype({key: object for key in keys})
+    return frame.sort_values(keys).reset_index(drop=True)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = CostAnalysisEngine(OntologyMapper(str(tmp_path / 'missing_rules.json')))
+    engine.invoice_data = _invoice()
+    engine._preprocess_cost_data()
+    engine._calculate_cost_rates()
+    return engine
+
+def test_unmapped_and_missing_categories_map_to_other(engine):
+    warehouses = engine.invoice_data['warehouse'].astype(object).tolist()
+    assert warehouses == ['DSV Indoor', 'DSV Outdoor', 'DSV Indoor', '기타', '기타']
+    assert '기타' in engine.cost_rates['warehouse_rates'].index
+
+def test_warehouse_monthly_costs_match_row_loop(engine):
+    reference_rates = _reference_rates(_invoice())
+    assert engine.cost_rates['avg_cost_per_package'] == pytest.approx(reference_rates['avg_cost_per_package'])
+    
+    keys = ['Warehouse', 'YearMonth', 'TxType']
+    result = _normalized(engine.calculate_warehouse_monthly_costs(_movements()), keys + ['CostType'])
+    expected = _normalized(_reference_warehouse_costs(reference_rates, _movements()), keys + ['CostType'])
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    
+    # MOSB는 인보이스에 없는 창고 → 평균 단가 × 0.2 (출고)
+    mosb = result[result['Warehouse'] == 'MOSB']
+    np.testing.assert_allclose(mosb['CostPerUnit'], reference_rates['avg_cost_per_package'] * 0.2)
+
+def test_site_monthly_costs_match_row_loop(engine):
+    reference_rates = _reference_rates(_invoice())
+    keys = ['Site', 'YearMonth']
+    result = _normalized(engine.calculate_site_monthly_costs(_movements()), keys)
+    expected = _normalized(_reference_site_costs(reference_rates, _movements()), keys)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
@@ -0,0 +1,79 @@
+# tests/test_excel_fixtures.py - 소형 워크북 픽스처 기반 Excel 로딩 검증
+"""
+헤더/결측 처리(read_excel_cached = pandas.read_excel), 키워드 시트 선택/대체, 시트명 기반 파일 타입 판별 확인
+픽스처 재생성: python tests/fixtures/make_fixtures.py
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from hvdc_io import read_excel_cached
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def fixture_path(filename: str) -> str:
+    return os.path.join(FIXTURE_DIR, filename)
+
+def test_read_excel_cached_matches_pandas(tmp_path):
+    path = shutil.copy(fixture_path('header_edge.xlsx'), tmp_path / 'header_edge.xlsx')
+    expected = pd.read_excel(path)
+    result = read_excel_cached(str(path))
+    
+    # 빈 헤더 → 'Unnamed: 2', 중복 → 'Qty.1', 숫자 헤더는 그대로, 중간 빈 행은 결측 행으로 유지
+    assert list(result.columns) == ['Case No.', 'Qty', 'Unnamed: 2', 'Qty.1', 2024, 'DSV Indoor']
+    pd.testing.assert_frame_equal(result, expected)
+    # 'N/A'/빈 문자열 셀은 결측값 (문자열로 남으면 가짜 창고/Case로 집계됨)
+    assert result['Case No.'].isna().tolist() == [False, True, False, False, True]
+    assert result['Qty'].isna().tolist() == [False, True, False, True, False]
+    assert result['Unnamed: 2'].isna().tolist() == [False, True, True, False, False]
+    assert result['DSV Indoor'].isna().tolist() == [False, True, True, False, True]
+
+def test_read_excel_cached_columns_filter_matches_pandas(tmp_path):
+    def case_and_qty(header: pd.DataFrame):
+        return [col for col in header.columns if str(col).startswith(('Case', 'Qty'))]
+    
+    path = shutil.copy(fixture_path('header_edge.xlsx'), tmp_path / 'header_edge.xlsx')
+    result = read_excel_cached(str(path), columns_filter=case_and_qty)
+    
+    assert list(result.columns) == ['Case No.', 'Qty', 'Qty.1']
+    pd.testing.assert_frame_equal(result, pd.read_excel(path, usecols=[0, 1, 3]))
+    assert result['Qty.1'].tolist()[2:] == [4, 5, 6]  # 짧은 행의 빈 칸도 위치 유지
+
+def test_select_sheet_prefers_keyword_then_first_sheet(hvdc):
+    sheet_names = hvdc.xlsx_sheet_names(fixture_path('sheet_fallback.xlsx'))
+    assert sheet_names == ['Summary', 'Invoice 2024']
+    assert hvdc.select_sheet(sheet_names, hvdc.SHEET_TYPE_KEYWORDS['INVOICE']) == 'Invoice 2024'
+    assert hvdc.select_sheet(sheet_names, hvdc.SHEET_TYPE_KEYWORDS['ONHAND']) == 'Summary'
+
+def test_load_invoice_reads_keyword_sheet(hvdc, tmp_path):
+    # 캐시(.cache)가 픽스처 폴더에 생기지 않도록 복사본 사용
+    path = shutil.copy(fixture_path('sheet_fallback.xlsx'), tmp_path / 'HVDC WAREHOUSE_INVOICE.xlsx')
+    invoice = hvdc.DataExtractor.load_invoice(str(path))
+    
+    assert len(invoice) == 2
+    assert set(invoice['TxType']) == {'COST'}
+
+def test_read_excel_cached_named_sheet(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = shutil.copy(fixture_path('sheet_fallback.xlsx'), tmp_path / 'invoice.xlsx')
+    df = read_excel_cached(str(path), 'Invoice 2024')
+    
+    assert list(df.columns) == ['Operation Month', 'Category', 'TOTAL', 'Case No.']
+    cache_files = os.listdir(tmp_path / '.cache')
+    assert len(cache_files) == 1
+    assert cache_files[0].startswith('invoice.xlsx.Invoice 2024.') and cache_files[0].endswith('.parquet')
+
+@pytest.mark.parametrize('filename, expected', [
+    ('sheet_type_stock.xlsx', 'ONHAND'),
+    ('sheet_type_billing.xlsx', 'INVOICE'),  # 시트명 '&'는 XML에서 &amp; → 복원 후 비교
+    ('sheet_type_unknown.xlsx', 'UNKNOWN'),
+    ('missing.xlsx', 'UNKNOWN'),
+])
+def test_detect_file_type_from_sheets(hvdc, filename, expected):
+    assert hvdc.detect_file_type_from_sheets(fixture_path(filename)) == expected
+
+def test_xlsx_sheet_names_unescapes_xml(hvdc):
+    assert hvdc.xlsx_sheet_names(fixture_path('sheet_type_billing.xlsx')) == ['Billing & Cost']
@@ -0,0 +1,82 @@
+# tests/test_invoice_module.py - 인보이스 통합 온톨로지 모듈 검증
+"""
+창고 파일 wide → long 변환, 날짜 컬럼 판별, 컬럼 매핑, TTL 리터럴 이스케이프 확인
+"""
+
+import warnings
+
+import pandas as pd
+
+from hvdc_enhanced_ontology_with_invoice import (
+    EnhancedOntologyMapper, SimpleWarehouseAnalyzer, _process_warehouse_file,
+)
+
+def test_process_warehouse_file_parses_mixed_date_formats(tmp_path):
+    path = tmp_path / 'HVDC WAREHOUSE_TEST.xlsx'
+    pd.DataFrame({
+        'Case No.': ['C1', 'C2', 'C3'],
+        "Q'ty": [2, 0, 1],
+        'DSV Indoor': ['2024-01-05', '05/02/2024', '2024-03-07'],
+    }).to_excel(path, index=False)
+    
+    cases, events, error = _process_warehouse_file(str(path))
+    assert error is None
+    assert cases == ['C1', 'C2', 'C3']
+    # 첫 값과 형식이 다른 날짜('05/02/2024')도 이벤트로 남음
+    indoor = events[events['Location'] == 'DSV Indoor']
+    assert indoor['YearMonth'].tolist() == ['2024-01', '2024-05', '2024-03']
+    assert indoor['Qty'].tolist() == [2, 1, 1]  # 수량 0 → 1
+
+def test_process_warehouse_file_treats_na_strings_as_missing(tmp_path):
+    path = tmp_path / 'HVDC WAREHOUSE_NA.xlsx'
+    pd.DataFrame({
+        'Case No.': [f"C{i}" for i in range(12)] + ['N/A'],
+        "Q'ty": [1] * 13,
+        # 앞쪽 10개가 'N/A'여도 날짜 컬럼으로 판별되어야 함 (실제 창고 파일의 미입고 표시)
+        'DSV Indoor': ['N/A'] * 10 + ['2024-01-05', '2024-02-07', '2024-03-09'],
+    }).to_excel(path, index=False)
+    
+    cases, events, error = _process_warehouse_file(str(path))
+    assert error is None
+    assert 'N/A' not in cases
+    indoor = events[events['Location'] == 'DSV Indoor']
+    assert indoor['YearMonth'].tolist() == ['2024-01', '2024-02', '2024-03']
+
+def test_is_date_column_counts_each_value_format():
+    # 첫 값(ISO)과 다른 형식이 과반 → 값별 형식 추론으로만 날짜 컬럼 판정
+    mixed = pd.Series(['2024-01-05', '05/02/2024', '07/03/2024', '12/31/2024', 'TBA'])
+    assert SimpleWarehouseAnalyzer._is_date_column(mixed)
+    assert not SimpleWarehouseAnalyzer._is_date_column(pd.Series(['C1', 'C2', None]))
+    assert not SimpleWarehouseAnalyzer._is_date_column(pd.Series([None, None]))
+
+def test_map_dataframe_columns_renames_without_touching_input(tmp_path):
+    mapper = EnhancedOntologyMapper(mapping_file=str(tmp_path / 'missing.json'))
+    mapper.property_mappings = {
+        'Case No.': {'subject_class': 'Case', 'predicate': 'hasCaseNumber'},
+        'Qty': {'subject_class': 'StockSnapshot', 'predicate': 'hasQuantity'},
+    }
+    df = pd.DataFrame({'Case No.': ['C1'], 'Qty': [2]})
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')  # 폐기 예정 인자(copy=) 경고도 실패로 처리
+        mapped = mapper.map_dataframe_columns(df, 'Case')
+    
+    assert list(mapped.columns) == ['hasCaseNumber', 'Qty']
+    assert list(df.columns) == ['Case No.', 'Qty']
+
+def test_export_to_ttl_escapes_string_literals(tmp_path):
+    mapper = EnhancedOntologyMapper(mapping_file=str(tmp_path / 'missing.json'))
+    df = pd.DataFrame({
+        'Remark': ['12" pipe', 'C:\\HVDC\\in', 'line1\nline2', None],
+        'Qty': [1, 2, 3, 4],
+    })
+    out = tmp_path / 'out.ttl'
+    mapper.export_to_ttl({'InvoiceRecord': df}, str(out))
+    
+    text = out.read_text(encoding='utf-8')
+    assert 'ex:Remark "12\\" pipe"' in text
+    assert 'ex:Remark "C:\\\\HVDC\\\\in"' in text
+    assert 'ex:Remark "line1\\nline2"' in text
+    # 결측 속성은 생략, 리터럴 안의 줄바꿈은 출력 줄을 나누지 않음
+    assert text.count('ex:Remark') == 3
+    assert 'ex:InvoiceRecord_3 a ex:InvoiceRecord ;\n    ex:Qty 4 .' in text
@@ -0,0 +1,133 @@
+# tests/test_io.py - 파일 로딩/캐시 헬퍼 검증
+"""
+병렬 로딩의 순차 실행 기준, 시트 캐시 형식/키, Parquet 캐시 원자적 저장 확인
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import hvdc_io
+from hvdc_io import load_files_parallel, read_excel_cached, save_parquet_cache, to_datetime_mixed
+
+def _loader_pid(path: str):
+    return path, os.getpid()
+
+def test_load_files_parallel_runs_serially_below_threshold(monkeypatch):
+    monkeypatch.setattr(hvdc_io, 'PARALLEL_MIN_FILES', 4)
+    monkeypatch.setenv('LOAD_WORKERS', '4')
+    paths = ['a.xlsx', 'b.xlsx', 'c.xlsx']
+    
+    results = list(load_files_parallel(_loader_pid, paths))
+    assert [path for path, _ in results] == paths
+    assert {pid for _, pid in results} == {os.getpid()}
+
+def test_load_files_parallel_keeps_input_order(monkeypatch):
+    monkeypatch.setattr(hvdc_io, 'PARALLEL_MIN_FILES', 2)
+    monkeypatch.setenv('LOAD_WORKERS', '2')
+    paths = [f"file_{i}.xlsx" for i in range(6)]
+    
+    results = list(load_files_parallel(_loader_pid, paths))
+    assert [path for path, _ in results] == paths
+
+def test_save_parquet_cache_replaces_atomically(tmp_path):
+    pytest.importorskip('pyarrow')
+    cache_path = tmp_path / '.cache' / 'sheet.parquet'
+    first = pd.DataFrame({'Case': ['A', 'B'], 'Qty': [1, 2]})
+    second = pd.DataFrame({'Case': ['C'], 'Qty': [3]})
+    
+    assert save_parquet_cache(first, str(cache_path))
+    assert save_parquet_cache(second, str(cache_path))
+    pd.testing.assert_frame_equal(pd.read_parquet(cache_path), second)
+    assert os.listdir(cache_path.parent) == ['sheet.parquet']
+
+def test_save_parquet_cache_failure_leaves_no_files(tmp_path, capsys):
+    cache_path = tmp_path / '.cache' / 'mixed.parquet'
+    mixed = pd.DataFrame({'value': [1, 'text', 2.5]}, dtype=object)
+    
+    assert not save_parquet_cache(mixed, str(cache_path))
+    assert os.listdir(cache_path.parent) == []
+    assert 'mixed.parquet' in capsys.readouterr().out  # 실패는 조용히 넘기지 않고 출력
+
+def test_read_excel_cached_reuses_parquet_cache(tmp_path):
+    pytest.importorskip('pyarrow')
+    source = tmp_path / 'stock.xlsx'
+    pd.DataFrame({'Case No.': ['C1', 'C2'], 'Qty': [1, 2]}).to_excel(source, index=False)
+    
+    first = read_excel_cached(str(source))
+    cache_files = os.listdir(tmp_path / '.cache')
+    assert len(cache_files) == 1
+    assert cache_files[0].startswith('stock.xlsx.0.') and cache_files[0].endswith('.parquet')
+    
+    # 캐시가 원본보다 최신이면 Excel 대신 Parquet에서 읽음
+    pd.DataFrame({'Case No.': ['X'], 'Qty': [9]}).to_parquet(tmp_path / '.cache' / cache_files[0])
+    os.utime(source, (0, 0))
+    cached = read_excel_cached(str(source))
+    assert cached['Case No.'].tolist() == ['X']
+    assert first['Case No.'].tolist() == ['C1', 'C2']
+
+def test_read_excel_cached_keeps_mixed_type_columns(tmp_path, monkeypatch):
+    source = tmp_path / 'warehouse.xlsx'
+    # 실제 창고 파일처럼 Case No.에 문자열/정수 혼합, 숫자 헤더 → Parquet로는 그대로 왕복 불가
+    pd.DataFrame({'Case No.': ['EXFU562524-3', 207721, 'N/A'], 'Qty': [1, 2, 3], 2024: ['a', 'b', 'c']}).to_excel(
+        source, index=False)
+    
+    first = read_excel_cached(str(source))
+    cache_files = os.listdir(tmp_path / '.cache')
+    assert len(cache_files) == 1 and cache_files[0].endswith('.pkl')
+    
+    # 두 번째 호출은 Excel을 다시 읽지 않고 캐시에서 같은 프레임을 반환
+    monkeypatch.setattr(pd, 'read_excel', None)
+    monkeypatch.setattr(pd, 'ExcelFile', None)
+    cached = read_excel_cached(str(source))
+    pd.testing.assert_frame_equal(cached, first)
+    assert cached['Case No.'].tolist()[:2] == ['EXFU562524-3', 207721]
+    assert pd.isna(cached['Case No.'].iloc[2])
+    assert 2024 in cached.columns
+
+def test_read_excel_cached_key_tracks_rules(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    source = tmp_path / 'stock.xlsx'
+    pd.DataFrame({'Case No.': ['C1'], 'Qty': [1]}).to_excel(source, index=False)
+    
+    read_excel_cached(str(source), cache_key='rules-v1')
+    read_excel_cached(str(source), cache_key='rules-v2')
+    assert len(os.listdir(tmp_path / '.cache')) == 2
+    
+    # 캐시 형식 버전이 바뀌면 같은 규칙이라도 새 캐시 파일
+    monkeypatch.setattr(hvdc_io, 'CACHE_VERSION', hvdc_io.CACHE_VERSION + 1)
+    read_excel_cached(str(source), cache_key='rules-v2')
+    assert len(os.listdir(tmp_path / '.cache')) == 3
+
+def test_invoice_cache_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    from hvdc_cost_enhanced_analysis import CostAnalysisEngine, OntologyMapper
+    
+    mapper = OntologyMapper(str(tmp_path / 'missing_rules.json'))
+    engine = CostAnalysisEngine(mapper)
+    engine.invoice_data = pd.DataFrame({'Category': ['Indoor(M44)', 'Outdoor'], 'TOTAL': [100.0, 50.0]})
+    engine.cost_rates = {
+        'warehouse_rates': pd.DataFrame({'cost_per_package': [10.0]}, index=['DSV Indoor']),
+        'monthly_trends': pd.DataFrame({'TOTAL': [150.0]}, index=['2024-01']),
+        'avg_cost_per_package': 12.5,
+    }
+    parquet_path = str(tmp_path / '.cache' / 'invoice_test.parquet')
+    json_path = str(tmp_path / '.cache' / 'invoice_test.json')
+    engine._save_invoice_cache(parquet_path, json_path)
+    
+    restored = CostAnalysisEngine(mapper)
+    assert restored._load_invoice_cache(parquet_path, json_path)
+    pd.testing.assert_frame_equal(restored.invoice_data, engine.invoice_data)
+    assert restored.cost_rates['avg_cost_per_package'] == 12.5
+    assert restored.cost_rates['warehouse_rates'].loc['DSV Indoor', 'cost_per_package'] == 10.0
+
+def test_to_datetime_mixed_matches_per_value_parsing():
+    values = pd.Series(['2024-01-05', '05/02/2024', '2024-03-07 10:00', None, 'TBA',
+                        pd.Timestamp('2024-04-01')], dtype=object)
+    
+    result = to_datetime_mixed(values)
+    expected = [pd.to_datetime(value, errors='coerce') for value in values]
+    assert result.tolist()[:3] == expected[:3]
+    assert result.isna().tolist() == [False, False, False, True, True, False]
+    assert result.iloc[5] == pd.Timestamp('2024-04-01')
@@ -0,0 +1,144 @@
+# tests/test_report_writer.py - 종합 리포트 기록 검증
+"""
+constant_memory 워크북에 기록한 시트를 다시 읽어 모든 컬럼/행이 남아 있는지, 셀을 한 번씩만 쓰는지 확인
+"""
+
+import pandas as pd
+import pytest
+
+from hvdc_io import write_frame_rows
+
+def _sample_frame() -> pd.DataFrame:
+    """서식 분류별 컬럼(숫자/통화/날짜/일반) + 결측값이 섞인 시트"""
+    return pd.DataFrame({
+        'Location': pd.Categorical(['DSV Indoor', 'MOSB', 'DSV Outdoor']),
+        'YearMonth': ['2024-01', '2024-02', '2024-03'],
+        'Qty': [10, 20, 30],
+        'SQM': [1.5, None, 3.25],
+        'Total_Cost': [100.0, 200.5, 300.0],
+        'Date': pd.to_datetime(['2024-01-05', None, '2024-03-07']),
+        'Note': ['a', None, 'c'],
+    })
+
+class _RecordingSheet:
+    """write_row/write_datetime 셀 기록 순서 수집 (xlsxwriter처럼 서식 없는 None은 기록 안 함)"""
+    
+    def __init__(self):
+        self.writes = []
+        self.cells = {}
+    
+    def write_row(self, row, col, data):
+        for offset, value in enumerate(data):
+            if value is not None:
+                self._write(row, col + offset, value)
+    
+    def write_datetime(self, row, col, value, cell_format=None):
+        self._write(row, col, value)
+    
+    def _write(self, row, col, value):
+        self.writes.append((row, col))
+        self.cells[(row, col)] = value
+
+def test_write_frame_rows_writes_each_cell_once_in_chunks():
+    df = _sample_frame()
+    sheet = _RecordingSheet()
+    write_frame_rows(sheet, df, datetime_format='yyyy-mm-dd', chunk_rows=2)
+    
+    # 청크 경계를 넘어도 행 순서대로, 셀마다 한 번씩 (datetime 셀 중복 기록 없음)
+    assert len(sheet.writes) == len(set(sheet.writes)) == int(df.notna().sum().sum())
+    rows = [row for row, _ in sheet.writes]
+    assert rows == sorted(rows) and rows[0] == 1 and rows[-1] == 3
+    assert sheet.cells[(3, 5)] == pd.Timestamp('2024-03-07')
+    assert sheet.cells[(3, 0)] == 'DSV Outdoor'
+    assert (2, 3) not in sheet.cells and (2, 5) not in sheet.cells  # 결측 → 빈 셀
+
+def test_all_columns_survive_constant_memory(hvdc, tmp_path):
+    df = _sample_frame()
+    output = tmp_path / 'report.xlsx'
+    all_data = {
+        'kpi_dashboard': {'summary_stats': {'Total_Cases': 3, 'Date_Range': '2024-01-05 to 2024-03-07'}},
+        'warehouse_monthly': {'monthly_stock_detail': df},
+    }
+    hvdc.ReportWriter.save_comprehensive_report(all_data, str(output), raw_parquet=False)
+    
+    sheets = pd.read_excel(output, sheet_name=None)
+    written = sheets['🏢_monthly_stock_detail']
+    assert list(written.columns) == list(df.columns)
+    assert len(written) == len(df)
+    
+    expected = df.astype({'Location': object})
+    pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+    
+    dashboard = sheets['📊_Dashboard']
+    assert dashboard['항목'].tolist() == ['Total_Cases', 'Date_Range']
+    assert dashboard['값'].astype(str).tolist() == ['3', '2024-01-05 to 2024-03-07']
+
+def test_every_section_sheet_keeps_its_columns(hvdc, tmp_path):
+    df = _sample_frame()
+    output = tmp_path / 'report.xlsx'
+    all_data = {
+        'warehouse_monthly': {'inbound': df},
+        'site_delivery': {'pivot': df[['YearMonth', 'Qty']]},
+        'cost_analysis': {'cost': df[['Location', 'Total_Cost']]},
+        'reconcile_result': df[['Location', 'Qty']],
+    }
+    hvdc.ReportWriter.save_comprehensive_report(all_data, str(output), raw_parquet=False)
+    
+    sheets = pd.read_excel(output, sheet_name=None)
+    for sheet_name, source in [('🏢_inbound', df), ('🏗️_pivot', df[['YearMonth', 'Qty']]),
+                               ('💰_cost', df[['Location', 'Total_Cost']]),
+                               ('⚖️_재고차이분석', df[['Location', 'Qty']])]:
+        written = sheets[sheet_name]
+        assert list(written.columns) == list(source.columns), sheet_name
+        assert written.notna().sum().tolist() == source.notna().sum().tolist(), sheet_name
+
+def test_sheet_listing_matches_written_sheets(hvdc, tmp_path, capsys):
+    pytest.importorskip('pyarrow')
+    df = _sample_frame()
+    output = tmp_path / 'report.xlsx'
+    all_data = {
+        'warehouse_monthly': {'inbound': df},
+        'daily_stock': df[['Location', 'Qty']],
+        'raw_data': df,
+    }
+    hvdc.ReportWriter.save_comprehensive_report(all_data, str(output), raw_parquet=True)
+    
+    written = list(pd.read_excel(output, sheet_name=None))
+    assert written == ['🏢_inbound', '🗂️_Data_Index']
+    
+    # 목록에는 xlsx에 실제 기록한 시트만 (Parquet로 분리된 일별 재고/원본 데이터 제외)
+    listing = capsys.readouterr().out.split('📋 생성된 시트 목록:')[1]
+    listed = [line.split()[0] for line in listing.strip().splitlines()]
+    assert listed == written
+    assert (tmp_path / 'report_raw_data.parquet').exists()
+
+def test_cost_report_sheets_keep_every_column(tmp_path):
+    from hvdc_cost_enhanced_analysis import CostAnalysisEngine, CostEnhancedReportWriter, OntologyMapper
+    
+    mapper = OntologyMapper(str(tmp_path / 'missing_rules.json'))
+    writer = CostEnhancedReportWriter(mapper, CostAnalysisEngine(mapper))
+    warehouse_costs = pd.DataFrame({
+        'Warehouse': ['DSV Indoor', 'DSV Indoor', 'MOSB'],
+        'YearMonth': ['2024-01', '2024-02', '2024-01'],
+        'TotalCost': [100.0, 50.0, 70.0],
+    })
+    transaction_log = pd.DataFrame({
+        'Case_No': ['C1', 'C2', 'C3'],
+        'Date': pd.to_datetime(['2024-01-05', '2024-02-01', '2024-01-20']).date,
+        'Location': ['DSV Indoor', 'DSV Indoor', 'MOSB'],
+        'Qty': [1, 2, 3],
+    })
+    output = tmp_path / 'cost_report.xlsx'
+    writer.save_cost_enhanced_report({'transaction_log': transaction_log},
+                                     {'warehouse_costs': warehouse_costs}, str(output))
+    
+    sheets = pd.read_excel(output, sheet_name=None)
+    pivot = sheets['💰창고별_운영비용']
+    assert list(pivot.columns) == ['Warehouse', '2024-01', '2024-02']
+    assert pivot.values.tolist() == [['DSV Indoor', 100, 50], ['MOSB', 70, 0]]
+    
+    tx_sheet = sheets['📋 트랜잭션_로그']
+    assert list(tx_sheet.columns) == list(transaction_log.columns)
+    assert tx_sheet['Case_No'].tolist() == ['C1', 'C2', 'C3']
+    assert tx_sheet['Qty'].tolist() == [1, 2, 3]
+    assert pd.to_datetime(tx_sheet['Date']).dt.date.tolist() == transaction_log['Date'].tolist()